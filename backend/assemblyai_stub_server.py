@@ -0,0 +1,156 @@
+"""
+Local stand-in for the AssemblyAI v2 API, for testing transcription without
+an account or network access.
+
+Implements POST /v2/upload, POST /v2/transcript and GET /v2/transcript/<id>.
+A transcript reports "queued", then "processing", and is "completed" once
+--processing-seconds have passed. If the transcript request had a
+webhook_url, the server POSTs {"transcript_id", "status"} to it on completion
+(with the requested auth header). GET /stats shows how many status polls were
+made, which is handy for checking the polling backoff.
+
+Usage:
+    python assemblyai_stub_server.py --port 8765 --processing-seconds 20
+    set ASSEMBLYAI_BASE_URL=http://127.0.0.1:8765  (and any ASSEMBLYAI_API_KEY)
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+
+STUB_TRANSCRIPT_TEXT = "This is a stub transcript produced by the local AssemblyAI test server."
+
+
+class StubState:
+    def __init__(self, processing_seconds: float, text: str = STUB_TRANSCRIPT_TEXT):
+        self.processing_seconds = processing_seconds
+        self.text = text
+        self.transcripts = {}
+        self.status_polls = 0
+        self.lock = threading.Lock()
+
+    def status_of(self, transcript: dict) -> str:
+        elapsed = time.monotonic() - transcript['created']
+        if elapsed >= self.processing_seconds:
+            return 'completed'
+        return 'queued' if elapsed < self.processing_seconds / 4 else 'processing'
+
+
+def _send_webhook(transcript_id: str, request: dict, delay: float) -> None:
+    time.sleep(delay)
+    headers = {'Content-Type': 'application/json'}
+    if request.get('webhook_auth_header_name'):
+        headers[request['webhook_auth_header_name']] = request.get('webhook_auth_header_value', '')
+    body = json.dumps({'transcript_id': transcript_id, 'status': 'completed'}).encode('utf-8')
+    try:
+        urlopen(Request(request['webhook_url'], data=body, headers=headers, method='POST'), timeout=10)
+    except Exception as e:
+        print(f"Webhook to {request['webhook_url']} failed: {e}")
+
+
+def make_handler(state: StubState):
+    class StubHandler(BaseHTTPRequestHandler):
+        def _json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self) -> bytes:
+            if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+                return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            # Streamed uploads arrive chunked
+            body = b''
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return body
+                body += self.rfile.read(size)
+                self.rfile.readline()
+
+        def do_POST(self):
+            if not self.headers.get('authorization'):
+                return self._json(401, {'error': 'Authentication error'})
+            body = self._read_body()
+            if self.path == '/v2/upload':
+                return self._json(200, {'upload_url': f'https://cdn.example/upload/{uuid.uuid4().hex}'})
+            if self.path == '/v2/transcript':
+                try:
+                    request = json.loads(body or b'{}')
+                except ValueError:
+                    return self._json(400, {'error': 'Invalid JSON'})
+                if not request.get('audio_url'):
+                    return self._json(400, {'error': 'audio_url is required'})
+                transcript_id = uuid.uuid4().hex
+                with state.lock:
+                    state.transcripts[transcript_id] = {'created': time.monotonic(), 'request': request}
+                if request.get('webhook_url'):
+                    threading.Thread(
+                        target=_send_webhook,
+                        args=(transcript_id, request, state.processing_seconds),
+                        daemon=True,
+                    ).start()
+                return self._json(200, {'id': transcript_id, 'status': 'queued'})
+            return self._json(404, {'error': 'Not found'})
+
+        def do_GET(self):
+            if self.path == '/stats':
+                with state.lock:
+                    return self._json(200, {
+                        'transcripts': len(state.transcripts),
+                        'status_polls': state.status_polls,
+                    })
+            if not self.headers.get('authorization'):
+                return self._json(401, {'error': 'Authentication error'})
+            if self.path.startswith('/v2/transcript/'):
+                transcript_id = self.path.rsplit('/', 1)[-1]
+                with state.lock:
+                    transcript = state.transcripts.get(transcript_id)
+                    state.status_polls += 1
+                if transcript is None:
+                    return self._json(404, {'error': 'Transcript not found'})
+                status = state.status_of(transcript)
+                payload = {'id': transcript_id, 'status': status}
+                if status == 'completed':
+                    payload['text'] = state.text
+                return self._json(200, payload)
+            return self._json(404, {'error': 'Not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(port: int = 0, processing_seconds: float = 5.0):
+    """Run the stub in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(StubState(processing_seconds)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local AssemblyAI API stub')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--processing-seconds', type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(StubState(args.processing_seconds)))
+    print(f"AssemblyAI stub listening on http://127.0.0.1:{args.port} "
+          f"(transcripts complete after {args.processing_seconds}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,6 @@ Check if all requirements are installed
 Run with: python check_requirements.py
 """
 import sys
-import subprocess
-import shutil
 
 def check_python_package(package_name, import_name=None):
     """Check if a Python package is installed"""
@@ -18,20 +16,6 @@ def check_python_package(package_name, import_name=None):
     except ImportError:
         return False, f"Missing: {package_name} (install with: pip install {package_name})"
 
-def check_system_command(command):
-    """Check if a system command is available"""
-    if shutil.which(command):
-        try:
-            result = subprocess.run([command, '-version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=5)
-            version_line = result.stdout.split('\n')[0] if result.stdout else 'Unknown'
-            return True, version_line
-        except:
-            return True, "Installed (version check failed)"
-    return False, f"Not found: {command}"
-
 def main():
     print("=" * 60)
     print("Checking Requirements for YouTube Blog Generator")
@@ -68,20 +52,24 @@ def main():
     print("System Commands:")
     print("-" * 60)
     
-    # Check FFmpeg
-    ffmpeg_ok, ffmpeg_msg = check_system_command('ffmpeg')
-    if ffmpeg_ok:
-        print(f"  ✓ FFmpeg: {ffmpeg_msg}")
+    # Check FFmpeg and FFprobe (same lookup the app uses, see config/ffmpeg_tools.py)
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from config.ffmpeg_tools import find_ffmpeg_tools
+    
+    tools = find_ffmpeg_tools()
+    if tools.ffmpeg_path:
+        print(f"  ✓ FFmpeg: {tools.ffmpeg_version} ({tools.ffmpeg_path})")
     else:
-        print(f"  ⚠ FFmpeg: {ffmpeg_msg}")
+        print("  ⚠ FFmpeg: Not found")
         print("     Note: App will work without FFmpeg, but WAV conversion requires it")
         print("     Install: choco install ffmpeg OR see INSTALL_FFMPEG.md")
     
-    # Check FFprobe (part of FFmpeg)
-    ffprobe_ok, ffprobe_msg = check_system_command('ffprobe')
-    if ffprobe_ok:
-        print(f"  ✓ FFprobe: {ffprobe_msg}")
-    elif not ffmpeg_ok:
+    if tools.ffprobe_path:
+        print(f"  ✓ FFprobe: {tools.ffprobe_version}")
+    elif tools.ffmpeg_path:
+        print("  ⚠ FFprobe: Not found next to FFmpeg (comes with FFmpeg)")
+    else:
         print(f"  ⚠ FFprobe: Not found (comes with FFmpeg)")
     
     print()
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class BlogConfig(AppConfig):
+    name = 'config'
+
+    def ready(self):
+        # Connect the page cache invalidation receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,197 @@
+"""
+AssemblyAI completion waiting: adaptive polling, hard deadline, webhooks
+
+Instead of polling GET /v2/transcript/{id} every second forever:
+  - the first check waits a fraction of the audio duration (AssemblyAI needs
+    a while for long files anyway), later checks back off exponentially up
+    to an interval that also scales with the duration;
+  - every transcription has a hard deadline sized from the duration
+    (ASSEMBLYAI_MAX_WAIT caps it);
+  - when ASSEMBLYAI_WEBHOOK_URL (public base URL of this app) and
+    ASSEMBLYAI_WEBHOOK_SECRET are set, the transcript request asks AssemblyAI
+    to call /webhooks/assemblyai/ on completion. The waiting worker then only
+    checks the local database, consumes the notification and fetches the
+    result; remote polling drops to a slow safety net until one arrives.
+    Whatever notification is left when the wait ends (deadline, cancel, a
+    webhook that came late) is deleted then.
+
+ASSEMBLYAI_BASE_URL points the client elsewhere, e.g. at the local stub
+server in assemblyai_stub_server.py.
+"""
+import os
+import time
+import logging
+from datetime import timedelta
+from typing import Dict, Iterator, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# AssemblyAI configuration
+ASSEMBLYAI_BASE_URL = os.environ.get('ASSEMBLYAI_BASE_URL', 'https://api.assemblyai.com').rstrip('/')
+ASSEMBLYAI_WEBHOOK_URL = os.environ.get('ASSEMBLYAI_WEBHOOK_URL', '').rstrip('/')
+ASSEMBLYAI_WEBHOOK_SECRET = os.environ.get('ASSEMBLYAI_WEBHOOK_SECRET', '')
+ASSEMBLYAI_WEBHOOK_HEADER = 'X-AssemblyAI-Webhook-Secret'
+ASSEMBLYAI_MAX_WAIT = float(os.environ.get('ASSEMBLYAI_MAX_WAIT', str(3 * 3600)))
+
+# Polling shape
+MIN_POLL_INTERVAL = 2.0
+BACKOFF_FACTOR = 1.5
+UNKNOWN_DURATION_DEADLINE = 1800.0
+WEBHOOK_SAFETY_POLL_INTERVAL = 120.0  # Remote checks while waiting for a webhook
+WEBHOOK_LOCAL_CHECK_INTERVAL = 2.0    # Database checks for a received webhook
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(value, high))
+
+
+def transcript_deadline(audio_duration: Optional[float]) -> float:
+    """Seconds to wait for a transcript before giving up"""
+    if not audio_duration:
+        return min(UNKNOWN_DURATION_DEADLINE, ASSEMBLYAI_MAX_WAIT)
+    return _clamp(audio_duration * 2 + 120, 300, ASSEMBLYAI_MAX_WAIT)
+
+
+def poll_delays(audio_duration: Optional[float]) -> Iterator[float]:
+    """Seconds to wait before each status check, sized from the audio duration"""
+    duration = audio_duration or 0
+    max_interval = _clamp(duration * 0.02, 5, 30)
+    # Nothing is ready for a while on long files, so don't start checking straight away
+    yield _clamp(duration * 0.1, MIN_POLL_INTERVAL, 60)
+    delay = MIN_POLL_INTERVAL
+    while True:
+        yield delay
+        delay = min(delay * BACKOFF_FACTOR, max_interval)
+
+
+def webhook_request_fields() -> Dict[str, str]:
+    """Extra POST /v2/transcript fields that make AssemblyAI call us back"""
+    if not ASSEMBLYAI_WEBHOOK_URL:
+        return {}
+    if not ASSEMBLYAI_WEBHOOK_SECRET:
+        # Anyone could post fake completions to an unauthenticated endpoint
+        logger.warning("ASSEMBLYAI_WEBHOOK_URL is set without ASSEMBLYAI_WEBHOOK_SECRET; polling instead")
+        return {}
+    return {
+        'webhook_url': f'{ASSEMBLYAI_WEBHOOK_URL}/webhooks/assemblyai/',
+        'webhook_auth_header_name': ASSEMBLYAI_WEBHOOK_HEADER,
+        'webhook_auth_header_value': ASSEMBLYAI_WEBHOOK_SECRET,
+    }
+
+
+def record_webhook(transcript_id: str, status: str) -> None:
+    """Store a webhook notification for the worker waiting on the transcript"""
+    from .models import AssemblyAIWebhookEvent
+
+    AssemblyAIWebhookEvent.objects.update_or_create(transcript_id=transcript_id, defaults={'status': status})
+
+
+def take_webhook_status(transcript_id: str) -> Optional[str]:
+    """
+    Final status ('completed' or 'error') delivered by webhook for a
+    transcript, if any. The notification is consumed: later calls return None
+    until another one arrives. Never raises.
+    """
+    try:
+        from .models import AssemblyAIWebhookEvent
+
+        events = AssemblyAIWebhookEvent.objects.filter(transcript_id=transcript_id, status__in=('completed', 'error'))
+        status = events.values_list('status', flat=True).first()
+        if status is not None:
+            events.delete()
+        return status
+    except Exception as e:
+        logger.warning(f"Could not check AssemblyAI webhook events: {e}")
+        return None
+
+
+def forget_webhook(transcript_id: str) -> None:
+    """
+    Delete the notification for a transcript nobody waits on any more, and
+    any left by waits that ended longer than ASSEMBLYAI_MAX_WAIT ago (webhooks
+    that arrived after their worker gave up). Never raises.
+    """
+    try:
+        from django.db.models import Q
+        from django.utils import timezone
+
+        from .models import AssemblyAIWebhookEvent
+
+        stale = timezone.now() - timedelta(seconds=ASSEMBLYAI_MAX_WAIT)
+        AssemblyAIWebhookEvent.objects.filter(Q(transcript_id=transcript_id) | Q(received_at__lt=stale)).delete()
+    except Exception as e:
+        logger.warning(f"Could not delete AssemblyAI webhook events: {e}")
+
+
+def wait_for_transcript(session, transcript_id: str, headers: Dict[str, str],
+                        audio_duration: Optional[float] = None, cancel_event=None,
+                        use_webhook: bool = False) -> Optional[dict]:
+    """Wait for a transcript to finish; returns its JSON, or None on error/deadline/cancel"""
+    try:
+        return _wait_for_transcript(session, transcript_id, headers, audio_duration, cancel_event, use_webhook)
+    finally:
+        if use_webhook:
+            forget_webhook(transcript_id)
+
+
+def _wait_for_transcript(session, transcript_id: str, headers: Dict[str, str], audio_duration: Optional[float],
+                         cancel_event, use_webhook: bool) -> Optional[dict]:
+    status_url = f"{ASSEMBLYAI_BASE_URL}/v2/transcript/{transcript_id}"
+    started = time.monotonic()
+    deadline = started + transcript_deadline(audio_duration)
+    delays = poll_delays(audio_duration)
+    next_remote = started + (WEBHOOK_SAFETY_POLL_INTERVAL if use_webhook else next(delays))
+    polls = 0
+    webhook_pending = use_webhook
+
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            logger.error(f"AssemblyAI transcript {transcript_id} not ready after {now - started:.0f}s, giving up")
+            return None
+
+        notified = webhook_pending and take_webhook_status(transcript_id) is not None
+        if notified:
+            # Fetch now; if AssemblyAI doesn't agree yet, fall back to the backoff
+            webhook_pending = False
+            next(delays)  # Skip the long first wait, the file has been processed
+        if not notified and now < next_remote:
+            wait = min(next_remote, deadline) - now
+            if webhook_pending:
+                wait = min(wait, WEBHOOK_LOCAL_CHECK_INTERVAL)
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    logger.info("AssemblyAI polling cancelled")
+                    return None
+            else:
+                time.sleep(wait)
+            continue
+
+        polls += 1
+        status_response = session.get(status_url, headers=headers, timeout=20)
+        if not status_response.ok:
+            logger.error(
+                "AssemblyAI status poll failed: status=%s body=%s",
+                status_response.status_code,
+                status_response.text[:500],
+            )
+            return None
+        try:
+            data = status_response.json()
+        except ValueError:
+            logger.error(
+                "AssemblyAI status poll returned non-JSON response: %s",
+                status_response.text[:500],
+            )
+            return None
+
+        status = data.get('status')
+        if status == 'completed':
+            logger.info(f"AssemblyAI transcript ready after {time.monotonic() - started:.0f}s ({polls} status request(s))")
+            return data
+        if status == 'error':
+            logger.error(f"AssemblyAI transcription failed: {data.get('error')}")
+            return None
+        interval = WEBHOOK_SAFETY_POLL_INTERVAL if webhook_pending else next(delays)
+        next_remote = time.monotonic() + interval
@@ -0,0 +1,265 @@
+"""
+asyncio provider layer for the transcription and LLM APIs
+
+The same provider calls as YouTubeBlogGenerator (AssemblyAI upload/wait,
+Deepgram, Groq/OpenAI chat completions, Gemini) made with httpx.AsyncClient,
+so an async worker can keep the network waits of many jobs in flight on one
+event loop instead of parking a thread per request. One pooled AsyncClient
+is shared by every call on the loop.
+
+LLM calls stream into an LLMCall like the threaded providers do, so partial
+output, deadlines and the router's statistics work the same way.
+"""
+import os
+import json
+import asyncio
+import logging
+import threading
+import weakref
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from .assemblyai import (
+    ASSEMBLYAI_BASE_URL,
+    WEBHOOK_LOCAL_CHECK_INTERVAL,
+    WEBHOOK_SAFETY_POLL_INTERVAL,
+    forget_webhook,
+    poll_delays,
+    take_webhook_status,
+    transcript_deadline,
+    webhook_request_fields,
+)
+from .llm_router import LLMCall
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Optional async HTTP client (installed with openai)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Connections shared by all in-flight jobs of an async worker
+ASYNC_PROVIDER_POOL_SIZE = int(os.environ.get('ASYNC_PROVIDER_POOL_SIZE', '100'))
+ASYNC_PROVIDER_HTTP_TIMEOUT = float(os.environ.get('PROVIDER_HTTP_TIMEOUT', '300'))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+CHAT_COMPLETION_URLS = {
+    'groq': 'https://api.groq.com/openai/v1/chat/completions',
+    'openai': 'https://api.openai.com/v1/chat/completions',
+}
+GEMINI_STREAM_URL = 'https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse'
+DEEPGRAM_URL = 'https://api.deepgram.com/v1/listen'
+
+
+class ProviderError(Exception):
+    """A provider answered with an error or an unusable response"""
+
+
+async def _read_file_chunks(path: str) -> AsyncIterator[bytes]:
+    """Stream a file for upload without blocking the event loop"""
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+async def _sse_data(response) -> AsyncIterator[str]:
+    """Payloads of the data: lines of a Server-Sent Events response"""
+    async for line in response.aiter_lines():
+        if line.startswith('data:'):
+            data = line[5:].strip()
+            if data and data != '[DONE]':
+                yield data
+
+
+def _raise_for_status(response, provider: str) -> None:
+    if response.status_code >= 400:
+        raise ProviderError(f"{provider} returned status={response.status_code} body={response.text[:500]}")
+
+
+class AsyncProviderClient:
+    """Async provider calls over one pooled httpx.AsyncClient per event loop"""
+
+    def __init__(self, assemblyai_api_key: str = '', deepgram_api_key: str = '', groq_api_key: str = '',
+                 gemini_api_key: str = '', openai_api_key: str = ''):
+        self.api_keys = {
+            'assemblyai': assemblyai_api_key,
+            'deepgram': deepgram_api_key,
+            'groq': groq_api_key,
+            'gemini': gemini_api_key,
+            'openai': openai_api_key,
+        }
+        # event loop -> its AsyncClient; an entry goes away with its loop
+        self._clients = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return httpx is not None
+
+    def configured(self, provider: str) -> bool:
+        return self.available and bool(self.api_keys.get(provider))
+
+    def llm_providers(self) -> List[str]:
+        """Configured LLMs in preference order (free first, like the threaded path)"""
+        return [name for name in ('groq', 'gemini', 'openai') if self.configured(name)]
+
+    def _http(self):
+        """The AsyncClient of the running loop (clients can't be shared across loops)"""
+        if httpx is None:
+            raise ImportError("httpx not installed. Install with: pip install httpx")
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None:
+                # Loops in other threads keep their own clients; nothing is replaced
+                client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=ASYNC_PROVIDER_POOL_SIZE,
+                        max_keepalive_connections=ASYNC_PROVIDER_POOL_SIZE,
+                    ),
+                    timeout=httpx.Timeout(ASYNC_PROVIDER_HTTP_TIMEOUT, connect=10.0),
+                )
+                self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the running loop's client; call it before the loop finishes"""
+        with self._clients_lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def transcribe_assemblyai(self, audio_file_path: str,
+                                    audio_duration: Optional[float] = None) -> Optional[str]:
+        """Upload, start and wait for an AssemblyAI transcript (see assemblyai.py for the schedule)"""
+        client = self._http()
+        headers = {'authorization': self.api_keys['assemblyai']}
+
+        response = await client.post(f'{ASSEMBLYAI_BASE_URL}/v2/upload', headers=headers,
+                                     content=_read_file_chunks(audio_file_path), timeout=60)
+        _raise_for_status(response, 'AssemblyAI upload')
+        upload_url = response.json().get('upload_url')
+        if not upload_url:
+            raise ProviderError("AssemblyAI upload missing upload_url")
+
+        webhook_fields = webhook_request_fields()
+        response = await client.post(f'{ASSEMBLYAI_BASE_URL}/v2/transcript', headers=headers,
+                                     json={'audio_url': upload_url, **webhook_fields}, timeout=20)
+        _raise_for_status(response, 'AssemblyAI transcript request')
+        transcript_id = response.json().get('id')
+        if not transcript_id:
+            raise ProviderError("AssemblyAI transcript request missing id")
+
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + transcript_deadline(audio_duration)
+            delays = poll_delays(audio_duration)
+            webhook_pending = bool(webhook_fields)
+            while True:
+                if webhook_pending:
+                    # Wait for the webhook row; the remote check below is the safety net
+                    check_at = loop.time() + WEBHOOK_SAFETY_POLL_INTERVAL
+                    while loop.time() < min(check_at, deadline):
+                        if await sync_to_async(take_webhook_status)(transcript_id) is not None:
+                            # Notified once: fetch now, then back off like plain polling
+                            webhook_pending = False
+                            next(delays)
+                            break
+                        await asyncio.sleep(WEBHOOK_LOCAL_CHECK_INTERVAL)
+                else:
+                    await asyncio.sleep(max(0.0, min(next(delays), deadline - loop.time())))
+                if loop.time() >= deadline:
+                    raise ProviderError(f"AssemblyAI transcript {transcript_id} missed its deadline")
+
+                response = await client.get(f'{ASSEMBLYAI_BASE_URL}/v2/transcript/{transcript_id}',
+                                            headers=headers, timeout=20)
+                _raise_for_status(response, 'AssemblyAI status poll')
+                data = response.json()
+                if data.get('status') == 'completed':
+                    return data.get('text')
+                if data.get('status') == 'error':
+                    raise ProviderError(f"AssemblyAI transcription failed: {data.get('error')}")
+        finally:
+            if webhook_fields:
+                await sync_to_async(forget_webhook)(transcript_id)
+
+    async def transcribe_deepgram(self, audio_file_path: str) -> Optional[str]:
+        """Send the audio to Deepgram's prerecorded endpoint"""
+        response = await self._http().post(
+            DEEPGRAM_URL,
+            headers={
+                'Authorization': f"Token {self.api_keys['deepgram']}",
+                'Content-Type': 'audio/*',
+            },
+            content=_read_file_chunks(audio_file_path),
+        )
+        _raise_for_status(response, 'Deepgram')
+        result = response.json()
+        return result.get('results', {}).get('channels', [{}])[0].get('alternatives', [{}])[0].get('transcript', '')
+
+    async def stream_chat_completion(self, provider: str, model: str, messages: List[Dict[str, str]],
+                                     max_tokens: int, temperature: float,
+                                     call: LLMCall) -> Tuple[str, Optional[str]]:
+        """Stream an OpenAI-compatible chat completion (Groq, OpenAI) into call; returns (text, finish_reason)"""
+        payload = {
+            'model': model,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'stream': True,
+        }
+        headers = {'Authorization': f"Bearer {self.api_keys[provider]}"}
+        finish_reason = None
+        async with self._http().stream('POST', CHAT_COMPLETION_URLS[provider], json=payload,
+                                       headers=headers, timeout=call.timeout()) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                _raise_for_status(response, provider)
+            async for data in _sse_data(response):
+                call.check()
+                chunk = json.loads(data)
+                if not chunk.get('choices'):
+                    continue
+                choice = chunk['choices'][0]
+                call.add_text((choice.get('delta') or {}).get('content'))
+                if choice.get('finish_reason'):
+                    finish_reason = choice['finish_reason']
+        return call.text, finish_reason
+
+    async def chat_completion(self, provider: str, model: str, messages: List[Dict[str, str]],
+                              max_tokens: int, temperature: float, timeout: float) -> Optional[str]:
+        """Non-streaming chat completion (used for continuations)"""
+        response = await self._http().post(
+            CHAT_COMPLETION_URLS[provider],
+            json={'model': model, 'messages': messages, 'max_tokens': max_tokens, 'temperature': temperature},
+            headers={'Authorization': f"Bearer {self.api_keys[provider]}"},
+            timeout=timeout,
+        )
+        _raise_for_status(response, provider)
+        return response.json()['choices'][0]['message']['content']
+
+    async def stream_gemini(self, model: str, prompt: str, call: LLMCall) -> str:
+        """Stream a Gemini generateContent response into call"""
+        payload = {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+        headers = {'x-goog-api-key': self.api_keys['gemini']}
+        async with self._http().stream('POST', GEMINI_STREAM_URL.format(model=model), json=payload,
+                                       headers=headers, timeout=call.timeout()) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                _raise_for_status(response, 'gemini')
+            async for data in _sse_data(response):
+                call.check()
+                chunk = json.loads(data)
+                for candidate in chunk.get('candidates') or []:
+                    for part in (candidate.get('content') or {}).get('parts') or []:
+                        call.add_text(part.get('text'))
+        return call.text
@@ -0,0 +1,256 @@
+"""
+Chunked, parallel transcription of long audio
+
+Long recordings are cut into overlapping windows with ffmpeg (boundaries are
+moved into nearby silences when AUDIO_CHUNK_SPLIT=silence), the windows are
+transcribed concurrently - local Whisper across a pool of worker processes,
+API providers across threads - and the chunk transcripts are stitched back
+together in order with the duplicated overlap removed.
+
+Every Whisper pool process loads its own model, so the pool is capped at
+WHISPER_POOL_WORKERS and at what WHISPER_MEMORY_BUDGET_MB leaves room for
+(both per generation worker process). A pool broken by a crashed process is
+discarded and rebuilt on the next call.
+"""
+import os
+import re
+import shutil
+import tempfile
+import threading
+import subprocess
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from difflib import SequenceMatcher
+from typing import Callable, List, Optional, Tuple
+
+from .ffmpeg_tools import get_ffmpeg_tools
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Chunking configuration
+AUDIO_CHUNKING_ENABLED = os.environ.get('AUDIO_CHUNKING_ENABLED', 'true').lower() == 'true'
+AUDIO_CHUNK_MIN_DURATION = float(os.environ.get('AUDIO_CHUNK_MIN_DURATION', '600'))  # Only chunk audio longer than this
+AUDIO_CHUNK_SECONDS = float(os.environ.get('AUDIO_CHUNK_SECONDS', '300'))
+AUDIO_CHUNK_OVERLAP_SECONDS = float(os.environ.get('AUDIO_CHUNK_OVERLAP_SECONDS', '5'))
+AUDIO_CHUNK_SPLIT = os.environ.get('AUDIO_CHUNK_SPLIT', 'silence').strip().lower()  # "silence" or "fixed"
+TRANSCRIPTION_CHUNK_WORKERS = int(os.environ.get('TRANSCRIPTION_CHUNK_WORKERS', '0')) or (os.cpu_count() or 1)
+# Whisper pool processes per generation worker; each holds a model in memory
+WHISPER_POOL_WORKERS = int(os.environ.get('WHISPER_POOL_WORKERS', '2'))
+
+# How far (seconds) a boundary may move to land in a silence
+SILENCE_SEARCH_WINDOW = 20.0
+
+
+def probe_duration(audio_path: str, ffprobe_path: Optional[str]) -> Optional[float]:
+    """Duration of an audio file in seconds (None if ffprobe is unavailable)"""
+    if not ffprobe_path:
+        return None
+    try:
+        result = subprocess.run(
+            [ffprobe_path, '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+            capture_output=True, text=True, timeout=30,
+        )
+        return float(result.stdout.strip())
+    except Exception as e:
+        logger.warning(f"Could not probe audio duration: {e}")
+        return None
+
+
+def detect_silences(audio_path: str, ffmpeg_path: str, noise_db: int = -35,
+                    min_silence: float = 0.5) -> List[Tuple[float, float]]:
+    """Return (start, end) pairs of silent stretches found by silencedetect"""
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, '-hide_banner', '-nostats', '-i', audio_path,
+             '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}', '-f', 'null', '-'],
+            capture_output=True, text=True, timeout=600,
+        )
+    except Exception as e:
+        logger.warning(f"Silence detection failed: {e}")
+        return []
+
+    starts = [float(v) for v in re.findall(r'silence_start: (-?[\d.]+)', result.stderr)]
+    ends = [float(v) for v in re.findall(r'silence_end: ([\d.]+)', result.stderr)]
+    return list(zip(starts, ends))
+
+
+def plan_chunks(duration: float, chunk_seconds: float = AUDIO_CHUNK_SECONDS,
+                overlap_seconds: float = AUDIO_CHUNK_OVERLAP_SECONDS,
+                silences: Optional[List[Tuple[float, float]]] = None) -> List[Tuple[float, float]]:
+    """Plan (start, length) windows covering the audio with overlap"""
+    windows = []
+    start = 0.0
+    while start < duration:
+        end = min(start + chunk_seconds, duration)
+        if end < duration and silences:
+            # Cut in the middle of the silence closest to the planned boundary
+            candidates = [(s + e) / 2 for s, e in silences
+                          if abs((s + e) / 2 - end) <= SILENCE_SEARCH_WINDOW and (s + e) / 2 > start + overlap_seconds]
+            if candidates:
+                end = min(candidates, key=lambda point: abs(point - end))
+        windows.append((start, min(end + overlap_seconds, duration) - start))
+        if end >= duration:
+            break
+        start = end
+    return windows
+
+
+def split_audio(audio_path: str, output_dir: str, ffmpeg_path: str,
+                windows: List[Tuple[float, float]]) -> List[str]:
+    """Cut the planned windows into 16 kHz mono WAV files, in order"""
+    chunk_paths = []
+    for index, (start, length) in enumerate(windows):
+        chunk_path = os.path.join(output_dir, f'chunk_{index:04d}.wav')
+        subprocess.run(
+            [ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-y',
+             '-ss', f'{start:.3f}', '-t', f'{length:.3f}', '-i', audio_path,
+             '-ac', '1', '-ar', '16000', chunk_path],
+            check=True, capture_output=True, timeout=600,
+        )
+        chunk_paths.append(chunk_path)
+    return chunk_paths
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r'[^\w]', '', word.lower())
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 60, min_match_words: int = 3) -> str:
+    """Join chunk transcripts in order, dropping words repeated in the overlap"""
+    words: List[str] = []
+    for text in texts:
+        next_words = (text or '').split()
+        if not next_words:
+            continue
+        if words:
+            tail = [_normalize_word(w) for w in words[-max_overlap_words:]]
+            head = [_normalize_word(w) for w in next_words[:max_overlap_words]]
+            match = SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(0, len(tail), 0, len(head))
+            if match.size >= min_match_words:
+                # Keep the earlier chunk up to the end of the shared run, continue after it
+                cut = len(words) - len(tail) + match.a + match.size
+                words = words[:cut]
+                next_words = next_words[match.b + match.size:]
+        words.extend(next_words)
+    return ' '.join(words)
+
+
+def _init_whisper_chunk_worker(torch_threads: int) -> None:
+    """Keep each pool process from claiming every core for torch"""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except Exception:
+        pass
+
+
+def _whisper_chunk_worker(model_name: str, chunk_path: str) -> str:
+    """Transcribe one chunk inside a pool process (models stay cached per process)"""
+    from .whisper_models import whisper_registry
+    with whisper_registry.use(model_name) as model:
+        return model.transcribe(chunk_path, language='en').get('text', '')
+
+
+_process_pool = None
+_process_pool_size = 0
+_process_pool_lock = threading.Lock()
+
+
+def whisper_pool_size(model_name: str, requested: int = TRANSCRIPTION_CHUNK_WORKERS) -> int:
+    """Pool processes allowed for a model: WHISPER_POOL_WORKERS, and within the memory budget (0: none)"""
+    from .whisper_models import estimated_model_size_mb, whisper_registry
+
+    size = max(0, min(requested, WHISPER_POOL_WORKERS))
+    budget_mb = whisper_registry.memory_budget_mb
+    if budget_mb > 0:
+        # Each pool process loads its own copy of the model
+        size = min(size, int(budget_mb // estimated_model_size_mb(model_name)))
+    return size
+
+
+def get_whisper_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Long-lived process pool so workers keep their loaded Whisper models"""
+    global _process_pool, _process_pool_size
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool_size != max_workers:
+            # Another model size fits a different number of processes
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _process_pool is None:
+            import multiprocessing
+            torch_threads = max(1, (os.cpu_count() or 1) // max_workers)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_whisper_chunk_worker,
+                initargs=(torch_threads,),
+            )
+            _process_pool_size = max_workers
+        return _process_pool
+
+
+def discard_whisper_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next call starts a fresh one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def transcribe_in_chunks(audio_path: str, ffmpeg_path: Optional[str] = None,
+                         whisper_model: Optional[str] = None,
+                         transcribe_fn: Optional[Callable[[str], Optional[str]]] = None,
+                         max_workers: int = TRANSCRIPTION_CHUNK_WORKERS) -> Optional[str]:
+    """Transcribe long audio chunk by chunk in parallel
+
+    Pass whisper_model to run local Whisper across the process pool, or
+    transcribe_fn (e.g. an API provider method) to fan chunks out across
+    threads. Returns None when the audio is too short to be worth chunking
+    or ffmpeg is unavailable, so callers can fall back to a single call.
+    """
+    if not AUDIO_CHUNKING_ENABLED:
+        return None
+    if whisper_model:
+        max_workers = whisper_pool_size(whisper_model, max_workers)
+        if max_workers < 1:
+            logger.info(f"Whisper pool disabled or over WHISPER_MEMORY_BUDGET_MB for {whisper_model}")
+            return None
+    tools = get_ffmpeg_tools()
+    ffmpeg_path = ffmpeg_path or tools.ffmpeg_path
+    ffprobe_path = tools.ffprobe_path
+    if not ffmpeg_path:
+        return None
+    duration = probe_duration(audio_path, ffprobe_path)
+    if not duration or duration < AUDIO_CHUNK_MIN_DURATION:
+        return None
+
+    silences = detect_silences(audio_path, ffmpeg_path) if AUDIO_CHUNK_SPLIT == 'silence' else None
+    windows = plan_chunks(duration, silences=silences)
+    chunk_dir = tempfile.mkdtemp(prefix='chunks_', dir=os.path.dirname(audio_path) or None)
+    try:
+        chunk_paths = split_audio(audio_path, chunk_dir, ffmpeg_path, windows)
+        logger.info(f"Transcribing {duration:.0f}s of audio as {len(chunk_paths)} chunks "
+                    f"(workers={max_workers})")
+
+        if whisper_model:
+            pool = get_whisper_process_pool(max_workers)
+            try:
+                texts = list(pool.map(_whisper_chunk_worker, [whisper_model] * len(chunk_paths), chunk_paths))
+            except BrokenProcessPool:
+                # A pool process died (e.g. out of memory); don't reuse the pool
+                discard_whisper_process_pool(pool)
+                raise
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                texts = list(pool.map(transcribe_fn, chunk_paths))
+            if any(text is None for text in texts):
+                logger.warning("One or more chunks failed to transcribe")
+                return None
+
+        return stitch_transcripts(texts)
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
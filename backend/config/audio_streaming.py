@@ -0,0 +1,144 @@
+"""
+Streaming download-to-transcribe pipeline
+
+Instead of letting yt-dlp write the whole stream and converting it to a WAV
+file, ffmpeg reads the selected audio stream URL straight from the yt-dlp
+info dict and decodes it to 16 kHz mono PCM on stdout. A reader thread cuts
+the PCM into windows and hands them to local Whisper through a bounded
+queue, so transcription overlaps the download and neither disk nor memory
+use grows with the length of the video.
+"""
+import os
+import queue
+import threading
+import tempfile
+import subprocess
+import logging
+from typing import IO, Iterator, List, Optional, Union
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Streaming configuration
+TRANSCRIPTION_STREAMING = os.environ.get('TRANSCRIPTION_STREAMING', 'false').lower() == 'true'
+STREAM_WINDOW_SECONDS = float(os.environ.get('STREAM_WINDOW_SECONDS', '60'))
+STREAM_OVERLAP_SECONDS = float(os.environ.get('STREAM_OVERLAP_SECONDS', '2'))
+STREAM_QUEUE_WINDOWS = int(os.environ.get('STREAM_QUEUE_WINDOWS', '4'))  # Max decoded windows held in memory
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # s16le
+
+
+def open_pcm_stream(info: dict, ffmpeg_path: str,
+                    stderr: Union[int, IO] = subprocess.DEVNULL) -> Optional[subprocess.Popen]:
+    """Start ffmpeg decoding the info dict's audio URL to 16 kHz mono PCM on stdout
+
+    stderr must not be a pipe nobody reads: once its buffer fills ffmpeg
+    blocks and the stream stalls. Pass a file to keep the error text.
+    """
+    stream_url = info.get('url')
+    if not stream_url:
+        logger.warning("Info dict has no direct stream URL, streaming not possible")
+        return None
+
+    command = [ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-nostdin']
+    headers = info.get('http_headers') or {}
+    if headers:
+        command += ['-headers', ''.join(f'{key}: {value}\r\n' for key, value in headers.items())]
+    command += ['-i', stream_url, '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', 'pipe:1']
+
+    return subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, bufsize=0)
+
+
+def iter_pcm_windows(stream, window_seconds: float = STREAM_WINDOW_SECONDS,
+                     overlap_seconds: float = STREAM_OVERLAP_SECONDS) -> Iterator[bytes]:
+    """Yield PCM windows of window_seconds, each starting overlap_seconds early"""
+    window_bytes = int(window_seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE
+    overlap_bytes = int(overlap_seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE
+    carry = b''
+
+    while True:
+        buffer = bytearray(carry)
+        while len(buffer) < window_bytes:
+            data = stream.read(window_bytes - len(buffer))
+            if not data:
+                break
+            buffer.extend(data)
+        if len(buffer) <= len(carry):
+            return  # Nothing new since the last window
+        yield bytes(buffer)
+        if len(buffer) < window_bytes:
+            return  # End of stream
+        carry = bytes(buffer[-overlap_bytes:]) if overlap_bytes else b''
+
+
+def pcm_to_float_array(pcm: bytes):
+    """Convert s16le PCM bytes to the float32 array Whisper accepts"""
+    import numpy as np
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def transcribe_stream(info: dict, ffmpeg_path: str, model_name: str) -> Optional[str]:
+    """Download, decode and transcribe concurrently with local Whisper"""
+    from .audio_chunking import stitch_transcripts
+
+    with tempfile.TemporaryFile() as error_log:
+        process = open_pcm_stream(info, ffmpeg_path, stderr=error_log)
+        if process is None:
+            return None
+        texts = _transcribe_windows(process, model_name)
+        if process.returncode != 0:
+            error_log.seek(0)
+            error_output = error_log.read(500).decode('utf-8', 'replace')
+            logger.error(f"ffmpeg streaming failed (code {process.returncode}): {error_output}")
+            return None
+
+    transcript = stitch_transcripts(texts)
+    return transcript or None
+
+
+def _transcribe_windows(process: subprocess.Popen, model_name: str) -> List[str]:
+    """Transcribe the PCM windows of a running ffmpeg process; waits for it to exit"""
+    from .whisper_models import whisper_registry
+
+    windows: 'queue.Queue' = queue.Queue(maxsize=max(1, STREAM_QUEUE_WINDOWS))
+    stop = threading.Event()
+    done = object()
+
+    def reader():
+        try:
+            for window in iter_pcm_windows(process.stdout):
+                # Blocking put applies back-pressure to ffmpeg when Whisper falls behind
+                while not stop.is_set():
+                    try:
+                        windows.put(window, timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        finally:
+            if not stop.is_set():
+                windows.put(done)
+
+    reader_thread = threading.Thread(target=reader, name='pcm-stream-reader', daemon=True)
+    reader_thread.start()
+
+    texts: List[str] = []
+    try:
+        while True:
+            window = windows.get()
+            if window is done:
+                break
+            with whisper_registry.use(model_name) as model:
+                result = model.transcribe(pcm_to_float_array(window), language='en')
+            texts.append(result.get('text', ''))
+            logger.info(f"Transcribed streamed window {len(texts)}")
+        process.wait(timeout=30)
+    finally:
+        stop.set()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        reader_thread.join(timeout=5)
+    return texts
@@ -0,0 +1,327 @@
+"""
+Batch blog generation for playlists and URL lists
+
+A GenerationBatch stores the submitted sources. When a worker (or the
+generate_batch management command) runs it, playlists are expanded with
+yt-dlp flat extraction, every video becomes a GenerationJob item, and the
+items run on a bounded thread pool that shares the process-wide generator
+and its provider clients. Items report their own progress like normal jobs;
+the BlogPost rows of successful items are written with bulk_create every
+BATCH_WRITE_SIZE finished items, so a long batch never holds more than that
+many posts in memory and a crash loses at most that much work.
+
+Like jobs, a running batch keeps heartbeat_at fresh; workers requeue batches
+whose heartbeat went stale, and the rerun skips the items already done.
+"""
+import os
+import logging
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import page_cache
+from .jobs import (
+    JOB_MAX_ATTEMPTS,
+    JOB_STALE_AFTER,
+    STALE_JOB_ERROR,
+    Heartbeat,
+    JobProgressReporter,
+    build_blog_post,
+    mark_job_failed,
+)
+from .models import BlogPost, GenerationBatch, GenerationJob
+from .video_metadata import extract_video_id
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Videos processed concurrently within one batch
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '3'))
+# Upper bound on videos taken from one batch (playlists can be huge)
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '200'))
+# Finished posts written per bulk_create
+BATCH_WRITE_SIZE = int(os.environ.get('BATCH_WRITE_SIZE', '20'))
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+
+def expand_playlist(url: str) -> List[str]:
+    """Video URLs of a playlist via flat extraction (no per-video requests)"""
+    if yt_dlp is None:
+        raise ImportError("yt-dlp not installed. Install with: pip install yt-dlp")
+    ydl_opts = {
+        'extract_flat': 'in_playlist',
+        'quiet': True,
+        'no_warnings': True,
+        'skip_download': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    urls = []
+    for entry in info.get('entries') or []:
+        if not entry:
+            continue
+        video_id = entry.get('id')
+        if video_id:
+            urls.append(f'https://www.youtube.com/watch?v={video_id}')
+        elif entry.get('url'):
+            urls.append(entry['url'])
+    return urls
+
+
+def is_playlist_url(url: str) -> bool:
+    return 'list=' in url and (extract_video_id(url) is None or '/playlist' in url)
+
+
+def expand_sources(sources: List[str], max_items: int = BATCH_MAX_ITEMS) -> List[str]:
+    """Video URLs for the submitted sources, playlists expanded, duplicates dropped"""
+    urls = []
+    seen = set()
+    for source in sources:
+        source = source.strip()
+        if not source:
+            continue
+        if is_playlist_url(source):
+            try:
+                candidates = expand_playlist(source)
+            except Exception as e:
+                logger.error(f"Could not expand playlist {source}: {e}")
+                continue
+        else:
+            candidates = [source]
+        for url in candidates:
+            key = extract_video_id(url) or url
+            if key not in seen:
+                seen.add(key)
+                urls.append(url)
+    if len(urls) > max_items:
+        logger.warning(f"Batch truncated to {max_items} of {len(urls)} videos")
+        urls = urls[:max_items]
+    return urls
+
+
+def create_batch(sources: List[str], author, regenerate: bool = False) -> GenerationBatch:
+    """Persist a queued batch (expanded when it runs)"""
+    batch = GenerationBatch.objects.create(sources=list(sources), author=author, regenerate=regenerate)
+    logger.info(f"Enqueued generation batch {batch.pk} with {len(batch.sources)} source(s)")
+    return batch
+
+
+def claim_next_batch() -> Optional[GenerationBatch]:
+    """Atomically move the oldest queued batch to running and return it"""
+    while True:
+        batch = GenerationBatch.objects.filter(status=GenerationJob.STATUS_QUEUED).order_by('created_at').first()
+        if batch is None:
+            return None
+        now = timezone.now()
+        claimed = GenerationBatch.objects.filter(
+            pk=batch.pk,
+            status=GenerationJob.STATUS_QUEUED,
+        ).update(status=GenerationJob.STATUS_RUNNING, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1)
+        if claimed:
+            batch.refresh_from_db()
+            return batch
+
+
+def recover_stale_batches(stale_after: float = JOB_STALE_AFTER) -> int:
+    """Requeue running batches whose worker stopped heartbeating; returns how many
+
+    The rerun reuses the batch's items and skips those already done. After
+    JOB_MAX_ATTEMPTS runs the batch and its unfinished items fail instead.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=stale_after)
+    stale = GenerationBatch.objects.filter(status=GenerationJob.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    recovered = 0
+    for batch in stale:
+        # Conditional on the heartbeat we saw, in case the worker comes back to life
+        still_stale = GenerationBatch.objects.filter(
+            pk=batch.pk, status=GenerationJob.STATUS_RUNNING, heartbeat_at=batch.heartbeat_at,
+        )
+        unfinished = batch.jobs.exclude(status=GenerationJob.STATUS_DONE)
+        if batch.attempts >= JOB_MAX_ATTEMPTS:
+            if still_stale.update(status=GenerationJob.STATUS_FAILED, error=STALE_JOB_ERROR, finished_at=now):
+                unfinished.update(status=GenerationJob.STATUS_FAILED, error=STALE_JOB_ERROR, finished_at=now)
+                logger.warning(f"Batch {batch.pk} failed: its worker stopped after {batch.attempts} attempt(s)")
+                recovered += 1
+        elif still_stale.update(status=GenerationJob.STATUS_QUEUED, started_at=None, heartbeat_at=None):
+            unfinished.filter(status=GenerationJob.STATUS_RUNNING).update(
+                status=GenerationJob.STATUS_QUEUED, started_at=None, progress={},
+            )
+            logger.warning(f"Requeued batch {batch.pk}: its worker stopped responding")
+            recovered += 1
+    return recovered
+
+
+def _create_items(batch: GenerationBatch) -> List[GenerationJob]:
+    """One GenerationJob per video; re-running a batch reuses its existing items"""
+    existing = list(batch.jobs.order_by('pk'))
+    if existing:
+        return [item for item in existing if item.status != GenerationJob.STATUS_DONE]
+    urls = expand_sources(batch.sources)
+    GenerationJob.objects.bulk_create([
+        GenerationJob(
+            youtube_url=url,
+            video_id=extract_video_id(url) or '',
+            author=batch.author,
+            regenerate=batch.regenerate,
+            batch=batch,
+        )
+        for url in urls
+    ])
+    # Re-read so every item has its primary key on all database backends
+    return list(batch.jobs.order_by('pk'))
+
+
+class _PostWriter:
+    """Collects the posts of finished items and bulk-writes them `size` at a time"""
+
+    def __init__(self, size: int = BATCH_WRITE_SIZE):
+        self.size = max(1, size)
+        self._pending: List[Tuple[GenerationJob, BlogPost]] = []
+        self._lock = threading.Lock()
+
+    def add(self, item: GenerationJob, post: BlogPost) -> None:
+        with self._lock:
+            self._pending.append((item, post))
+            if len(self._pending) < self.size:
+                return
+            pending, self._pending = self._pending, []
+        self._write(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self._write(pending)
+
+    def _write(self, pending: List[Tuple[GenerationJob, BlogPost]]) -> None:
+        items = [item for item, _ in pending]
+        posts = [post for _, post in pending]
+        for post in posts:
+            # bulk_create skips save(), which fills these in
+            post.refresh_derived_fields()
+        try:
+            with transaction.atomic():
+                posts = BlogPost.objects.bulk_create(posts)
+                finished_at = timezone.now()
+                for item, post in zip(items, posts):
+                    item.blog_post = post
+                    item.status = GenerationJob.STATUS_DONE
+                    item.finished_at = finished_at
+                GenerationJob.objects.bulk_update(items, ['blog_post', 'status', 'finished_at'])
+        except Exception as e:
+            logger.error(f"Could not save {len(items)} batch post(s): {e}", exc_info=True)
+            for item in items:
+                mark_job_failed(item, f'An error occurred: {str(e)}')
+            return
+        # bulk_create sends no post_save, so refresh the cached listings here
+        for author_id in {post.author_id for post in posts}:
+            page_cache.touch_listing(author_id)
+
+
+def run_batch(batch: GenerationBatch, max_workers: int = BATCH_WORKERS, generator=None,
+              on_item: Optional[Callable[[GenerationJob, dict], None]] = None,
+              write_size: int = BATCH_WRITE_SIZE) -> GenerationBatch:
+    """Process every unfinished video of a claimed batch, bulk-writing posts as they finish"""
+    from .blog_generator import get_generator
+
+    if generator is None:
+        generator = get_generator()
+
+    with Heartbeat(GenerationBatch, batch.pk):
+        try:
+            items = _create_items(batch)
+        except Exception as e:
+            logger.error(f"Could not prepare batch {batch.pk}: {e}", exc_info=True)
+            batch.status = GenerationJob.STATUS_FAILED
+            batch.error = f'An error occurred: {str(e)}'
+            batch.finished_at = timezone.now()
+            batch.save(update_fields=['status', 'error', 'finished_at'])
+            return batch
+
+        logger.info(f"Running generation batch {batch.pk}: {len(items)} video(s), workers={max_workers}")
+        writer = _PostWriter(write_size)
+
+        def work(item: GenerationJob) -> None:
+            try:
+                GenerationJob.objects.filter(pk=item.pk).update(
+                    status=GenerationJob.STATUS_RUNNING,
+                    started_at=timezone.now(),
+                )
+                try:
+                    result = generator.process_youtube_video(
+                        item.youtube_url,
+                        on_progress=JobProgressReporter(item),
+                        regenerate=item.regenerate,
+                    )
+                except Exception as e:
+                    logger.error(f"Exception in batch {batch.pk} item {item.pk}: {e}", exc_info=True)
+                    result = {'success': False, 'error': f'An error occurred: {str(e)}'}
+
+                if result.get('success'):
+                    GenerationJob.objects.filter(pk=item.pk).update(progress={'stage': 'saving'})
+                    writer.add(item, build_blog_post(item, result))
+                else:
+                    mark_job_failed(item, result.get('error') or 'Failed to generate blog post.')
+                if on_item is not None:
+                    on_item(item, result)
+            finally:
+                # Pool threads aren't request threads; don't leak their connections
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='batch') as pool:
+            # Results aren't kept; each item's post is already with the writer
+            for _ in pool.map(work, items):
+                pass
+        writer.flush()
+
+    # Count from the database: a rerun only processes the items left unfinished
+    total = batch.jobs.count()
+    done = batch.jobs.filter(status=GenerationJob.STATUS_DONE).count()
+    batch.status = GenerationJob.STATUS_DONE if done or not total else GenerationJob.STATUS_FAILED
+    if not done and total:
+        batch.error = 'No video in the batch could be processed.'
+    batch.finished_at = timezone.now()
+    batch.save(update_fields=['status', 'error', 'finished_at'])
+    logger.info(f"Batch {batch.pk} finished: {done}/{total} video(s) succeeded")
+    return batch
+
+
+def batch_summary(batch: GenerationBatch) -> dict:
+    """Batch status with per-item progress (for the API and the management command)"""
+    items = []
+    for item in batch.jobs.order_by('pk'):
+        entry = {
+            'job_id': item.pk,
+            'youtube_url': item.youtube_url,
+            'status': item.status,
+            'stage': (item.progress or {}).get('stage'),
+            'blog_id': item.blog_post_id,
+        }
+        if item.status == GenerationJob.STATUS_DONE and item.blog_post_id:
+            entry['redirect_url'] = f'/blog-details/{item.blog_post_id}/'
+        if item.status == GenerationJob.STATUS_FAILED:
+            entry['error'] = item.error
+        items.append(entry)
+    counts = {}
+    for entry in items:
+        counts[entry['status']] = counts.get(entry['status'], 0) + 1
+    return {
+        'batch_id': batch.pk,
+        'status': batch.status,
+        'error': batch.error or None,
+        'total': len(items),
+        'counts': counts,
+        'items': items,
+    }
@@ -2,12 +2,35 @@
 YouTube Video Transcription and Blog Generation Module
 """
 import os
-import tempfile
+import copy
+import asyncio
 import re
 import logging
-from typing import Dict, Optional
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
+from asgiref.sync import sync_to_async
+
+from .assemblyai import ASSEMBLYAI_BASE_URL, wait_for_transcript, webhook_request_fields
+from .async_providers import AsyncProviderClient
+from .audio_chunking import probe_duration, transcribe_in_chunks
+from .audio_streaming import TRANSCRIPTION_STREAMING, transcribe_stream
+from .ffmpeg_tools import ensure_ffmpeg_on_path, get_ffmpeg_tools
+from .llm_cache import llm_cache, make_cache_key
+from .llm_router import LLMCall, llm_router
+from .scratch_space import estimate_job_bytes, scratch_space
+from .summarization import (
+    SUMMARY_MAX_TOKENS, SUMMARY_TOKENIZER_MODEL, TRANSCRIPT_DIRECT_TOKENS, map_reduce_summary,
+)
+from .token_budget import (
+    MODEL_LIMITS, count_tokens_uncached, input_budget, output_budget, tail_tokens, truncate_to_tokens,
+)
+from .transcript_cache import TRANSCRIPT_CACHE_ENABLED, transcript_cache
+from .transcription_race import arace_providers, race_providers
+from .video_metadata import extract_video_id, video_metadata_cache
+from .whisper_models import DEFAULT_WHISPER_MODEL, whisper_registry
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -60,6 +83,27 @@ except ImportError:
         print("Warning: google-genai not installed. Install with: pip install google-genai (for Gemini)")
 
 
+# Connection pool size per provider (HTTP keep-alive connections shared by all threads)
+PROVIDER_POOL_SIZE = int(os.environ.get('PROVIDER_POOL_SIZE', '10'))
+PROVIDER_HTTP_TIMEOUT = float(os.environ.get('PROVIDER_HTTP_TIMEOUT', '300'))
+
+# Sample rate all extracted audio is normalized to (what Whisper and Google Speech expect)
+AUDIO_SAMPLE_RATE = 16000
+
+# Blog output budget (capped per model by token_budget.py) and compact continuation
+BLOG_OUTPUT_TOKENS = int(os.environ.get('BLOG_OUTPUT_TOKENS', '5000'))
+CONTINUATION_MAX_TOKENS = int(os.environ.get('CONTINUATION_MAX_TOKENS', '1500'))
+CONTINUATION_TAIL_TOKENS = int(os.environ.get('CONTINUATION_TAIL_TOKENS', '300'))
+
+# Blog generation models; bump BLOG_PROMPT_VERSION whenever the prompt changes (cache key)
+GROQ_MODEL = "llama-3.1-70b-versatile"  # or "mixtral-8x7b-32768"
+GEMINI_MODEL = 'gemini-pro'
+OPENAI_MODEL = "gpt-3.5-turbo"
+LLM_PROVIDER_MODELS = {'groq': GROQ_MODEL, 'gemini': GEMINI_MODEL, 'openai': OPENAI_MODEL}
+BLOG_TEMPERATURE = 0.7
+BLOG_PROMPT_VERSION = '2'
+
+
 class YouTubeBlogGenerator:
     """Generate blog posts from YouTube videos"""
     
@@ -126,100 +170,207 @@ class YouTubeBlogGenerator:
                 self.transcription_provider,
             )
             self.transcription_provider = 'auto'
+
+        # How "auto" combines providers: "race" (hedged, see transcription_race.py) or "sequential"
+        self.auto_strategy = os.environ.get('TRANSCRIPTION_AUTO_STRATEGY', 'race').strip().lower()
+
+        # Local Whisper model size (see whisper_models.py)
+        self.whisper_model_name = DEFAULT_WHISPER_MODEL
+
+        # Stream download -> ffmpeg -> Whisper instead of writing a WAV file first
+        self.streaming_enabled = TRANSCRIPTION_STREAMING
+
+        # Extracted audio format: "auto" (default), "wav" (16 kHz mono PCM) or "opus"
+        self.audio_output_format = os.environ.get('AUDIO_OUTPUT_FORMAT', 'auto').strip().lower()
         
-        # Initialize OpenAI client if API key is available
-        self.openai_client = None
-        if self.openai_api_key and OpenAI:
-            try:
-                self.openai_client = OpenAI(api_key=self.openai_api_key)
-            except Exception as e:
-                print(f"Warning: Could not initialize OpenAI client: {e}")
+        # Clients are created lazily on first use and shared by all threads
+        self._clients: Dict[str, any] = {}
+        self._sessions: Dict[str, any] = {}
+        self._client_lock = threading.Lock()
+    
+    def _lazy_client(self, name: str, factory):
+        """Create a client once (thread-safe); failures are remembered as None"""
+        if name in self._clients:
+            return self._clients[name]
+        with self._client_lock:
+            if name not in self._clients:
+                try:
+                    self._clients[name] = factory()
+                except Exception as e:
+                    print(f"Warning: Could not initialize {name} client: {e}")
+                    self._clients[name] = None
+            return self._clients[name]
+    
+    def _pooled_http_client(self):
+        """httpx client with a bounded keep-alive pool for OpenAI-compatible SDK clients"""
+        try:
+            import httpx
+        except ImportError:
+            return None
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=PROVIDER_POOL_SIZE,
+                max_keepalive_connections=PROVIDER_POOL_SIZE,
+            ),
+            timeout=httpx.Timeout(PROVIDER_HTTP_TIMEOUT, connect=10.0),
+        )
+    
+    def _openai_compatible_client(self, api_key: str, base_url: Optional[str] = None):
+        kwargs = {'api_key': api_key}
+        if base_url:
+            kwargs['base_url'] = base_url
+        http_client = self._pooled_http_client()
+        if http_client is not None:
+            kwargs['http_client'] = http_client
+        return OpenAI(**kwargs)
+    
+    @property
+    def openai_client(self):
+        """OpenAI client (paid), or None when no API key is configured"""
+        if not (self.openai_api_key and OpenAI):
+            return None
+        return self._lazy_client('OpenAI', lambda: self._openai_compatible_client(self.openai_api_key))
+    
+    @property
+    def groq_client(self):
+        """Groq client (FREE alternative, OpenAI-compatible API)"""
+        if not (self.groq_api_key and OpenAI):
+            return None
+        return self._lazy_client('Groq', lambda: self._openai_compatible_client(
+            self.groq_api_key,
+            base_url="https://api.groq.com/openai/v1",
+        ))
+    
+    @property
+    def gemini_client(self):
+        """Gemini client (FREE alternative)"""
+        if not (self.gemini_api_key and genai):
+            return None
         
-        # Initialize Groq client (FREE alternative)
-        self.groq_client = None
-        if self.groq_api_key and OpenAI:  # Groq uses OpenAI-compatible API
-            try:
-                self.groq_client = OpenAI(
-                    api_key=self.groq_api_key,
-                    base_url="https://api.groq.com/openai/v1"
-                )
-            except Exception as e:
-                print(f"Warning: Could not initialize Groq client: {e}")
+        def create():
+            # Try new API first
+            if hasattr(genai, 'Client'):
+                return genai.Client(api_key=self.gemini_api_key)
+            # Fallback to deprecated API
+            genai.configure(api_key=self.gemini_api_key)
+            return genai.GenerativeModel('gemini-pro')
         
-        # Initialize Gemini client (FREE alternative)
-        self.gemini_client = None
-        if self.gemini_api_key and genai:
-            try:
-                # Try new API first
-                if hasattr(genai, 'Client'):
-                    self.gemini_client = genai.Client(api_key=self.gemini_api_key)
-                else:
-                    # Fallback to deprecated API
-                    genai.configure(api_key=self.gemini_api_key)
-                    self.gemini_client = genai.GenerativeModel('gemini-pro')
-            except Exception as e:
-                print(f"Warning: Could not initialize Gemini client: {e}")
+        return self._lazy_client('Gemini', create)
+    
+    @property
+    def speech_client(self):
+        """Google Speech client if credentials are available"""
+        if not (self.google_credentials_path and speech and service_account):
+            return None
+        if not os.path.exists(self.google_credentials_path):
+            return None
         
-        # Initialize Google Speech client if credentials are available
-        self.speech_client = None
-        if self.google_credentials_path and os.path.exists(self.google_credentials_path) and speech and service_account:
-            try:
-                credentials = service_account.Credentials.from_service_account_file(
-                    self.google_credentials_path
+        def create():
+            credentials = service_account.Credentials.from_service_account_file(
+                self.google_credentials_path
+            )
+            return speech.SpeechClient(credentials=credentials)
+        
+        return self._lazy_client('Google Speech', create)
+    
+    def _http_session(self, provider: str):
+        """Shared keep-alive requests.Session per provider, with retries"""
+        session = self._sessions.get(provider)
+        if session is not None:
+            return session
+        with self._client_lock:
+            if provider not in self._sessions:
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                session = requests.Session()
+                retries = Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["POST", "GET"],
                 )
-                self.speech_client = speech.SpeechClient(credentials=credentials)
-            except Exception as e:
-                print(f"Warning: Could not initialize Google Speech client: {e}")
+                adapter = HTTPAdapter(
+                    pool_connections=PROVIDER_POOL_SIZE,
+                    pool_maxsize=PROVIDER_POOL_SIZE,
+                    max_retries=retries,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[provider] = session
+            return self._sessions[provider]
+    
+    @property
+    def async_providers(self) -> AsyncProviderClient:
+        """asyncio provider client (see async_providers.py) with this generator's API keys"""
+        return self._lazy_client('Async providers', lambda: AsyncProviderClient(
+            assemblyai_api_key=self.assemblyai_api_key,
+            deepgram_api_key=self.deepgram_api_key,
+            groq_api_key=self.groq_api_key,
+            gemini_api_key=self.gemini_api_key,
+            openai_api_key=self.openai_api_key,
+        ))
     
     def extract_video_id(self, youtube_url: str) -> Optional[str]:
         """Extract video ID from YouTube URL"""
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/watch\?.*v=([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, youtube_url)
-            if match:
-                return match.group(1)
-        return None
+        return extract_video_id(youtube_url)
     
-    def get_video_info(self, youtube_url: str) -> Dict[str, str]:
-        """Get video information (title, channel, duration) from YouTube"""
+    def _base_ydl_opts(self) -> Dict[str, any]:
+        """yt-dlp options shared by metadata extraction and download"""
+        return {
+            'format': 'bestaudio/best',
+            'quiet': True,
+            'no_warnings': True,
+            # Bypass YouTube bot detection
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'extractor_args': {
+                'youtube': {
+                    'player_client': ['android', 'web'],  # Use Android client (less bot detection)
+                }
+            },
+        }
+    
+    def extract_video_info(self, youtube_url: str) -> Optional[dict]:
+        """Run one yt-dlp extraction (cached by video id) and return the info dict"""
         if not yt_dlp:
             print("Error: yt-dlp is not installed. Please install it with: pip install yt-dlp")
-            return {}
+            return None
         
         video_id = self.extract_video_id(youtube_url)
         if not video_id:
-            return {}
+            return None
+        
+        info = video_metadata_cache.get(video_id)
+        if info is not None:
+            logger.info(f"Using cached video metadata for {video_id}")
+            return info
         
         try:
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-                # Bypass YouTube bot detection
-                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['android', 'web'],  # Use Android client (less bot detection)
-                    }
-                },
-            }
+            ydl_opts = self._base_ydl_opts()
+            ydl_opts['extract_flat'] = False
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(youtube_url, download=False)
-                
-                return {
-                    'title': info.get('title', ''),
-                    'channel': info.get('uploader', ''),
-                    'duration': self._format_duration(info.get('duration', 0)),
-                    'description': info.get('description', '')[:500],  # First 500 chars
-                }
+                info = ydl.sanitize_info(ydl.extract_info(youtube_url, download=False))
+            
+            video_metadata_cache.set(video_id, info)
+            return info
         except Exception as e:
             print(f"Error getting video info: {e}")
+            return None
+    
+    def get_video_info(self, youtube_url: str, info: Optional[dict] = None) -> Dict[str, str]:
+        """Get video information (title, channel, duration) from YouTube"""
+        if info is None:
+            info = self.extract_video_info(youtube_url)
+        if not info:
             return {}
+        
+        return {
+            'title': info.get('title', ''),
+            'channel': info.get('uploader', ''),
+            'duration': self._format_duration(info.get('duration', 0)),
+            'description': (info.get('description') or '')[:500],  # First 500 chars
+        }
     
     def _format_duration(self, seconds: int) -> str:
         """Format duration in seconds to MM:SS or HH:MM:SS"""
@@ -234,77 +385,56 @@ class YouTubeBlogGenerator:
             return f"{hours}:{minutes:02d}:{secs:02d}"
         return f"{minutes}:{secs:02d}"
     
-    def download_audio(self, youtube_url: str) -> Optional[str]:
-        """Download audio from YouTube video and return temporary file path"""
+    def _audio_output_format(self) -> str:
+        """Pick the extraction format: 16 kHz mono WAV for local decoding, Opus for uploads"""
+        if self.audio_output_format == 'opus' or self.audio_output_format == 'auto':
+            if not get_ffmpeg_tools().supports_opus:
+                return 'wav'  # This FFmpeg build can't encode Opus
+        if self.audio_output_format in ('wav', 'opus'):
+            return self.audio_output_format
+        # auto: local Whisper/Google want PCM, API providers benefit from small uploads
+        if self.transcription_provider == 'whisper':
+            return 'wav'
+        if self.transcription_provider in ('assemblyai', 'deepgram'):
+            return 'opus'
+        return 'wav' if whisper_module_available or self.speech_client else 'opus'
+    
+    def _audio_normalization_opts(self) -> Dict[str, any]:
+        """yt-dlp post-processing that resamples to 16 kHz mono at extraction time"""
+        output_format = self._audio_output_format()
+        if output_format == 'opus':
+            postprocessor = {'key': 'FFmpegExtractAudio', 'preferredcodec': 'opus', 'preferredquality': '32'}
+        else:
+            postprocessor = {'key': 'FFmpegExtractAudio', 'preferredcodec': 'wav'}
+        logger.info(f"Extracting audio as 16 kHz mono {output_format}")
+        return {
+            'postprocessors': [postprocessor],
+            'postprocessor_args': {'extractaudio': ['-ac', '1', '-ar', str(AUDIO_SAMPLE_RATE)]},
+        }
+    
+    def download_audio(self, youtube_url: str, info: Optional[dict] = None,
+                       output_dir: Optional[str] = None) -> Optional[str]:
+        """Download audio from YouTube video and return temporary file path
+
+        Pass the info dict from extract_video_info() to download without a
+        second extraction round trip, and a scratch_space job directory as
+        output_dir so every file the download leaves behind is cleaned up.
+        """
         if not yt_dlp:
             print("Error: yt-dlp is not installed. Please install it with: pip install yt-dlp")
             return None
         
+        if info is None:
+            info = self.extract_video_info(youtube_url)
+        
         try:
-            # Create temporary directory for audio
-            temp_dir = tempfile.mkdtemp()
+            # Directory for audio (standalone calls get one the scratch reaper cleans up)
+            temp_dir = output_dir or scratch_space.create_dir('download')
             temp_filename = 'audio'
             
-            # Check if FFmpeg is available
-            import shutil
-            import subprocess
-            
-            # Try multiple methods to find FFmpeg and ffprobe
-            ffmpeg_available = False
-            ffmpeg_path = None
-            ffprobe_path = None
-            
-            # Method 1: Check PATH
-            ffmpeg_path = shutil.which('ffmpeg')
-            ffprobe_path = shutil.which('ffprobe')
-            if ffmpeg_path and ffprobe_path:
-                ffmpeg_available = True
-                logger.info(f"FFmpeg found in PATH: {ffmpeg_path}")
-            else:
-                # Method 2: Check common installation locations on Windows
-                common_paths = [
-                    r'C:\ffmpeg\bin\ffmpeg.exe',
-                    r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-                    r'C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe',
-                    os.path.expanduser(r'~\ffmpeg\bin\ffmpeg.exe'),
-                    r'C:\tools\ffmpeg\bin\ffmpeg.exe',
-                    # WinGet Links location (common for WinGet installations)
-                    os.path.expanduser(r'~\AppData\Local\Microsoft\WinGet\Links\ffmpeg.exe'),
-                ]
-                
-                # Also search WindowsApps (Windows Store apps that bundle FFmpeg)
-                try:
-                    import glob
-                    windowsapps_pattern = r'C:\Program Files\WindowsApps\*\*\*\ffmpeg.exe'
-                    windowsapps_matches = glob.glob(windowsapps_pattern)
-                    if windowsapps_matches:
-                        common_paths.extend(windowsapps_matches[:3])  # Limit to first 3 matches
-                except:
-                    pass
-                
-                for path in common_paths:
-                    if os.path.exists(path):
-                        # Check if ffprobe exists in the same directory
-                        probe_path = path.replace('ffmpeg.exe', 'ffprobe.exe')
-                        if os.path.exists(probe_path):
-                            ffmpeg_path = path
-                            ffprobe_path = probe_path
-                            ffmpeg_available = True
-                            logger.info(f"FFmpeg found at: {ffmpeg_path}")
-                            logger.info(f"FFprobe found at: {ffprobe_path}")
-                            break
-                        # Also check bin directory
-                        bin_dir = os.path.dirname(path)
-                        probe_path2 = os.path.join(bin_dir, 'ffprobe.exe')
-                        if os.path.exists(probe_path2):
-                            ffmpeg_path = path
-                            ffprobe_path = probe_path2
-                            ffmpeg_available = True
-                            logger.info(f"FFmpeg found at: {ffmpeg_path}")
-                            logger.info(f"FFprobe found at: {ffprobe_path}")
-                            break
-            
-            if not ffmpeg_available:
+            # FFmpeg/ffprobe are resolved once per process (see ffmpeg_tools.py)
+            tools = get_ffmpeg_tools()
+            if not tools.available:
                 logger.warning("FFmpeg/ffprobe not found. Audio will be downloaded in original format.")
                 logger.warning("To enable WAV conversion, install FFmpeg: choco install ffmpeg OR winget install ffmpeg")
             
@@ -322,44 +452,18 @@ class YouTubeBlogGenerator:
             
             null_writer = NullWriter()
             
-            # Prepare yt-dlp options
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'outtmpl': os.path.join(temp_dir, f'{temp_filename}.%(ext)s'),
-                'quiet': True,  # Suppress output to avoid Windows encoding issues
-                'no_warnings': True,
-                'noprogress': True,
-                # Bypass YouTube bot detection
-                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['android', 'web'],  # Use Android client (less bot detection)
-                    }
-                },
-            }
+            # Prepare yt-dlp options (quiet output avoids Windows encoding issues)
+            ydl_opts = self._base_ydl_opts()
+            ydl_opts['outtmpl'] = os.path.join(temp_dir, f'{temp_filename}.%(ext)s')
+            ydl_opts['noprogress'] = True
             
             # If FFmpeg is available, add post-processing and location
-            if ffmpeg_available and ffmpeg_path and ffprobe_path:
-                ydl_opts['postprocessors'] = [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'wav',
-                    'preferredquality': '192',
-                }]
+            if tools.available:
+                ydl_opts.update(self._audio_normalization_opts())
                 
                 # Set FFmpeg location (yt-dlp needs the directory containing ffmpeg.exe and ffprobe.exe)
-                ffmpeg_dir = os.path.dirname(ffmpeg_path)
-                ydl_opts['ffmpeg_location'] = ffmpeg_dir
-                logger.info(f"Using FFmpeg from directory: {ffmpeg_dir}")
-                logger.info(f"  FFmpeg: {ffmpeg_path}")
-                logger.info(f"  FFprobe: {ffprobe_path}")
-            elif ffmpeg_available and shutil.which('ffmpeg') and shutil.which('ffprobe'):
-                # FFmpeg is in PATH
-                ydl_opts['postprocessors'] = [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'wav',
-                    'preferredquality': '192',
-                }]
-                logger.info("Using FFmpeg from PATH")
+                ydl_opts['ffmpeg_location'] = tools.directory
+                logger.info(f"Using FFmpeg from directory: {tools.directory}")
             else:
                 # FFmpeg not available, download without conversion
                 logger.info("FFmpeg/ffprobe not available, downloading in original format")
@@ -373,7 +477,11 @@ class YouTubeBlogGenerator:
                 
                 logger.info(f"Downloading audio to: {temp_dir}")
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([youtube_url])
+                    if info:
+                        # Reuse the extracted info dict instead of extracting again
+                        ydl.process_ie_result(copy.deepcopy(info), download=True)
+                    else:
+                        ydl.download([youtube_url])
             finally:
                 # Restore stdout/stderr
                 sys.stdout = old_stdout
@@ -384,7 +492,7 @@ class YouTubeBlogGenerator:
             base_path = os.path.join(temp_dir, temp_filename)
             
             # Check for various possible extensions (WAV first if FFmpeg was used)
-            extensions = ['.wav', '.webm', '.m4a', '.mp3', '.opus', '.ogg']
+            extensions = ['.wav', '.opus', '.webm', '.m4a', '.mp3', '.ogg']
             for ext in extensions:
                 test_path = base_path + ext
                 if os.path.exists(test_path):
@@ -429,11 +537,18 @@ class YouTubeBlogGenerator:
             with open(audio_file_path, 'rb') as audio_file:
                 content = audio_file.read()
             
+            # Audio is normalized to 16 kHz mono at extraction time
+            if audio_file_path.endswith(('.opus', '.ogg')):
+                encoding = speech.RecognitionConfig.AudioEncoding.OGG_OPUS
+            else:
+                encoding = speech.RecognitionConfig.AudioEncoding.LINEAR16
+            
             # Configure recognition
             audio = speech.RecognitionAudio(content=content)
             config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
+                encoding=encoding,
+                sample_rate_hertz=AUDIO_SAMPLE_RATE,
+                audio_channel_count=1,
                 language_code='en-US',
                 enable_automatic_punctuation=True,
                 enable_word_time_offsets=False,
@@ -468,62 +583,31 @@ class YouTubeBlogGenerator:
             return None
         
         try:
-            # Whisper uses FFmpeg internally via subprocess
-            # We need to ensure FFmpeg is accessible to Whisper
-            import os
-            import shutil
-            
-            # Find FFmpeg for Whisper
-            ffmpeg_for_whisper = None
-            
-            # Check PATH first
-            ffmpeg_path = shutil.which('ffmpeg')
-            if ffmpeg_path:
-                ffmpeg_for_whisper = ffmpeg_path
-                logger.info(f"Whisper will use FFmpeg from PATH: {ffmpeg_for_whisper}")
-            else:
-                # Check common locations (same as download_audio uses)
-                common_paths = [
-                    r'C:\ffmpeg\bin\ffmpeg.exe',
-                    r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-                    r'C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe',
-                    os.path.expanduser(r'~\ffmpeg\bin\ffmpeg.exe'),
-                    r'C:\tools\ffmpeg\bin\ffmpeg.exe',
-                    os.path.expanduser(r'~\AppData\Local\Microsoft\WinGet\Links\ffmpeg.exe'),
-                ]
-                
-                # Also check WindowsApps
-                try:
-                    import glob
-                    windowsapps_pattern = r'C:\Program Files\WindowsApps\*\*\*\ffmpeg.exe'
-                    windowsapps_matches = glob.glob(windowsapps_pattern)
-                    if windowsapps_matches:
-                        common_paths.extend(windowsapps_matches[:3])
-                except:
-                    pass
-                
-                for path in common_paths:
-                    if os.path.exists(path):
-                        ffmpeg_for_whisper = path
-                        ffmpeg_dir = os.path.dirname(path)
-                        # Add FFmpeg directory to PATH for this process
-                        current_path = os.environ.get('PATH', '')
-                        if ffmpeg_dir not in current_path:
-                            os.environ['PATH'] = ffmpeg_dir + os.pathsep + current_path
-                            logger.info(f"Added FFmpeg directory to PATH for Whisper: {ffmpeg_dir}")
-                        break
-            
-            if not ffmpeg_for_whisper:
+            # Whisper uses FFmpeg internally via subprocess,
+            # so the resolved FFmpeg directory must be on PATH
+            tools = get_ffmpeg_tools()
+            if not tools.ffmpeg_path:
                 logger.error("FFmpeg not found for Whisper. Whisper requires FFmpeg to load audio files.")
                 return None
+            ensure_ffmpeg_on_path(tools)
             
-            logger.info("Loading Whisper model (first time may take a moment)...")
-            # Use 'base' model for good balance of speed and accuracy
-            # Options: tiny (~75MB), base (~150MB), small (~500MB), medium (~1.5GB), large (~3GB)
-            model = whisper_module.load_model("base")
-            logger.info("Transcribing audio with local Whisper...")
-            result = model.transcribe(audio_file_path, language="en")
-            transcript_text = result.get("text", "")
+            # Long audio is split into chunks and transcribed across a process pool
+            try:
+                transcript_text = transcribe_in_chunks(
+                    audio_file_path,
+                    ffmpeg_path=tools.ffmpeg_path,
+                    whisper_model=self.whisper_model_name,
+                )
+            except Exception as e:
+                logger.warning(f"Chunked Whisper transcription failed, transcribing in one call: {e}",
+                               exc_info=True)
+                transcript_text = None
+            if transcript_text is None:
+                # Models are loaded once per process and shared between requests
+                with whisper_registry.use(self.whisper_model_name) as model:
+                    logger.info(f"Transcribing audio with local Whisper ({self.whisper_model_name})...")
+                    result = model.transcribe(audio_file_path, language="en")
+                transcript_text = result.get("text", "")
             if transcript_text:
                 logger.info(f"Whisper transcription completed. Length: {len(transcript_text)} characters")
             else:
@@ -541,6 +625,24 @@ class YouTubeBlogGenerator:
             logger.error(f"Error transcribing with local Whisper: {str(e)}\n{error_trace}")
             return None
     
+    def transcribe_audio_streaming(self, info: dict) -> Optional[str]:
+        """Transcribe while downloading: stream URL -> ffmpeg PCM -> local Whisper"""
+        if not whisper_module_available:
+            return None
+        tools = get_ffmpeg_tools()
+        if not tools.ffmpeg_path:
+            logger.warning("FFmpeg not found, streaming transcription disabled")
+            return None
+        ensure_ffmpeg_on_path(tools)
+        try:
+            transcript = transcribe_stream(info, tools.ffmpeg_path, self.whisper_model_name)
+            if transcript:
+                logger.info(f"Streaming transcription completed. Length: {len(transcript)} characters")
+            return transcript
+        except Exception as e:
+            logger.error(f"Streaming transcription failed, falling back to download: {e}", exc_info=True)
+            return None
+    
     def transcribe_audio_whisper_api(self, audio_file_path: str) -> Optional[str]:
         """Transcribe audio using OpenAI Whisper API (paid)"""
         if not self.openai_client:
@@ -558,28 +660,23 @@ class YouTubeBlogGenerator:
             print(f"Error transcribing with Whisper API: {e}")
             return None
     
-    def transcribe_audio_assemblyai(self, audio_file_path: str) -> Optional[str]:
-        """Transcribe audio using AssemblyAI (FREE tier: 5 hours/month)"""
+    def transcribe_audio_assemblyai(self, audio_file_path: str,
+                                    cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+        """Transcribe audio using AssemblyAI (FREE tier: 5 hours/month)
+
+        Completion comes from the webhook when ASSEMBLYAI_WEBHOOK_URL and
+        ASSEMBLYAI_WEBHOOK_SECRET are both set, otherwise from polling that
+        backs off with the audio duration. Waiting stops early when
+        cancel_event is set (another provider won).
+        """
         if not self.assemblyai_api_key or not requests:
             return None
         
         try:
-            from requests.adapters import HTTPAdapter
-            from urllib3.util.retry import Retry
-
-            session = requests.Session()
-            retries = Retry(
-                total=3,
-                backoff_factor=0.5,
-                status_forcelist=[429, 500, 502, 503, 504],
-                allowed_methods=["POST", "GET"],
-            )
-            adapter = HTTPAdapter(max_retries=retries)
-            session.mount("https://", adapter)
-            session.mount("http://", adapter)
+            session = self._http_session('assemblyai')
 
             # Upload audio file
-            upload_url = "https://api.assemblyai.com/v2/upload"
+            upload_url = f"{ASSEMBLYAI_BASE_URL}/v2/upload"
             headers = {"authorization": self.assemblyai_api_key}
             
             with open(audio_file_path, 'rb') as audio_file:
@@ -610,10 +707,12 @@ class YouTubeBlogGenerator:
                 return None
             
             # Start transcription
-            transcript_url = "https://api.assemblyai.com/v2/transcript"
+            transcript_url = f"{ASSEMBLYAI_BASE_URL}/v2/transcript"
+            webhook_fields = webhook_request_fields()
+            webhook_enabled = bool(webhook_fields)
             transcript_response = session.post(
                 transcript_url,
-                json={"audio_url": upload_url_response},
+                json={"audio_url": upload_url_response, **webhook_fields},
                 headers=headers,
                 timeout=20,
             )
@@ -636,36 +735,17 @@ class YouTubeBlogGenerator:
                 logger.error("AssemblyAI transcript request missing id.")
                 return None
             
-            # Poll for completion
-            while True:
-                status_response = session.get(
-                    f"{transcript_url}/{transcript_id}",
-                    headers=headers,
-                    timeout=20,
-                )
-                if not status_response.ok:
-                    logger.error(
-                        "AssemblyAI status poll failed: status=%s body=%s",
-                        status_response.status_code,
-                        status_response.text[:500],
-                    )
-                    return None
-                try:
-                    status = status_response.json().get('status')
-                except ValueError:
-                    logger.error(
-                        "AssemblyAI status poll returned non-JSON response: %s",
-                        status_response.text[:500],
-                    )
-                    return None
-                
-                if status == 'completed':
-                    return status_response.json().get('text')
-                elif status == 'error':
-                    return None
-                # Wait before polling again
-                import time
-                time.sleep(1)
+            # Wait for completion: webhook if configured, adaptive polling otherwise
+            audio_duration = probe_duration(audio_file_path, get_ffmpeg_tools().ffprobe_path)
+            data = wait_for_transcript(
+                session,
+                transcript_id,
+                headers,
+                audio_duration=audio_duration,
+                cancel_event=cancel_event,
+                use_webhook=webhook_enabled,
+            )
+            return data.get('text') if data else None
                 
         except Exception as e:
             print(f"Error transcribing with AssemblyAI: {e}")
@@ -683,23 +763,83 @@ class YouTubeBlogGenerator:
             }
             
             with open(audio_file_path, 'rb') as audio_file:
-                response = requests.post(url, headers=headers, files={"audio": audio_file})
+                response = self._http_session('deepgram').post(
+                    url,
+                    headers=headers,
+                    files={"audio": audio_file},
+                    timeout=PROVIDER_HTTP_TIMEOUT,
+                )
                 result = response.json()
                 return result.get('results', {}).get('channels', [{}])[0].get('alternatives', [{}])[0].get('transcript', '')
         except Exception as e:
             print(f"Error transcribing with Deepgram: {e}")
             return None
     
-    def generate_blog_post(self, transcript: str, video_info: Dict[str, str]) -> Dict[str, str]:
-        """Generate blog post from transcript - tries free APIs first, then paid"""
-        # Create prompt for blog generation
-        prompt = f"""You are a professional blog writer. Create a well-structured, engaging blog post based on the following video transcript.
+    def generate_blog_post(self, transcript: str, video_info: Dict[str, str],
+                           on_progress: Optional[Callable[[Dict[str, str]], None]] = None,
+                           regenerate: bool = False) -> Dict[str, str]:
+        """Generate blog post from transcript - tries free APIs first, then paid
+
+        on_progress, if given, receives the partially parsed post
+        (title/description/content found so far) while the model streams.
+        A cached response for the same transcript, video and model is reused
+        unless regenerate is set.
+        """
+        configured = [name for name, client in (('groq', self.groq_client), ('gemini', self.gemini_client),
+                                                 ('openai', self.openai_client)) if client]
+        cached, cache_keys = self._cached_blog_post(transcript, video_info, configured, on_progress, regenerate)
+        if cached:
+            return cached
+
+        system_prompt, prompt_for = self._blog_prompts(transcript, video_info, configured)
+        providers = self._llm_providers(system_prompt, prompt_for)
+
+        report = None
+        if on_progress is not None:
+            report = lambda text: on_progress(self._parse_partial_blog_response(text))
+        blog_text, provider = llm_router.generate(providers, on_progress=report)
+        return self._finish_blog_post(blog_text, provider, cache_keys, transcript, video_info)
+
+    def _cached_blog_post(self, transcript: str, video_info: Dict[str, str], configured,
+                          on_progress=None, regenerate: bool = False):
+        """(cached post or None, cache key per configured provider)"""
+        # Cache keys per configured model, in preference order (see llm_cache.py)
+        cache_keys = {}
+        if llm_cache.enabled:
+            for name in configured:
+                cache_keys[name] = make_cache_key(
+                    transcript, video_info.get('title', ''), video_info.get('channel', ''),
+                    LLM_PROVIDER_MODELS[name], BLOG_TEMPERATURE, BLOG_PROMPT_VERSION,
+                )
+        if not regenerate:
+            for name, key in cache_keys.items():
+                cached_text = llm_cache.get(key)
+                if cached_text:
+                    logger.info(f"LLM cache hit ({LLM_PROVIDER_MODELS[name]}), skipping generation")
+                    if on_progress is not None:
+                        on_progress(self._parse_partial_blog_response(cached_text))
+                    return self._parse_blog_response(cached_text, video_info), cache_keys
+        return None, cache_keys
+
+    @staticmethod
+    def _source_budget(model: str, fixed_text: str) -> int:
+        """Transcript tokens that fit a model's blog prompt next to fixed_text and the answer"""
+        budget = input_budget(model, BLOG_OUTPUT_TOKENS, fixed_text)
+        if model not in MODEL_LIMITS:
+            # Unknown context window: stay at the conservative default
+            budget = min(budget, TRANSCRIPT_DIRECT_TOKENS)
+        return budget
+
+    @staticmethod
+    def _blog_prompt_template(video_info: Dict[str, str], source_label: str) -> str:
+        """Blog prompt with a {source} placeholder for the transcript or its notes"""
+        return f"""You are a professional blog writer. Create a well-structured, engaging blog post based on the following video transcript.
 
 Video Title: {video_info.get('title', 'Unknown')}
 Video Channel: {video_info.get('channel', 'Unknown')}
 
-Transcript:
-{transcript[:12000]}  # Limit transcript length
+{source_label}:
+{{source}}
 
 Please create:
 1. A compelling title (max 100 characters)
@@ -718,81 +858,39 @@ CONTENT:
 
 Make it engaging, informative, and suitable for a blog audience."""
 
+    def _blog_prompts(self, transcript: str, video_info: Dict[str, str], configured: List[str]):
+        """(system prompt, fn(model) -> blog prompt sized for that model)"""
         system_prompt = "You are a professional blog writer who creates engaging, well-structured blog posts from video transcripts."
-        
-        # Try FREE Groq API first (very fast, free tier)
-        if self.groq_client:
-            try:
-                print("Generating blog post with Groq (FREE)...")
-                response = self.groq_client.chat.completions.create(
-                    model="llama-3.1-70b-versatile",  # or "mixtral-8x7b-32768"
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=3500,
-                    temperature=0.7,
-                )
-                blog_text = response.choices[0].message.content or ""
-                finish_reason = getattr(response.choices[0], "finish_reason", None)
-                if finish_reason == "length":
-                    continuation = self._continue_blog_post(
-                        client=self.groq_client,
-                        model="llama-3.1-70b-versatile",
-                        system_prompt=system_prompt,
-                        partial_text=blog_text,
-                    )
-                    blog_text = self._append_continuation(blog_text, continuation)
-                return self._parse_blog_response(blog_text, video_info)
-            except Exception as e:
-                print(f"Groq API error: {e}, trying next option...")
-        
-        # Try FREE Gemini API
-        if self.gemini_client:
-            try:
-                print("Generating blog post with Google Gemini (FREE)...")
-                # Handle both new and old API
-                if hasattr(self.gemini_client, 'models'):
-                    # New API
-                    model = self.gemini_client.models.generate_content(
-                        model='gemini-pro',
-                        contents=prompt
-                    )
-                    blog_text = model.text
-                else:
-                    # Old API
-                    response = self.gemini_client.generate_content(prompt)
-                    blog_text = response.text
-                return self._parse_blog_response(blog_text, video_info)
-            except Exception as e:
-                print(f"Gemini API error: {e}, trying next option...")
-        
-        # Try OpenAI (paid, but better quality)
-        if self.openai_client:
-            try:
-                print("Generating blog post with OpenAI...")
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=3500,
-                    temperature=0.7,
-                )
-                blog_text = response.choices[0].message.content or ""
-                finish_reason = getattr(response.choices[0], "finish_reason", None)
-                if finish_reason == "length":
-                    continuation = self._continue_blog_post(
-                        client=self.openai_client,
-                        model="gpt-3.5-turbo",
-                        system_prompt=system_prompt,
-                        partial_text=blog_text,
-                    )
-                    blog_text = self._append_continuation(blog_text, continuation)
-                return self._parse_blog_response(blog_text, video_info)
-            except Exception as e:
-                print(f"OpenAI API error: {e}")
+        source_label = 'Transcript'
+        source_text = transcript
+        prompt_template = self._blog_prompt_template(video_info, source_label)
+
+        # Long transcripts are condensed section by section first (see summarization.py);
+        # "long" means too long for the smallest context among the configured models
+        models = [LLM_PROVIDER_MODELS[name] for name in configured]
+        if models:
+            budget = min(self._source_budget(model, system_prompt + prompt_template) for model in models)
+            if count_tokens_uncached(transcript, SUMMARY_TOKENIZER_MODEL) > budget:
+                source_label = 'Transcript notes (summarized section by section, in order)'
+                source_text = map_reduce_summary(transcript, self._summarize_with_llm,
+                                                 title=video_info.get('title', 'Unknown'), target_tokens=budget)
+                prompt_template = self._blog_prompt_template(video_info, source_label)
+
+        def prompt_for(model: str) -> str:
+            # Trim the source to what this model's context leaves after the template and the answer
+            budget = self._source_budget(model, system_prompt + prompt_template)
+            return prompt_template.replace('{source}', truncate_to_tokens(source_text, budget, model))
+
+        return system_prompt, prompt_for
+
+    def _finish_blog_post(self, blog_text: Optional[str], provider: Optional[str], cache_keys: Dict[str, str],
+                          transcript: str, video_info: Dict[str, str]) -> Dict[str, str]:
+        """Cache and parse the winning response, or fall back to the transcript"""
+        if blog_text:
+            logger.info(f"Blog post generated by {provider}")
+            if provider in cache_keys:
+                llm_cache.set(cache_keys[provider], LLM_PROVIDER_MODELS[provider], blog_text)
+            return self._parse_blog_response(blog_text, video_info)
         
         # Fallback: return transcript as content
         return {
@@ -800,6 +898,116 @@ Make it engaging, informative, and suitable for a blog audience."""
             'description': 'A blog post generated from a YouTube video.',
             'content': transcript if transcript else 'Content generation requires an API key. Please set up Groq, Gemini, or OpenAI API.',
         }
+
+    def _llm_providers(self, system_prompt: str, prompt, max_tokens: int = BLOG_OUTPUT_TOKENS,
+                       allow_continuation: bool = True):
+        """(name, fn(call)) pairs for the configured LLMs, in preference order
+
+        prompt is a string or a function of the model name returning one
+        (to size the input for each model's context window).
+        """
+        # Free providers first (Groq, then Gemini), then OpenAI (paid, but better quality).
+        # The router adds deadlines, hedged requests and circuit breakers (see llm_router.py).
+        providers = []
+        if self.groq_client:
+            providers.append(('groq', lambda call: self._generate_with_chat_client(
+                self.groq_client, GROQ_MODEL, system_prompt, prompt, call,
+                max_tokens=max_tokens, allow_continuation=allow_continuation)))
+        if self.gemini_client:
+            providers.append(('gemini', lambda call: self._generate_with_gemini(
+                prompt(GEMINI_MODEL) if callable(prompt) else prompt, call)))
+        if self.openai_client:
+            providers.append(('openai', lambda call: self._generate_with_chat_client(
+                self.openai_client, OPENAI_MODEL, system_prompt, prompt, call,
+                max_tokens=max_tokens, allow_continuation=allow_continuation)))
+        return providers
+
+    def _summarize_with_llm(self, system_prompt: str, prompt: str, index: int) -> Optional[str]:
+        """Summarize one transcript chunk, spreading chunks round-robin over the providers"""
+        providers = self._llm_providers(system_prompt, prompt, max_tokens=SUMMARY_MAX_TOKENS,
+                                        allow_continuation=False)
+        if not providers:
+            return None
+        offset = index % len(providers)
+        # Other providers stay in the list as fallbacks; no hedging so concurrency stays bounded
+        text, _ = llm_router.generate(providers[offset:] + providers[:offset], hedge=False,
+                                     label=f"summary of chunk {index + 1}")
+        return text
+
+    def _stream_chat_completion(self, client, model: str, messages, max_tokens: int,
+                                call: LLMCall) -> Tuple[str, Optional[str]]:
+        """Stream a chat completion into the call within its deadline; returns (text, finish_reason)"""
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=BLOG_TEMPERATURE,
+            stream=True,
+            timeout=call.timeout(),
+        )
+        finish_reason = None
+        try:
+            for chunk in stream:
+                call.check()
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                call.add_text(choice.delta.content if choice.delta else None)
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+        finally:
+            # Closing the stream drops the connection when we stop early
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+        return call.text, finish_reason
+
+    def _generate_with_chat_client(self, client, model: str, system_prompt: str, prompt,
+                                   call: LLMCall, max_tokens: int = BLOG_OUTPUT_TOKENS,
+                                   allow_continuation: bool = True) -> str:
+        """Generate with an OpenAI-compatible client (Groq, OpenAI)"""
+        if callable(prompt):
+            prompt = prompt(model)
+        # Ask for as much output as the context window leaves, up to max_tokens
+        max_tokens = output_budget(model, system_prompt + prompt, desired=max_tokens)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        blog_text, finish_reason = self._stream_chat_completion(client, model, messages, max_tokens, call)
+        if finish_reason == "length" and allow_continuation:
+            call.check()
+            continuation = self._continue_blog_post(
+                client=client,
+                model=model,
+                system_prompt=system_prompt,
+                partial_text=blog_text,
+                timeout=call.timeout(),
+            )
+            if continuation:
+                call.add_text(f"\n{continuation.strip()}")
+            blog_text = call.text
+        return blog_text
+
+    def _generate_with_gemini(self, prompt: str, call: LLMCall) -> str:
+        """Generate with Gemini, streaming where the installed SDK supports it"""
+        # Handle both new and old API
+        if hasattr(self.gemini_client, 'models'):
+            # New API
+            models = self.gemini_client.models
+            if hasattr(models, 'generate_content_stream'):
+                chunks = models.generate_content_stream(model=GEMINI_MODEL, contents=prompt)
+            else:
+                chunks = [models.generate_content(model=GEMINI_MODEL, contents=prompt)]
+        else:
+            # Old API
+            chunks = self.gemini_client.generate_content(
+                prompt, stream=True, request_options={'timeout': call.timeout()},
+            )
+        for chunk in chunks:
+            call.check()
+            call.add_text(getattr(chunk, 'text', None))
+        return call.text
     
     def _parse_blog_response(self, blog_text: str, video_info: Dict[str, str]) -> Dict[str, str]:
         """Parse blog generation response"""
@@ -817,38 +1025,189 @@ Make it engaging, informative, and suitable for a blog audience."""
             'content': content,
         }
 
-    def _continue_blog_post(self, client, model: str, system_prompt: str, partial_text: str) -> Optional[str]:
-        """Request a continuation when the model output was cut off."""
+    def _parse_partial_blog_response(self, blog_text: str) -> Dict[str, str]:
+        """Parse a still-streaming response: only fields that are already complete
+
+        Title and description count as complete once the next line starts;
+        content is whatever has arrived after CONTENT: so far.
+        """
+        partial = {}
+        title_match = re.search(r'TITLE:\s*(.+?)(?:\n|DESCRIPTION:)', blog_text, re.IGNORECASE)
+        if title_match:
+            partial['title'] = title_match.group(1).strip()
+        desc_match = re.search(r'DESCRIPTION:\s*(.+?)(?:\n|CONTENT:)', blog_text, re.IGNORECASE)
+        if desc_match:
+            partial['description'] = desc_match.group(1).strip()
+        content_match = re.search(r'CONTENT:\s*(.*)$', blog_text, re.IGNORECASE | re.DOTALL)
+        if content_match:
+            partial['content'] = content_match.group(1).lstrip()
+        return partial
+
+    def _continuation_request(self, model: str, system_prompt: str, partial_text: str) -> Tuple[List[Dict], int]:
+        """(messages, max_tokens) asking the model to continue a cut-off post
+
+        Only the tail of the partial text (CONTINUATION_TAIL_TOKENS) is sent,
+        not the whole response.
+        """
+        tail = tail_tokens(partial_text, CONTINUATION_TAIL_TOKENS, model)
+        continuation_prompt = (
+            "A blog post was cut off. Continue ONLY the blog post content from exactly where it stops. "
+            "Do NOT repeat the title, description or the text below. Continue in the same style "
+            "and finish with a conclusion.\n\n"
+            "End of the text so far:\n"
+            f"...{tail}\n\n"
+            "CONTINUATION:"
+        )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": continuation_prompt},
+        ]
+        return messages, output_budget(model, system_prompt + continuation_prompt, desired=CONTINUATION_MAX_TOKENS)
+
+    def _continue_blog_post(self, client, model: str, system_prompt: str, partial_text: str,
+                            timeout: Optional[float] = None) -> Optional[str]:
+        """Request a continuation when the model output was cut off"""
         try:
-            continuation_prompt = (
-                "The response was cut off. Continue ONLY the blog post content from the last sentence. "
-                "Do NOT repeat the title or description. Continue in the same style.\n\n"
-                "Partial response:\n"
-                f"{partial_text}\n\n"
-                "CONTINUATION:"
-            )
+            messages, max_tokens = self._continuation_request(model, system_prompt, partial_text)
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": continuation_prompt},
-                ],
-                max_tokens=1500,
-                temperature=0.7,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=BLOG_TEMPERATURE,
+                timeout=timeout or PROVIDER_HTTP_TIMEOUT,
             )
             return response.choices[0].message.content
         except Exception as e:
             logger.warning(f"Continuation generation failed: {e}")
             return None
 
-    def _append_continuation(self, blog_text: str, continuation: Optional[str]) -> str:
-        """Append continuation text if present."""
-        if not continuation:
-            return blog_text
-        return f"{blog_text}\n{continuation.strip()}"
-    
-    def process_youtube_video(self, youtube_url: str) -> Dict[str, any]:
-        """Complete pipeline: Download, transcribe, and generate blog post"""
+    def transcribe_audio_file(self, audio_file: str) -> Tuple[Optional[str], Optional[str], str]:
+        """Transcribe with the configured provider(s); returns (transcript, provider, model)"""
+        logger.info("Transcribing audio... provider=%s", self.transcription_provider)
+        transcript = None
+        provider = None
+        model_name = ''
+
+        if self.transcription_provider == 'whisper':
+            logger.info("Using local Whisper (forced)...")
+            transcript = self.transcribe_audio_local_whisper(audio_file)
+            provider, model_name = 'whisper', self.whisper_model_name
+        elif self.transcription_provider == 'assemblyai':
+            logger.info("Using AssemblyAI (forced)...")
+            transcript = self._transcribe_with_chunking(audio_file, self.transcribe_audio_assemblyai)
+            provider = 'assemblyai'
+        elif self.transcription_provider == 'deepgram':
+            logger.info("Using Deepgram (forced)...")
+            transcript = self._transcribe_with_chunking(audio_file, self.transcribe_audio_deepgram)
+            provider = 'deepgram'
+        elif self.auto_strategy == 'race':
+            transcript, provider = race_providers(self._auto_transcription_providers(audio_file))
+            model_name = self._transcription_model_name(provider)
+        else:
+            # auto (sequential): try free options in order
+            try:
+                logger.info("Trying local Whisper (FREE, no API needed)...")
+                transcript = self.transcribe_audio_local_whisper(audio_file)
+                if transcript:
+                    logger.info("Whisper transcription successful. Length: %s characters", len(transcript))
+                    provider, model_name = 'whisper', self.whisper_model_name
+                else:
+                    logger.warning("Whisper transcription returned empty result")
+            except Exception as e:
+                logger.error(f"Error trying Whisper: {e}", exc_info=True)
+
+            if not transcript and self.assemblyai_api_key:
+                print("Trying AssemblyAI (FREE tier)...")
+                transcript = self._transcribe_with_chunking(audio_file, self.transcribe_audio_assemblyai)
+                provider = 'assemblyai'
+
+            if not transcript and self.deepgram_api_key:
+                print("Trying Deepgram (FREE tier)...")
+                transcript = self._transcribe_with_chunking(audio_file, self.transcribe_audio_deepgram)
+                provider = 'deepgram'
+
+        # Priority 4: Google Speech-to-Text (paid, but first 60 min/month free)
+        # (already part of the race in auto/race mode)
+        if not transcript and self.speech_client and not self._racing():
+            print("Trying Google Speech-to-Text...")
+            transcript = self.transcribe_audio(audio_file)
+            provider, model_name = 'google_speech', ''
+
+        # Priority 5: OpenAI Whisper API (paid)
+        if not transcript and self.openai_client and not self._racing():
+            print("Trying OpenAI Whisper API...")
+            transcript = self.transcribe_audio_whisper_api(audio_file)
+            provider, model_name = 'openai_whisper', 'whisper-1'
+
+        if not transcript:
+            return None, None, ''
+        return transcript, provider, model_name
+
+    def _racing(self) -> bool:
+        return self.transcription_provider == 'auto' and self.auto_strategy == 'race'
+
+    def _transcription_model_name(self, provider: Optional[str]) -> str:
+        return {'whisper': self.whisper_model_name, 'openai_whisper': 'whisper-1'}.get(provider, '')
+
+    def _auto_transcription_providers(self, audio_file: str):
+        """(name, fn(cancel_event)) pairs for every configured provider, in fallback order"""
+        providers = []
+        if whisper_module_available:
+            providers.append(('whisper', lambda cancel: self.transcribe_audio_local_whisper(audio_file)))
+        if self.assemblyai_api_key:
+            providers.append(('assemblyai', lambda cancel: self._transcribe_with_chunking(
+                audio_file, lambda path: self.transcribe_audio_assemblyai(path, cancel_event=cancel))))
+        if self.deepgram_api_key:
+            providers.append(('deepgram', lambda cancel: self._transcribe_with_chunking(
+                audio_file, self.transcribe_audio_deepgram)))
+        if self.speech_client:
+            providers.append(('google_speech', lambda cancel: self.transcribe_audio(audio_file)))
+        if self.openai_client:
+            providers.append(('openai_whisper', lambda cancel: self.transcribe_audio_whisper_api(audio_file)))
+        return providers
+
+    def _transcribe_with_chunking(self, audio_file: str, transcribe_fn) -> Optional[str]:
+        """Fan long audio out to an API provider as concurrent chunk requests"""
+        transcript = transcribe_in_chunks(audio_file, transcribe_fn=transcribe_fn)
+        if transcript is None:
+            transcript = transcribe_fn(audio_file)
+        return transcript
+
+    def _get_cached_transcript(self, video_id: Optional[str]) -> Optional[Dict[str, str]]:
+        """Look up a stored transcript for the video (never raises)"""
+        if not video_id or not TRANSCRIPT_CACHE_ENABLED:
+            return None
+        # Forced providers only reuse their own transcripts; auto accepts any
+        provider = None if self.transcription_provider == 'auto' else self.transcription_provider
+        model_name = self.whisper_model_name if provider == 'whisper' else None
+        try:
+            return transcript_cache.get(video_id, provider=provider, model_name=model_name)
+        except Exception as e:
+            logger.warning(f"Transcript cache lookup failed: {e}")
+            return None
+
+    def _store_cached_transcript(self, video_id: Optional[str], provider: str, model_name: str, transcript: str) -> None:
+        """Save a transcript for later requests (never raises)"""
+        if not video_id or not TRANSCRIPT_CACHE_ENABLED:
+            return
+        try:
+            transcript_cache.set(video_id, provider, model_name, transcript)
+        except Exception as e:
+            logger.warning(f"Transcript cache store failed: {e}")
+
+    def process_youtube_video(self, youtube_url: str,
+                              on_progress: Optional[Callable[[Dict[str, str]], None]] = None,
+                              regenerate: bool = False) -> Dict[str, any]:
+        """Complete pipeline: Download, transcribe, and generate blog post
+
+        on_progress, if given, receives {'stage': ...} as the pipeline moves
+        on, and the partial post while the blog text streams in.
+        regenerate bypasses the LLM response cache.
+        """
+        def report(stage: str, **fields) -> None:
+            if on_progress is not None:
+                on_progress(dict(fields, stage=stage))
+
         result = {
             'success': False,
             'error': None,
@@ -858,89 +1217,67 @@ Make it engaging, informative, and suitable for a blog audience."""
         }
         
         try:
-            # Step 1: Get video information
+            # Step 1: Get video information (one extraction feeds metadata and download)
             print("Fetching video information...")
-            video_info = self.get_video_info(youtube_url)
+            report('fetching')
+            info = self.extract_video_info(youtube_url)
+            video_info = self.get_video_info(youtube_url, info=info)
             result['video_info'] = video_info
             
             if not video_info:
                 result['error'] = 'Could not fetch video information. Please check the URL.'
                 return result
             
-            # Step 2: Download audio
-            print("Downloading audio...")
-            audio_file = self.download_audio(youtube_url)
-            
-            if not audio_file:
-                error_msg = 'Could not download audio from video. Check Django logs for details.'
-                logger.error(f"Audio download failed for URL: {youtube_url}")
-                result['error'] = error_msg
-                return result
+            # Reuse a stored transcript for videos we've seen before
+            video_id = self.extract_video_id(youtube_url)
+            cached = self._get_cached_transcript(video_id)
+            transcript = None
+            if cached:
+                transcript = cached['transcript']
+            elif self.streaming_enabled and info and self.transcription_provider in ('auto', 'whisper'):
+                # Stream audio straight into Whisper without an intermediate file
+                print("Streaming audio into Whisper...")
+                report('transcribing')
+                transcript = self.transcribe_audio_streaming(info)
+                if transcript:
+                    self._store_cached_transcript(video_id, 'whisper', self.whisper_model_name, transcript)
             
-            try:
-                # Step 3: Transcribe audio
-                logger.info("Transcribing audio... provider=%s", self.transcription_provider)
-                transcript = None
-
-                if self.transcription_provider == 'whisper':
-                    logger.info("Using local Whisper (forced)...")
-                    transcript = self.transcribe_audio_local_whisper(audio_file)
-                elif self.transcription_provider == 'assemblyai':
-                    logger.info("Using AssemblyAI (forced)...")
-                    transcript = self.transcribe_audio_assemblyai(audio_file)
-                elif self.transcription_provider == 'deepgram':
-                    logger.info("Using Deepgram (forced)...")
-                    transcript = self.transcribe_audio_deepgram(audio_file)
-                else:
-                    # auto: try free options in order
-                    try:
-                        logger.info("Trying local Whisper (FREE, no API needed)...")
-                        transcript = self.transcribe_audio_local_whisper(audio_file)
-                        if transcript:
-                            logger.info("Whisper transcription successful. Length: %s characters", len(transcript))
-                        else:
-                            logger.warning("Whisper transcription returned empty result")
-                    except Exception as e:
-                        logger.error(f"Error trying Whisper: {e}", exc_info=True)
-
-                    if not transcript and self.assemblyai_api_key:
-                        print("Trying AssemblyAI (FREE tier)...")
-                        transcript = self.transcribe_audio_assemblyai(audio_file)
-
-                    if not transcript and self.deepgram_api_key:
-                        print("Trying Deepgram (FREE tier)...")
-                        transcript = self.transcribe_audio_deepgram(audio_file)
-                
-                # Priority 4: Google Speech-to-Text (paid, but first 60 min/month free)
-                if not transcript and self.speech_client:
-                    print("Trying Google Speech-to-Text...")
-                    transcript = self.transcribe_audio(audio_file)
-                
-                # Priority 5: OpenAI Whisper API (paid)
-                if not transcript and self.openai_client:
-                    print("Trying OpenAI Whisper API...")
-                    transcript = self.transcribe_audio_whisper_api(audio_file)
+            if not transcript:
+                report('transcribing')
+                # Per-job scratch directory, removed with everything in it afterwards
+                with scratch_space.job_dir(reserve_bytes=estimate_job_bytes(info)) as job_dir:
+                    # Step 2: Download audio
+                    print("Downloading audio...")
+                    audio_file = self.download_audio(youtube_url, info=info, output_dir=job_dir)
+                    
+                    if not audio_file:
+                        error_msg = 'Could not download audio from video. Check Django logs for details.'
+                        logger.error(f"Audio download failed for URL: {youtube_url}")
+                        result['error'] = error_msg
+                        return result
+                    
+                    # Step 3: Transcribe audio
+                    transcript, provider, model_name = self.transcribe_audio_file(audio_file)
                 
                 if not transcript:
                     result['error'] = 'Could not transcribe audio. Please install local Whisper (pip install openai-whisper) or set up API credentials.'
                     return result
                 
-                result['transcript'] = transcript
-                
-                # Step 4: Generate blog post
-                print("Generating blog post...")
-                blog_post = self.generate_blog_post(transcript, video_info)
-                result['blog_post'] = blog_post
-                
-                result['success'] = True
-                
-            finally:
-                # Clean up temporary audio file
-                if os.path.exists(audio_file):
-                    try:
-                        os.unlink(audio_file)
-                    except:
-                        pass
+                self._store_cached_transcript(video_id, provider, model_name, transcript)
+            
+            result['transcript'] = transcript
+            
+            # Step 4: Generate blog post
+            print("Generating blog post...")
+            report('generating')
+            blog_post = self.generate_blog_post(
+                transcript, video_info,
+                on_progress=(lambda partial: report('generating', **partial)) if on_progress else None,
+                regenerate=regenerate,
+            )
+            result['blog_post'] = blog_post
+            
+            result['success'] = True
             
         except Exception as e:
             import traceback
@@ -952,9 +1289,224 @@ Make it engaging, informative, and suitable for a blog audience."""
         
         return result
 
+    # Async pipeline: provider I/O on the event loop, blocking steps on threads
+
+    async def transcribe_audio_file_async(self, audio_file: str) -> Tuple[Optional[str], Optional[str], str]:
+        """transcribe_audio_file() with AssemblyAI/Deepgram awaited on the event loop
+
+        Local Whisper, Google Speech and the Whisper API stay blocking and run
+        on worker threads. API providers get the whole file (AssemblyAI and
+        Deepgram handle long audio themselves) instead of local chunks.
+        """
+        clients = self.async_providers
+        duration = None
+        if clients.configured('assemblyai'):
+            duration = await asyncio.to_thread(probe_duration, audio_file, get_ffmpeg_tools().ffprobe_path)
+
+        async def assemblyai():
+            return await clients.transcribe_assemblyai(audio_file, audio_duration=duration)
+
+        async def deepgram():
+            return await clients.transcribe_deepgram(audio_file)
+
+        async def blocking(fn):
+            return await asyncio.to_thread(fn, audio_file)
+
+        providers = []
+        if self.transcription_provider in ('auto', 'whisper') and whisper_module_available:
+            providers.append(('whisper', lambda: blocking(self.transcribe_audio_local_whisper)))
+        if self.transcription_provider in ('auto', 'assemblyai') and clients.configured('assemblyai'):
+            providers.append(('assemblyai', assemblyai))
+        if self.transcription_provider in ('auto', 'deepgram') and clients.configured('deepgram'):
+            providers.append(('deepgram', deepgram))
+        if self.speech_client:
+            providers.append(('google_speech', lambda: blocking(self.transcribe_audio)))
+        if self.openai_client:
+            providers.append(('openai_whisper', lambda: blocking(self.transcribe_audio_whisper_api)))
+
+        if self._racing():
+            transcript, provider = await arace_providers(providers)
+        else:
+            transcript, provider = None, None
+            for name, fn in providers:
+                try:
+                    transcript = await fn()
+                except Exception as e:
+                    logger.error(f"Transcription provider {name} raised: {e}", exc_info=True)
+                    transcript = None
+                if transcript:
+                    provider = name
+                    break
+
+        if not transcript:
+            return None, None, ''
+        return transcript, provider, self._transcription_model_name(provider)
+
+    def _async_llm_providers(self, system_prompt: str, prompt_for):
+        """(name, async fn(call)) pairs for the configured LLMs, in preference order"""
+        clients = self.async_providers
+
+        async def chat(name: str, model: str, call: LLMCall) -> str:
+            prompt = prompt_for(model)
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ]
+            max_tokens = output_budget(model, system_prompt + prompt, desired=BLOG_OUTPUT_TOKENS)
+            blog_text, finish_reason = await clients.stream_chat_completion(
+                name, model, messages, max_tokens, BLOG_TEMPERATURE, call,
+            )
+            if finish_reason == "length":
+                call.check()
+                try:
+                    continuation_messages, continuation_tokens = self._continuation_request(
+                        model, system_prompt, blog_text)
+                    continuation = await clients.chat_completion(
+                        name, model, continuation_messages, continuation_tokens,
+                        BLOG_TEMPERATURE, call.timeout(),
+                    )
+                except Exception as e:
+                    logger.warning(f"Continuation generation failed: {e}")
+                    continuation = None
+                if continuation:
+                    call.add_text(f"\n{continuation.strip()}")
+            return call.text
+
+        async def gemini(call: LLMCall) -> str:
+            return await clients.stream_gemini(GEMINI_MODEL, prompt_for(GEMINI_MODEL), call)
+
+        providers = []
+        for name in clients.llm_providers():
+            if name == 'gemini':
+                providers.append((name, gemini))
+            else:
+                providers.append((name, lambda call, name=name: chat(name, LLM_PROVIDER_MODELS[name], call)))
+        return providers
+
+    async def generate_blog_post_async(self, transcript: str, video_info: Dict[str, str],
+                                       on_progress: Optional[Callable[[Dict[str, str]], None]] = None,
+                                       regenerate: bool = False) -> Dict[str, str]:
+        """generate_blog_post() with the LLM calls awaited on the event loop
+
+        on_progress is called on the event loop and must not block.
+        """
+        configured = self.async_providers.llm_providers()
+        cached, cache_keys = await sync_to_async(self._cached_blog_post)(
+            transcript, video_info, configured, None, regenerate,
+        )
+        if cached:
+            if on_progress is not None:
+                on_progress(cached)
+            return cached
+
+        # Map-reduce summaries of long transcripts still use the threaded router
+        system_prompt, prompt_for = await asyncio.to_thread(
+            self._blog_prompts, transcript, video_info, configured,
+        )
+        report = None
+        if on_progress is not None:
+            report = lambda text: on_progress(self._parse_partial_blog_response(text))
+        blog_text, provider = await llm_router.agenerate(
+            self._async_llm_providers(system_prompt, prompt_for), on_progress=report,
+        )
+        return await sync_to_async(self._finish_blog_post)(blog_text, provider, cache_keys, transcript, video_info)
+
+    async def process_youtube_video_async(self, youtube_url: str,
+                                          on_progress: Optional[Callable[[Dict[str, str]], None]] = None,
+                                          regenerate: bool = False) -> Dict[str, any]:
+        """process_youtube_video() for the async worker
+
+        yt-dlp, ffmpeg, local Whisper and database access run on threads;
+        transcription and LLM requests are awaited, so one event loop can
+        keep many jobs' network waits in flight. on_progress must not block.
+        """
+        def report(stage: str, **fields) -> None:
+            if on_progress is not None:
+                on_progress(dict(fields, stage=stage))
+
+        result = {
+            'success': False,
+            'error': None,
+            'video_info': {},
+            'transcript': None,
+            'blog_post': {},
+        }
+
+        try:
+            report('fetching')
+            info = await asyncio.to_thread(self.extract_video_info, youtube_url)
+            video_info = self.get_video_info(youtube_url, info=info)
+            result['video_info'] = video_info
+
+            if not video_info:
+                result['error'] = 'Could not fetch video information. Please check the URL.'
+                return result
+
+            video_id = self.extract_video_id(youtube_url)
+            cached = await sync_to_async(self._get_cached_transcript)(video_id)
+            transcript = cached['transcript'] if cached else None
+            if not transcript and self.streaming_enabled and info and self.transcription_provider in ('auto', 'whisper'):
+                report('transcribing')
+                transcript = await asyncio.to_thread(self.transcribe_audio_streaming, info)
+                if transcript:
+                    await sync_to_async(self._store_cached_transcript)(
+                        video_id, 'whisper', self.whisper_model_name, transcript,
+                    )
+
+            if not transcript:
+                report('transcribing')
+                job_dir_context = scratch_space.job_dir(reserve_bytes=estimate_job_bytes(info))
+                job_dir = await asyncio.to_thread(job_dir_context.__enter__)
+                try:
+                    audio_file = await asyncio.to_thread(self.download_audio, youtube_url, info, job_dir)
+                    if not audio_file:
+                        logger.error(f"Audio download failed for URL: {youtube_url}")
+                        result['error'] = 'Could not download audio from video. Check Django logs for details.'
+                        return result
+                    transcript, provider, model_name = await self.transcribe_audio_file_async(audio_file)
+                finally:
+                    await asyncio.to_thread(job_dir_context.__exit__, None, None, None)
+
+                if not transcript:
+                    result['error'] = 'Could not transcribe audio. Please install local Whisper (pip install openai-whisper) or set up API credentials.'
+                    return result
+
+                await sync_to_async(self._store_cached_transcript)(video_id, provider, model_name, transcript)
+
+            result['transcript'] = transcript
+
+            report('generating')
+            result['blog_post'] = await self.generate_blog_post_async(
+                transcript, video_info,
+                on_progress=(lambda partial: report('generating', **partial)) if on_progress else None,
+                regenerate=regenerate,
+            )
+            result['success'] = True
+
+        except Exception as e:
+            import traceback
+            error_msg = f'Error processing video: {str(e)}'
+            logger.error(f"Exception in process_youtube_video_async: {error_msg}\n{traceback.format_exc()}")
+            result['error'] = error_msg
+
+        return result
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_generator() -> YouTubeBlogGenerator:
+    """Long-lived generator shared by every request/job in this process"""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = YouTubeBlogGenerator()
+    return _generator
+
 
 # Convenience function for Django views
 def generate_blog_from_youtube(youtube_url: str) -> Dict[str, any]:
     """Convenience function to generate blog from YouTube URL"""
-    generator = YouTubeBlogGenerator()
-    return generator.process_youtube_video(youtube_url)
+    return get_generator().process_youtube_video(youtube_url)
@@ -0,0 +1,170 @@
+"""
+FFmpeg / ffprobe discovery
+
+Resolves and validates the ffmpeg and ffprobe binaries once per process and
+caches their paths, versions and capabilities. Shared by the blog generator,
+the test-blog-generator diagnostics view and the standalone scripts, so no
+request has to scan PATH or the Windows install locations again.
+Call get_ffmpeg_tools.cache_clear() to force a new lookup.
+"""
+import os
+import glob
+import shutil
+import subprocess
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Explicit override, e.g. FFMPEG_PATH=C:\ffmpeg\bin\ffmpeg.exe
+FFMPEG_PATH_OVERRIDE = os.environ.get('FFMPEG_PATH', '').strip()
+
+# Common installation locations on Windows
+COMMON_WINDOWS_PATHS = [
+    r'C:\ffmpeg\bin\ffmpeg.exe',
+    r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
+    r'C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe',
+    os.path.expanduser(r'~\ffmpeg\bin\ffmpeg.exe'),
+    r'C:\tools\ffmpeg\bin\ffmpeg.exe',
+    r'C:\ProgramData\chocolatey\bin\ffmpeg.exe',
+    # WinGet Links location (common for WinGet installations)
+    os.path.expanduser(r'~\AppData\Local\Microsoft\WinGet\Links\ffmpeg.exe'),
+]
+
+# Windows Store apps that bundle FFmpeg
+WINDOWSAPPS_PATTERN = r'C:\Program Files\WindowsApps\*\*\*\ffmpeg.exe'
+
+
+class FFmpegTools:
+    """Resolved ffmpeg/ffprobe binaries with their versions and capabilities"""
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, ffprobe_path: Optional[str] = None,
+                 ffmpeg_version: str = '', ffprobe_version: str = '',
+                 encoders: Optional[Set[str]] = None):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.ffmpeg_version = ffmpeg_version
+        self.ffprobe_version = ffprobe_version
+        self.encoders = encoders or set()
+
+    @property
+    def available(self) -> bool:
+        """Both binaries found (yt-dlp post-processing needs ffprobe too)"""
+        return bool(self.ffmpeg_path and self.ffprobe_path)
+
+    @property
+    def directory(self) -> Optional[str]:
+        """Directory containing ffmpeg, as yt-dlp's ffmpeg_location expects"""
+        return os.path.dirname(self.ffmpeg_path) if self.ffmpeg_path else None
+
+    @property
+    def supports_opus(self) -> bool:
+        return 'libopus' in self.encoders or 'opus' in self.encoders
+
+    def as_dict(self) -> Dict[str, any]:
+        return {
+            'ffmpeg_path': self.ffmpeg_path,
+            'ffprobe_path': self.ffprobe_path,
+            'ffmpeg_version': self.ffmpeg_version,
+            'ffprobe_version': self.ffprobe_version,
+            'supports_opus': self.supports_opus,
+        }
+
+
+def _probe_sibling(ffmpeg_path: str) -> Optional[str]:
+    """ffprobe next to a given ffmpeg binary"""
+    name = os.path.basename(ffmpeg_path).replace('ffmpeg', 'ffprobe')
+    probe_path = os.path.join(os.path.dirname(ffmpeg_path), name)
+    return probe_path if os.path.exists(probe_path) else None
+
+
+def candidate_paths(search_windowsapps: bool = True) -> List[str]:
+    """Existing ffmpeg binaries in the override, PATH and common locations, in priority order"""
+    candidates = []
+    if FFMPEG_PATH_OVERRIDE:
+        candidates.append(FFMPEG_PATH_OVERRIDE)
+    in_path = shutil.which('ffmpeg')
+    if in_path:
+        candidates.append(in_path)
+    if os.name == 'nt':
+        candidates.extend(COMMON_WINDOWS_PATHS)
+        if search_windowsapps:
+            try:
+                candidates.extend(glob.glob(WINDOWSAPPS_PATTERN)[:3])  # Limit to first 3 matches
+            except Exception:
+                pass
+
+    seen = set()
+    found = []
+    for path in candidates:
+        if path and path not in seen and os.path.exists(path):
+            seen.add(path)
+            found.append(path)
+    return found
+
+
+def _run_first_line(command: List[str]) -> str:
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=5)
+        return result.stdout.split('\n')[0] if result.stdout else ''
+    except Exception:
+        return ''
+
+
+def _list_encoders(ffmpeg_path: str) -> Set[str]:
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, timeout=10)
+    except Exception:
+        return set()
+    encoders = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        # Encoder lines look like " A....D libopus   libopus Opus"
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in 'VAS':
+            encoders.add(parts[1])
+    return encoders
+
+
+def find_ffmpeg_tools(search_windowsapps: bool = True) -> FFmpegTools:
+    """Look up and validate ffmpeg/ffprobe (uncached - use get_ffmpeg_tools())"""
+    for ffmpeg_path in candidate_paths(search_windowsapps):
+        ffmpeg_version = _run_first_line([ffmpeg_path, '-version'])
+        if not ffmpeg_version:
+            logger.warning(f"Ignoring FFmpeg that failed to run: {ffmpeg_path}")
+            continue
+        ffprobe_path = _probe_sibling(ffmpeg_path) or shutil.which('ffprobe')
+        ffprobe_version = _run_first_line([ffprobe_path, '-version']) if ffprobe_path else ''
+        tools = FFmpegTools(
+            ffmpeg_path=ffmpeg_path,
+            ffprobe_path=ffprobe_path if ffprobe_version else None,
+            ffmpeg_version=ffmpeg_version,
+            ffprobe_version=ffprobe_version,
+            encoders=_list_encoders(ffmpeg_path),
+        )
+        logger.info(f"FFmpeg found at: {tools.ffmpeg_path} ({ffmpeg_version})")
+        if tools.ffprobe_path:
+            logger.info(f"FFprobe found at: {tools.ffprobe_path}")
+        return tools
+
+    logger.warning("FFmpeg not found. Install FFmpeg: choco install ffmpeg OR winget install ffmpeg")
+    return FFmpegTools()
+
+
+@lru_cache(maxsize=1)
+def get_ffmpeg_tools() -> FFmpegTools:
+    """Process-wide cached FFmpegTools"""
+    return find_ffmpeg_tools()
+
+
+def ensure_ffmpeg_on_path(tools: Optional[FFmpegTools] = None) -> None:
+    """Put the ffmpeg directory on PATH for libraries that call plain 'ffmpeg' (Whisper)"""
+    tools = tools or get_ffmpeg_tools()
+    if not tools.directory:
+        return
+    current_path = os.environ.get('PATH', '')
+    if tools.directory not in current_path.split(os.pathsep):
+        os.environ['PATH'] = tools.directory + os.pathsep + current_path
+        logger.info(f"Added FFmpeg directory to PATH: {tools.directory}")
@@ -0,0 +1,469 @@
+"""
+Background job queue for blog generation
+
+The generate_blog view only enqueues a GenerationJob row. A pool of local
+worker processes (see the run_generation_workers management command) claims
+queued jobs from the database, runs the full download/transcribe/generate
+pipeline and records the resulting BlogPost on the job.
+
+Requests for a video that is already queued or running are coalesced: the
+new job becomes a follower of the in-flight one, is only claimed once that
+leader has finished, and then gets its own copy of the leader's BlogPost
+(or its error) instead of repeating the whole pipeline.
+
+Async workers (--async-jobs) run many jobs at once on one event loop, with
+provider requests made through async_providers.py.
+
+A running job's heartbeat_at is refreshed every JOB_HEARTBEAT_INTERVAL
+seconds. Workers periodically requeue jobs whose heartbeat is older than
+JOB_STALE_AFTER (their worker crashed or was killed); after
+JOB_MAX_ATTEMPTS runs such a job fails and its followers run on their own.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from datetime import timedelta
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BlogPost, GenerationJob
+from .scratch_space import scratch_space
+from .video_metadata import extract_video_id
+from .whisper_models import warm_up_whisper_models
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Worker pool configuration
+DEFAULT_WORKER_COUNT = int(os.environ.get('GENERATION_WORKERS', '2'))
+DEFAULT_POLL_INTERVAL = float(os.environ.get('GENERATION_WORKER_POLL_INTERVAL', '2'))
+# Jobs one async worker process runs concurrently (0: threaded workers, one job at a time)
+ASYNC_WORKER_JOBS = int(os.environ.get('GENERATION_ASYNC_JOBS', '0'))
+# Minimum seconds between progress writes for the same stage
+PROGRESS_WRITE_INTERVAL = float(os.environ.get('GENERATION_PROGRESS_INTERVAL', '1'))
+# Liveness of running jobs (seconds)
+JOB_HEARTBEAT_INTERVAL = float(os.environ.get('GENERATION_HEARTBEAT_INTERVAL', '30'))
+JOB_STALE_AFTER = float(os.environ.get('GENERATION_JOB_STALE_AFTER', '300'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('GENERATION_JOB_MAX_ATTEMPTS', '2'))
+STALE_CHECK_INTERVAL = float(os.environ.get('GENERATION_STALE_CHECK_INTERVAL', '60'))
+STALE_JOB_ERROR = 'The worker running this job stopped responding.'
+
+
+def find_in_flight_job(video_id: str) -> Optional[GenerationJob]:
+    """Oldest queued or running leader job for a video"""
+    return GenerationJob.objects.filter(
+        video_id=video_id,
+        leader__isnull=True,
+        status__in=[GenerationJob.STATUS_QUEUED, GenerationJob.STATUS_RUNNING],
+    ).order_by('created_at').first()
+
+
+def enqueue_generation_job(youtube_url: str, author, regenerate: bool = False) -> GenerationJob:
+    """Persist a new queued job and return it immediately
+
+    If the same video is already being processed (and this isn't an explicit
+    regenerate), the job follows the in-flight one instead of running itself.
+    """
+    video_id = extract_video_id(youtube_url) or ''
+    leader = find_in_flight_job(video_id) if video_id and not regenerate else None
+    job = GenerationJob.objects.create(
+        youtube_url=youtube_url,
+        video_id=video_id,
+        author=author,
+        regenerate=regenerate,
+        leader=leader,
+    )
+    if leader is not None:
+        logger.info(f"Enqueued generation job {job.pk} for URL: {youtube_url} (following job {leader.pk})")
+    else:
+        logger.info(f"Enqueued generation job {job.pk} for URL: {youtube_url}")
+    return job
+
+
+def claim_next_job() -> Optional[GenerationJob]:
+    """Atomically move the oldest runnable queued job to running and return it
+
+    Followers only become runnable once their leader has finished.
+    """
+    finished = [GenerationJob.STATUS_DONE, GenerationJob.STATUS_FAILED]
+    while True:
+        job = GenerationJob.objects.filter(status=GenerationJob.STATUS_QUEUED, batch__isnull=True).filter(
+            Q(leader__isnull=True) | Q(leader__status__in=finished)
+        ).order_by('created_at').first()
+        if job is None:
+            return None
+
+        # Conditional update so two workers can never claim the same job
+        now = timezone.now()
+        claimed = GenerationJob.objects.filter(
+            pk=job.pk,
+            status=GenerationJob.STATUS_QUEUED,
+        ).update(status=GenerationJob.STATUS_RUNNING, started_at=now, heartbeat_at=now,
+                 attempts=F('attempts') + 1)
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def recover_stale_jobs(stale_after: float = JOB_STALE_AFTER) -> int:
+    """Requeue running jobs whose worker stopped heartbeating; returns how many
+
+    A job that has already had JOB_MAX_ATTEMPTS runs is failed instead, and
+    its queued followers are detached so they run themselves rather than
+    inheriting the failure. Batch items are recovered with their batch.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=stale_after)
+    stale = GenerationJob.objects.filter(status=GenerationJob.STATUS_RUNNING, batch__isnull=True).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    recovered = 0
+    for job in stale:
+        # Conditional on the heartbeat we saw, in case the worker comes back to life
+        still_stale = GenerationJob.objects.filter(
+            pk=job.pk, status=GenerationJob.STATUS_RUNNING, heartbeat_at=job.heartbeat_at,
+        )
+        if job.attempts >= JOB_MAX_ATTEMPTS:
+            if still_stale.update(status=GenerationJob.STATUS_FAILED, error=STALE_JOB_ERROR, finished_at=now):
+                GenerationJob.objects.filter(leader=job, status=GenerationJob.STATUS_QUEUED).update(leader=None)
+                logger.warning(f"Job {job.pk} failed: its worker stopped after {job.attempts} attempt(s)")
+                recovered += 1
+        elif still_stale.update(status=GenerationJob.STATUS_QUEUED, started_at=None, heartbeat_at=None, progress={}):
+            logger.warning(f"Requeued job {job.pk}: its worker stopped responding")
+            recovered += 1
+    return recovered
+
+
+class Heartbeat:
+    """Context manager refreshing heartbeat_at of a running row from a thread"""
+
+    def __init__(self, model, pk: int, interval: float = JOB_HEARTBEAT_INTERVAL):
+        self.model = model
+        self.pk = pk
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def beat(self) -> None:
+        try:
+            self.model.objects.filter(pk=self.pk).update(heartbeat_at=timezone.now())
+        except Exception as e:
+            logger.warning(f"Heartbeat of {self.model.__name__} {self.pk} failed: {e}")
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.interval):
+                self.beat()
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name=f'heartbeat-{self.pk}', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def build_blog_post(job: GenerationJob, result: dict) -> BlogPost:
+    """Unsaved BlogPost for a successful pipeline result (batches bulk_create these)"""
+    return BlogPost(
+        title=result['blog_post']['title'],
+        description=result['blog_post']['description'],
+        content=result['blog_post']['content'],
+        youtube_url=job.youtube_url,
+        youtube_title=result['video_info'].get('title', ''),
+        youtube_channel=result['video_info'].get('channel', ''),
+        youtube_duration=result['video_info'].get('duration', ''),
+        author=job.author,
+        category='Technology',  # Default category, can be made dynamic
+    )
+
+
+def create_blog_post_from_result(job: GenerationJob, result: dict) -> BlogPost:
+    """Save a BlogPost row from a successful pipeline result"""
+    blog_post = build_blog_post(job, result)
+    blog_post.save()
+    return blog_post
+
+
+def copy_blog_post(source: BlogPost, author) -> BlogPost:
+    """A separate BlogPost for another user with the same generated content"""
+    return BlogPost.objects.create(
+        title=source.title,
+        description=source.description,
+        content=source.content,
+        youtube_url=source.youtube_url,
+        youtube_title=source.youtube_title,
+        youtube_channel=source.youtube_channel,
+        youtube_duration=source.youtube_duration,
+        author=author,
+        category=source.category,
+    )
+
+
+def share_leader_result(job: GenerationJob) -> bool:
+    """Finish a follower job from its leader's outcome; False if it must run itself"""
+    leader = job.leader
+    if leader.status == GenerationJob.STATUS_FAILED:
+        mark_job_failed(job, leader.error or 'Failed to generate blog post.')
+        return True
+    if leader.status == GenerationJob.STATUS_DONE and leader.blog_post is not None:
+        job.blog_post = copy_blog_post(leader.blog_post, job.author)
+        job.status = GenerationJob.STATUS_DONE
+        job.finished_at = timezone.now()
+        job.save(update_fields=['blog_post', 'status', 'finished_at'])
+        logger.info(f"Job {job.pk} reused the result of job {leader.pk}")
+        return True
+    # Leader's post was deleted in the meantime
+    return False
+
+
+def mark_job_failed(job: GenerationJob, error: str) -> None:
+    """Record a failed run on the job"""
+    job.status = GenerationJob.STATUS_FAILED
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+class JobProgressReporter:
+    """Writes pipeline progress to the job row for the streaming endpoint
+
+    Stage changes are written immediately; partial output at most every
+    PROGRESS_WRITE_INTERVAL seconds.
+    """
+
+    def __init__(self, job: GenerationJob, interval: float = PROGRESS_WRITE_INTERVAL,
+                 close_connection: bool = True):
+        self.job = job
+        self.interval = interval
+        self.close_connection = close_connection
+        self._last_stage = None
+        self._last_write = 0.0
+
+    def __call__(self, progress: dict) -> None:
+        now = time.monotonic()
+        stage = progress.get('stage')
+        if stage == self._last_stage and now - self._last_write < self.interval:
+            return
+        self._last_stage = stage
+        self._last_write = now
+        try:
+            GenerationJob.objects.filter(pk=self.job.pk).update(progress=progress)
+        except Exception as e:
+            logger.warning(f"Could not record progress for job {self.job.pk}: {e}")
+        finally:
+            # Called from LLM router threads, which Django won't clean up after
+            if self.close_connection and threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+
+def run_job(job: GenerationJob, generator=None) -> GenerationJob:
+    """Run the generation pipeline for a claimed job and store the outcome"""
+    from .blog_generator import get_generator
+
+    try:
+        if job.leader_id is not None and share_leader_result(job):
+            return job
+
+        if generator is None:
+            generator = get_generator()
+
+        logger.info(f"Running generation job {job.pk} for URL: {job.youtube_url}")
+        with Heartbeat(GenerationJob, job.pk):
+            result = generator.process_youtube_video(
+                job.youtube_url,
+                on_progress=JobProgressReporter(job),
+                regenerate=job.regenerate,
+            )
+        logger.info(f"Job {job.pk} result: success={result.get('success')}, error={result.get('error')}")
+
+        finish_job(job, result)
+    except Exception as e:
+        logger.error(f"Exception in generation job {job.pk}: {e}", exc_info=True)
+        mark_job_failed(job, f'An error occurred: {str(e)}')
+
+    return job
+
+
+def finish_job(job: GenerationJob, result: dict) -> None:
+    """Store a pipeline result on the job: a new BlogPost, or the error"""
+    if not result['success']:
+        mark_job_failed(job, result.get('error') or 'Failed to generate blog post.')
+        return
+
+    job.blog_post = create_blog_post_from_result(job, result)
+    job.status = GenerationJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['blog_post', 'status', 'finished_at'])
+
+
+async def run_job_async(job: GenerationJob, generator=None) -> GenerationJob:
+    """run_job() on the event loop; ORM work goes through sync_to_async"""
+    from .blog_generator import get_generator
+
+    try:
+        if job.leader_id is not None and await sync_to_async(share_leader_result)(job):
+            return job
+
+        if generator is None:
+            generator = get_generator()
+
+        # Progress writes are queued to the ORM thread so the loop never blocks on them
+        reporter = sync_to_async(JobProgressReporter(job, close_connection=False))
+        writes = []
+
+        def on_progress(progress: dict) -> None:
+            writes.append(asyncio.ensure_future(reporter(progress)))
+
+        logger.info(f"Running generation job {job.pk} asynchronously for URL: {job.youtube_url}")
+        with Heartbeat(GenerationJob, job.pk):
+            result = await generator.process_youtube_video_async(
+                job.youtube_url,
+                on_progress=on_progress,
+                regenerate=job.regenerate,
+            )
+        logger.info(f"Job {job.pk} result: success={result.get('success')}, error={result.get('error')}")
+        await asyncio.gather(*writes, return_exceptions=True)
+        await sync_to_async(finish_job)(job, result)
+    except Exception as e:
+        logger.error(f"Exception in generation job {job.pk}: {e}", exc_info=True)
+        await sync_to_async(mark_job_failed)(job, f'An error occurred: {str(e)}')
+
+    return job
+
+
+def run_worker(poll_interval: float = DEFAULT_POLL_INTERVAL, stop_event=None) -> None:
+    """Claim and run queued jobs (and batches) until stop_event is set"""
+    from .batches import claim_next_batch, recover_stale_batches, run_batch
+
+    logger.info(f"Generation worker started (pid={os.getpid()})")
+    warm_up_whisper_models()
+    scratch_space.start_reaper()
+    next_stale_check = 0.0
+    while stop_event is None or not stop_event.is_set():
+        close_old_connections()
+        if time.monotonic() >= next_stale_check:
+            recover_stale_jobs()
+            recover_stale_batches()
+            next_stale_check = time.monotonic() + STALE_CHECK_INTERVAL
+        job = claim_next_job()
+        if job is None:
+            batch = claim_next_batch()
+            if batch is not None:
+                run_batch(batch)
+                continue
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        run_job(job)
+    logger.info(f"Generation worker stopped (pid={os.getpid()})")
+
+
+async def run_async_worker(max_jobs: int = 20, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                           stop_event=None) -> None:
+    """Run up to max_jobs jobs at once on one event loop until stop_event is set
+
+    Provider requests of all running jobs are multiplexed on the loop (see
+    async_providers.py); batches are left to the threaded workers.
+    """
+    logger.info(f"Async generation worker started (pid={os.getpid()}, max_jobs={max_jobs})")
+    await asyncio.to_thread(warm_up_whisper_models)
+    scratch_space.start_reaper()
+    running = set()
+    next_stale_check = 0.0
+    try:
+        while stop_event is None or not stop_event.is_set():
+            job = None
+            if time.monotonic() >= next_stale_check:
+                await sync_to_async(recover_stale_jobs)()
+                next_stale_check = time.monotonic() + STALE_CHECK_INTERVAL
+            if len(running) < max_jobs:
+                await sync_to_async(close_old_connections)()
+                job = await sync_to_async(claim_next_job)()
+            if job is not None:
+                running.add(asyncio.ensure_future(run_job_async(job)))
+                continue
+            if running:
+                # Wake up when a job finishes (a slot frees up) or to look for new jobs
+                done, running = await asyncio.wait(running, timeout=poll_interval,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                running = set(running)
+            else:
+                await asyncio.sleep(poll_interval)
+        if running:
+            logger.info(f"Waiting for {len(running)} running job(s) to finish...")
+            await asyncio.wait(running)
+    finally:
+        from .blog_generator import get_generator
+        await get_generator().async_providers.aclose()
+    logger.info(f"Async generation worker stopped (pid={os.getpid()})")
+
+
+def _worker_process_main(settings_module: str, poll_interval: float, stop_event,
+                         async_jobs: int = 0) -> None:
+    """Entry point of a spawned worker process"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+    try:
+        if async_jobs > 0:
+            asyncio.run(run_async_worker(max_jobs=async_jobs, poll_interval=poll_interval,
+                                         stop_event=stop_event))
+        else:
+            run_worker(poll_interval=poll_interval, stop_event=stop_event)
+    except KeyboardInterrupt:
+        pass
+
+
+def start_worker_pool(num_workers: int = DEFAULT_WORKER_COUNT,
+                      poll_interval: float = DEFAULT_POLL_INTERVAL,
+                      async_jobs: int = ASYNC_WORKER_JOBS):
+    """Spawn worker processes and return (processes, stop_event)
+
+    With async_jobs > 0 each process is an async worker running up to that
+    many jobs concurrently on one event loop.
+    """
+    # Spawn rather than fork so every worker gets its own fresh DB connections
+    context = multiprocessing.get_context('spawn')
+    stop_event = context.Event()
+    settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    processes = []
+    for index in range(max(1, num_workers)):
+        process = context.Process(
+            target=_worker_process_main,
+            args=(settings_module, poll_interval, stop_event, async_jobs),
+            name=f'generation-worker-{index}',
+            # Not a daemon: Whisper chunking starts its own process pool, which
+            # daemonic processes aren't allowed to do. stop_worker_pool() joins them.
+            daemon=False,
+        )
+        process.start()
+        processes.append(process)
+    return processes, stop_event
+
+
+def stop_worker_pool(processes, stop_event, timeout: float = 30) -> None:
+    """Ask the workers to stop after their current job; terminate stragglers"""
+    stop_event.set()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        process.join(timeout=max(0.0, deadline - time.monotonic()))
+    for process in processes:
+        if process.is_alive():
+            logger.warning(f"Worker {process.name} did not stop within {timeout:.0f}s, terminating it")
+            process.terminate()
+            process.join()
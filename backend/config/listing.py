@@ -0,0 +1,72 @@
+"""
+Keyset pagination for the per-author blog listing
+
+Pages are ordered by (created_at, id) descending and a page is addressed by
+the (created_at, id) of the last row of the previous page, so every page is
+an index seek on (author, -created_at, -id) rather than an OFFSET that reads
+and discards all the rows before it. Only the columns the listing shows are
+loaded; content stays in the table.
+"""
+import os
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import BlogPost
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+LISTING_PAGE_SIZE = int(os.environ.get('BLOG_LISTING_PAGE_SIZE', '24'))
+# Columns all_blog_posts.html renders
+LISTING_FIELDS = ('id', 'title', 'category', 'excerpt', 'word_count', 'created_at')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(blog_post: BlogPost) -> str:
+    """Opaque, URL-safe cursor for the page after blog_post"""
+    created_at = blog_post.created_at
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=dt_timezone.utc)
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}-{blog_post.id}"
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """(created_at, id) from a cursor, or None for a missing/malformed one"""
+    if not cursor:
+        return None
+    try:
+        micros, post_id = cursor.rsplit('-', 1)
+        created_at = _EPOCH + timedelta(microseconds=int(micros))
+        post_id = int(post_id)
+    except (ValueError, OverflowError):
+        logger.info(f"Ignoring malformed listing cursor: {cursor!r}")
+        return None
+    if not settings.USE_TZ:
+        # encode_cursor read the naive timestamp as UTC
+        created_at = created_at.replace(tzinfo=None)
+    return created_at, post_id
+
+
+def listing_page(author_id: int, cursor: Optional[str] = None, page_size: int = LISTING_PAGE_SIZE,
+                 using: Optional[str] = None) -> Tuple[List[BlogPost], Optional[str]]:
+    """One page of an author's posts, newest first, and the cursor of the next page"""
+    queryset = BlogPost.objects.filter(author_id=author_id).only(*LISTING_FIELDS).order_by('-created_at', '-id')
+    if using:
+        queryset = queryset.using(using)
+    position = decode_cursor(cursor)
+    if position:
+        created_at, post_id = position
+        # Rows after (created_at, id); the redundant created_at <= bound gives the
+        # planner a range to seek to (a bare OR only narrows to the author)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(id__lt=post_id), created_at__lte=created_at)
+
+    # One extra row tells whether there is a next page without a COUNT
+    posts = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(posts[page_size - 1]) if len(posts) > page_size else None
+    return posts[:page_size], next_cursor
@@ -0,0 +1,218 @@
+"""
+LLM response cache
+
+Generated blog text is stored under a hash of everything that shaped it:
+the transcript, video title and channel, model, temperature and the prompt
+template version. Regenerating a blog for the same transcript then skips
+the LLM call entirely (and saves free-tier quota). Backends:
+
+  db      - LLMResponseCacheEntry table in the project database (default)
+  file    - one JSON file per key under LLM_CACHE_DIR
+  memory  - in-process LRU, for tests and single-process setups
+  none    - caching disabled
+
+Entries expire after LLM_CACHE_TTL_HOURS (0 keeps them forever).
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+LLM_CACHE_BACKEND = os.environ.get('LLM_CACHE_BACKEND', 'db').strip().lower()
+LLM_CACHE_TTL_HOURS = float(os.environ.get('LLM_CACHE_TTL_HOURS', str(24 * 7)))
+LLM_CACHE_DIR = os.environ.get('LLM_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai_blog_llm_cache'))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '500'))  # memory backend only
+
+
+def make_cache_key(transcript: str, title: str, channel: str, model: str,
+                   temperature: float, prompt_version: str) -> str:
+    """sha256 over every input of a generation"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, f'{temperature:.3f}', title or '', channel or '', transcript or ''):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, model_name: str, response: str, ttl_seconds: Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (response, time.time() + ttl_seconds if ttl_seconds else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class FileCacheBackend:
+    """One JSON file per key; writes are atomic renames so concurrent workers are safe"""
+
+    def __init__(self, directory: str = LLM_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires_at') and entry['expires_at'] < time.time():
+            self.delete(key)
+            return None
+        return entry.get('response')
+
+    def set(self, key: str, model_name: str, response: str, ttl_seconds: Optional[float]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            'model_name': model_name,
+            'response': response,
+            'created_at': time.time(),
+            'expires_at': time.time() + ttl_seconds if ttl_seconds else None,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+class DatabaseCacheBackend:
+    """LLMResponseCacheEntry rows in the project database"""
+
+    def get(self, key: str) -> Optional[str]:
+        from django.db.models import Q
+        from django.utils import timezone
+        from .models import LLMResponseCacheEntry
+
+        return LLMResponseCacheEntry.objects.filter(key=key).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+        ).values_list('response', flat=True).first()
+
+    def set(self, key: str, model_name: str, response: str, ttl_seconds: Optional[float]) -> None:
+        from django.utils import timezone
+        from .models import LLMResponseCacheEntry
+
+        now = timezone.now()
+        LLMResponseCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={
+                'model_name': model_name,
+                'response': response,
+                'created_at': now,
+                'expires_at': now + timedelta(seconds=ttl_seconds) if ttl_seconds else None,
+            },
+        )
+        # Expired rows are only ever skipped by get(); clear them out on writes
+        LLMResponseCacheEntry.objects.filter(expires_at__lt=now).delete()
+
+    def delete(self, key: str) -> None:
+        from .models import LLMResponseCacheEntry
+
+        LLMResponseCacheEntry.objects.filter(key=key).delete()
+
+
+BACKENDS = {
+    'db': DatabaseCacheBackend,
+    'file': FileCacheBackend,
+    'memory': MemoryCacheBackend,
+}
+
+
+class LLMResponseCache:
+    """Response cache over a pluggable backend; lookups and stores never raise"""
+
+    def __init__(self, backend=None, ttl_hours: float = LLM_CACHE_TTL_HOURS):
+        self.backend = backend
+        self.ttl_seconds = ttl_hours * 3600 if ttl_hours else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, key: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        try:
+            response = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            response = None
+        with self._lock:
+            if response:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return response
+
+    def set(self, key: str, model_name: str, response: str) -> None:
+        if self.backend is None or not response:
+            return
+        try:
+            self.backend.set(key, model_name, response, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+    def stats(self) -> Dict[str, any]:
+        with self._lock:
+            return {
+                'backend': type(self.backend).__name__ if self.backend else None,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def create_llm_cache(backend_name: str = LLM_CACHE_BACKEND) -> LLMResponseCache:
+    """Cache with the backend named by LLM_CACHE_BACKEND"""
+    if backend_name in ('', 'none', 'off', 'false'):
+        return LLMResponseCache(backend=None)
+    if backend_name not in BACKENDS:
+        logger.warning(f"Unknown LLM_CACHE_BACKEND '{backend_name}'. Falling back to 'db'.")
+        backend_name = 'db'
+    return LLMResponseCache(backend=BACKENDS[backend_name]())
+
+
+# Shared cache for this process
+llm_cache = create_llm_cache()
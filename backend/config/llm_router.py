@@ -0,0 +1,425 @@
+"""
+Deadline-bounded routing of blog generation across LLM providers
+
+Providers are tried in their configured order (Groq, Gemini, OpenAI), but:
+  - every call runs against a deadline (LLM_CALL_TIMEOUT per call,
+    LLM_TOTAL_DEADLINE for the whole generation);
+  - if no running provider has produced its first token within
+    LLM_HEDGE_DELAY seconds, the next provider is started in parallel and
+    whichever finishes first wins (LLM_HEDGE_DELAY=0 disables hedging);
+  - a provider that fails LLM_BREAKER_THRESHOLD times in a row is skipped
+    for LLM_BREAKER_RESET seconds (circuit breaker), then gets one trial call;
+  - per-provider latency, time to first token, success rate, hedges and
+    breaker state are kept for the diagnostics view.
+
+generate() runs provider functions on threads; agenerate() does the same
+for coroutine providers on the caller's event loop.
+"""
+import os
+import time
+import asyncio
+import threading
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .provider_stats import ProviderStats
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Router configuration
+LLM_CALL_TIMEOUT = float(os.environ.get('LLM_CALL_TIMEOUT', '120'))
+LLM_TOTAL_DEADLINE = float(os.environ.get('LLM_TOTAL_DEADLINE', '240'))
+LLM_HEDGE_DELAY = float(os.environ.get('LLM_HEDGE_DELAY', '15'))
+LLM_BREAKER_THRESHOLD = int(os.environ.get('LLM_BREAKER_THRESHOLD', '3'))
+LLM_BREAKER_RESET = float(os.environ.get('LLM_BREAKER_RESET', '120'))
+# Minimum seconds between partial-output progress callbacks
+LLM_PROGRESS_INTERVAL = float(os.environ.get('LLM_PROGRESS_INTERVAL', '0.5'))
+
+
+class LLMCallCancelled(Exception):
+    """Raised inside a provider call when another provider already won or the deadline passed"""
+
+
+class LLMCall:
+    """Per-attempt handle passed to provider functions
+
+    Provider functions should pass output to add_text() as it arrives and
+    call check() between chunks; check() raises LLMCallCancelled once the
+    attempt is no longer wanted. timeout() is the time left for the
+    client-level request timeout.
+    """
+
+    def __init__(self, cancel_event: threading.Event, deadline: float,
+                 progress: Optional[Callable[['LLMCall'], None]] = None):
+        self.cancel_event = cancel_event
+        self.deadline = deadline
+        self.progress = progress
+        self.started_at = time.monotonic()
+        self.first_token_at = None
+        self._parts: List[str] = []
+        self._last_progress = 0.0
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._parts)
+
+    def first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+    def add_text(self, delta: str) -> None:
+        """Append streamed output and report progress (throttled)"""
+        if not delta:
+            return
+        self.first_token()
+        self._parts.append(delta)
+        now = time.monotonic()
+        if self.progress is not None and now - self._last_progress >= LLM_PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress(self)
+
+    def timeout(self) -> float:
+        return max(1.0, self.deadline - time.monotonic())
+
+    def check(self) -> None:
+        if self.cancel_event.is_set():
+            raise LLMCallCancelled("cancelled")
+        if time.monotonic() > self.deadline:
+            raise LLMCallCancelled("deadline exceeded")
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open after a cool-down"""
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, reset_timeout: float = LLM_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """May a call be made now? Half-open lets a single trial call through"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a half-open trial slot that ended without a verdict"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.consecutive_failures >= self.threshold:
+                # A failed trial re-opens the breaker for another cool-down
+                self.opened_at = time.monotonic()
+
+
+class LLMRouter:
+    """Runs provider functions with deadlines, hedging and circuit breakers"""
+
+    def __init__(self, call_timeout: float = LLM_CALL_TIMEOUT, total_deadline: float = LLM_TOTAL_DEADLINE,
+                 hedge_delay: float = LLM_HEDGE_DELAY):
+        self.call_timeout = call_timeout
+        self.total_deadline = total_deadline
+        self.hedge_delay = hedge_delay
+        self.stats = ProviderStats()
+        self.first_token_stats = ProviderStats()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            return self._breakers.setdefault(name, CircuitBreaker())
+
+    def _count(self, name: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(name, {'hedged': 0, 'wins': 0, 'cancelled': 0, 'skipped': 0})
+            counters[counter] += 1
+
+    def _next_allowed(self, pending: List[Tuple[str, Callable]]) -> Tuple[Optional[str], Optional[Callable]]:
+        """Pop the next provider whose breaker lets a call through, or (None, None)"""
+        while pending:
+            name, fn = pending.pop(0)
+            if self.breaker(name).allow():
+                return name, fn
+            logger.warning(f"Skipping LLM provider {name}: circuit breaker open")
+            self._count(name, 'skipped')
+        return None, None
+
+    def generate(self, providers: List[Tuple[str, Callable[[LLMCall], Optional[str]]]],
+                 on_progress: Optional[Callable[[str], None]] = None,
+                 hedge: bool = True, label: str = 'blog post') -> Tuple[Optional[str], Optional[str]]:
+        """Return (text, provider name) from the first provider to finish, or (None, None)
+
+        on_progress receives the partial output of the first provider that
+        starts streaming (the next one takes over if that one fails).
+        hedge=False only moves to the next provider on failure; label names
+        the output in the log.
+        """
+        hedge_delay = self.hedge_delay if hedge else 0
+        # Breakers are only asked when a provider is started, so a half-open
+        # trial slot is never held by a provider this call doesn't run
+        pending = list(providers)
+        if not pending:
+            return None, None
+
+        overall_deadline = time.monotonic() + self.total_deadline
+        cancel_event = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix='llm')
+        running: Dict = {}
+        leader: List[LLMCall] = []
+        leader_lock = threading.Lock()
+
+        def report(call: LLMCall) -> None:
+            with leader_lock:
+                if not leader:
+                    leader.append(call)
+                if leader[0] is not call:
+                    return
+            try:
+                on_progress(call.text)
+            except Exception as e:
+                logger.warning(f"LLM progress callback failed: {e}")
+
+        def drop_leader(call: LLMCall) -> None:
+            with leader_lock:
+                if leader and leader[0] is call:
+                    leader.clear()
+
+        def run(name: str, fn, call: LLMCall):
+            try:
+                text = fn(call)
+                call.check()
+            except LLMCallCancelled as e:
+                drop_leader(call)
+                if not cancel_event.is_set():
+                    # Ran out of time - that counts against the provider
+                    logger.warning(f"LLM provider {name} timed out: {e}")
+                    self.breaker(name).record_failure()
+                    self.stats.record(name, time.monotonic() - call.started_at, False)
+                else:
+                    self._count(name, 'cancelled')
+                    self.breaker(name).release()
+                return None
+            except Exception as e:
+                drop_leader(call)
+                logger.warning(f"LLM provider {name} failed: {e}")
+                self.breaker(name).record_failure()
+                self.stats.record(name, time.monotonic() - call.started_at, False)
+                return None
+            if call.first_token_at is not None:
+                self.first_token_stats.record(name, call.first_token_at - call.started_at, True)
+            if text:
+                self.breaker(name).record_success()
+            else:
+                drop_leader(call)
+                self.breaker(name).record_failure()
+            self.stats.record(name, time.monotonic() - call.started_at, bool(text))
+            return text
+
+        def start_next(hedge: bool = False) -> bool:
+            name, fn = self._next_allowed(pending)
+            if name is None:
+                return False
+            call = LLMCall(cancel_event, min(time.monotonic() + self.call_timeout, overall_deadline),
+                           progress=report if on_progress else None)
+            logger.info(f"Generating {label} with {name}{' (hedged request)' if hedge else ''}...")
+            if hedge:
+                self._count(name, 'hedged')
+            running[executor.submit(run, name, fn, call)] = (name, call)
+            return True
+
+        try:
+            if not start_next():
+                return None, None
+            last_start = time.monotonic()
+            while running:
+                now = time.monotonic()
+                if now >= overall_deadline:
+                    logger.error("LLM generation deadline exceeded")
+                    return None, None
+                timeout = overall_deadline - now
+                streaming = any(call.first_token_at is not None for _, call in running.values())
+                if hedge_delay > 0 and pending and not streaming:
+                    timeout = min(timeout, max(0.0, last_start + hedge_delay - now))
+
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, _ = running.pop(future)
+                    text = future.result()
+                    if text:
+                        self._count(name, 'wins')
+                        return text, name
+                    # Failed: move on to the next provider straight away
+                    if start_next():
+                        last_start = time.monotonic()
+
+                if not done and hedge_delay > 0 and pending:
+                    streaming = any(call.first_token_at is not None for _, call in running.values())
+                    if not streaming and time.monotonic() - last_start >= hedge_delay:
+                        start_next(hedge=True)
+                        last_start = time.monotonic()
+            return None, None
+        finally:
+            cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def agenerate(self, providers: List[Tuple[str, Callable[[LLMCall], Awaitable[Optional[str]]]]],
+                        on_progress: Optional[Callable[[str], None]] = None,
+                        hedge: bool = True, label: str = 'blog post') -> Tuple[Optional[str], Optional[str]]:
+        """generate() for coroutine providers (see async_providers.py), on the running event loop
+
+        Same deadlines, hedging, breakers and statistics; losing attempts are
+        cancelled as tasks instead of being told to stop.
+        """
+        hedge_delay = self.hedge_delay if hedge else 0
+        # Breakers are only asked when a provider is started, so a half-open
+        # trial slot is never held by a provider this call doesn't run
+        pending = list(providers)
+        if not pending:
+            return None, None
+
+        overall_deadline = time.monotonic() + self.total_deadline
+        cancel_event = threading.Event()
+        running: Dict = {}
+        leader: List[LLMCall] = []
+
+        def report(call: LLMCall) -> None:
+            if not leader:
+                leader.append(call)
+            if leader[0] is not call:
+                return
+            try:
+                on_progress(call.text)
+            except Exception as e:
+                logger.warning(f"LLM progress callback failed: {e}")
+
+        def drop_leader(call: LLMCall) -> None:
+            if leader and leader[0] is call:
+                leader.clear()
+
+        async def run(name: str, fn, call: LLMCall):
+            try:
+                text = await asyncio.wait_for(fn(call), timeout=max(0.0, call.deadline - time.monotonic()))
+                call.check()
+            except asyncio.CancelledError:
+                drop_leader(call)
+                self._count(name, 'cancelled')
+                self.breaker(name).release()
+                raise
+            except (LLMCallCancelled, asyncio.TimeoutError) as e:
+                drop_leader(call)
+                logger.warning(f"LLM provider {name} timed out: {e!r}")
+                self.breaker(name).record_failure()
+                self.stats.record(name, time.monotonic() - call.started_at, False)
+                return None
+            except Exception as e:
+                drop_leader(call)
+                logger.warning(f"LLM provider {name} failed: {e}")
+                self.breaker(name).record_failure()
+                self.stats.record(name, time.monotonic() - call.started_at, False)
+                return None
+            if call.first_token_at is not None:
+                self.first_token_stats.record(name, call.first_token_at - call.started_at, True)
+            if text:
+                self.breaker(name).record_success()
+            else:
+                drop_leader(call)
+                self.breaker(name).record_failure()
+            self.stats.record(name, time.monotonic() - call.started_at, bool(text))
+            return text
+
+        def start_next(hedge: bool = False) -> bool:
+            name, fn = self._next_allowed(pending)
+            if name is None:
+                return False
+            call = LLMCall(cancel_event, min(time.monotonic() + self.call_timeout, overall_deadline),
+                           progress=report if on_progress else None)
+            logger.info(f"Generating {label} with {name}{' (hedged request)' if hedge else ''} (async)...")
+            if hedge:
+                self._count(name, 'hedged')
+            running[asyncio.ensure_future(run(name, fn, call))] = (name, call)
+            return True
+
+        try:
+            if not start_next():
+                return None, None
+            last_start = time.monotonic()
+            while running:
+                now = time.monotonic()
+                if now >= overall_deadline:
+                    logger.error("LLM generation deadline exceeded")
+                    return None, None
+                timeout = overall_deadline - now
+                streaming = any(call.first_token_at is not None for _, call in running.values())
+                if hedge_delay > 0 and pending and not streaming:
+                    timeout = min(timeout, max(0.0, last_start + hedge_delay - now))
+
+                done, _ = await asyncio.wait(list(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name, _ = running.pop(task)
+                    text = task.result()
+                    if text:
+                        self._count(name, 'wins')
+                        return text, name
+                    if start_next():
+                        last_start = time.monotonic()
+
+                if not done and hedge_delay > 0 and pending:
+                    streaming = any(call.first_token_at is not None for _, call in running.values())
+                    if not streaming and time.monotonic() - last_start >= hedge_delay:
+                        start_next(hedge=True)
+                        last_start = time.monotonic()
+            return None, None
+        finally:
+            cancel_event.set()
+            for task in running:
+                task.cancel()
+
+    def metrics(self) -> Dict[str, Dict[str, any]]:
+        """Per-provider stats, time to first token, counters and breaker state"""
+        stats = self.stats.snapshot()
+        first_token = self.first_token_stats.snapshot()
+        with self._lock:
+            names = set(stats) | set(self._breakers) | set(self._counters)
+            breakers = dict(self._breakers)
+            counters = {name: dict(values) for name, values in self._counters.items()}
+        metrics = {}
+        for name in sorted(names):
+            entry = dict(stats.get(name, {}))
+            entry['first_token_ewma'] = first_token.get(name, {}).get('latency_ewma')
+            entry.update(counters.get(name, {}))
+            entry['breaker'] = breakers[name].state if name in breakers else 'closed'
+            metrics[name] = entry
+        return metrics
+
+
+# Shared router for this process (breakers and metrics span all jobs)
+llm_router = LLMRouter()
@@ -0,0 +1,184 @@
+"""
+Benchmark the per-author blog listing query on a synthetic dataset
+Run with: python manage.py benchmark_blog_listing --rows 1000000 [--compare]
+
+Builds a throwaway SQLite database (migrated like the real one), fills it
+with --rows BlogPost rows spread over --authors users with a skewed
+distribution (one author owns half of the rows), and reports the EXPLAIN
+plan and timings of the all_blog_posts query for a heavy, a medium and a
+light author, for the first page and for a keyset page halfway through the
+author's posts. With the listing index every page costs the same for all of
+them; --compare repeats the run with only the old author_id index, where
+every page load sorts all of the author's rows.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from config.listing import encode_cursor, listing_page
+from config.models import BlogPost
+
+BENCHMARK_ALIAS = 'listing_benchmark'
+INSERT_CHUNK = 20000
+
+
+class Command(BaseCommand):
+    help = 'Report the EXPLAIN plan and timings of the per-author BlogPost listing on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Synthetic BlogPost rows (default: 1,000,000)')
+        parser.add_argument('--authors', type=int, default=1000, help='Synthetic users (default: 1000)')
+        parser.add_argument('--page-size', type=int, default=20, help='Rows per listing page (default: 20)')
+        parser.add_argument('--repeat', type=int, default=25, help='Timed runs per query (default: 25)')
+        parser.add_argument('--compare', action='store_true',
+                            help='Also measure with only the single-column author_id index (the old schema)')
+        parser.add_argument('--db-path', help='Keep the benchmark database at this path (reused if it exists)')
+
+    def handle(self, *args, **options):
+        path = options['db_path'] or os.path.join(tempfile.mkdtemp(prefix='listing_benchmark_'), 'benchmark.sqlite3')
+        reuse = bool(options['db_path']) and os.path.exists(path)
+
+        settings_dict = dict(connections.databases[DEFAULT_DB_ALIAS])
+        settings_dict.update(ENGINE='django.db.backends.sqlite3', NAME=path, OPTIONS={},
+                             USER='', PASSWORD='', HOST='', PORT='')
+        connections.databases[BENCHMARK_ALIAS] = settings_dict
+
+        try:
+            call_command('migrate', database=BENCHMARK_ALIAS, verbosity=0)
+            if reuse and BlogPost.objects.using(BENCHMARK_ALIAS).exists():
+                self.stdout.write(f"Reusing {BlogPost.objects.using(BENCHMARK_ALIAS).count():,} rows in {path}")
+            else:
+                self._populate(options['rows'], options['authors'])
+
+            authors = self._sample_authors()
+            self.stdout.write(self.style.MIGRATE_HEADING('\nWith the (author, -created_at, -id) listing index'))
+            self._measure(authors, options['page_size'], options['repeat'])
+
+            if options['compare']:
+                self._use_old_index()
+                self.stdout.write(self.style.MIGRATE_HEADING('\nWith only the author_id index (old schema)'))
+                self._measure(authors, options['page_size'], options['repeat'])
+        finally:
+            connections[BENCHMARK_ALIAS].close()
+            del connections.databases[BENCHMARK_ALIAS]
+            if not options['db_path']:
+                os.remove(path)
+                os.rmdir(os.path.dirname(path))
+
+    def _populate(self, rows: int, author_count: int) -> None:
+        """Users plus skewed BlogPost rows with random creation times"""
+        started = time.monotonic()
+        User.objects.using(BENCHMARK_ALIAS).bulk_create([
+            User(username=f'benchmark{index}', password='!') for index in range(max(2, author_count))
+        ])
+        author_ids = list(User.objects.using(BENCHMARK_ALIAS).order_by('pk').values_list('pk', flat=True))
+
+        rng = random.Random(42)
+        now = timezone.now()
+        heavy, medium, rest = author_ids[0], author_ids[1], author_ids[2:] or author_ids[:1]
+
+        def author_for(index: int) -> int:
+            # Half the rows belong to one author, a tenth to another, the rest are spread out
+            slot = index % 20
+            if slot < 10:
+                return heavy
+            if slot < 12:
+                return medium
+            return rest[rng.randrange(len(rest))]
+
+        for start in range(0, rows, INSERT_CHUNK):
+            posts = [
+                BlogPost(
+                    title=f'Synthetic post {index}',
+                    description='Synthetic description for the listing benchmark.',
+                    content='Synthetic content.',
+                    excerpt='Synthetic description for the listing benchmark.',
+                    word_count=2,
+                    youtube_url=f'https://www.youtube.com/watch?v={index:011d}',
+                    author_id=author_for(index),
+                    created_at=now - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600)),
+                )
+                for index in range(start, min(start + INSERT_CHUNK, rows))
+            ]
+            with transaction.atomic(using=BENCHMARK_ALIAS):
+                BlogPost.objects.using(BENCHMARK_ALIAS).bulk_create(posts, batch_size=2000)
+            self.stdout.write(f"\rInserted {start + len(posts):,}/{rows:,} rows", ending='')
+            self.stdout.flush()
+
+        with connections[BENCHMARK_ALIAS].cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f"\nPopulated in {time.monotonic() - started:.0f}s")
+
+    def _sample_authors(self):
+        """(label, author id, row count) for the heaviest, a medium and a light author"""
+        counts = list(
+            BlogPost.objects.using(BENCHMARK_ALIAS).order_by().values('author_id')
+            .annotate(rows=models.Count('id')).order_by('-rows').values_list('author_id', 'rows')
+        )
+        if not counts:
+            return []
+        return [
+            ('heavy', *counts[0]),
+            ('medium', *counts[min(1, len(counts) - 1)]),
+            ('light', *counts[-1]),
+        ]
+
+    def _middle_cursor(self, author_id: int, rows: int):
+        """Cursor of a keyset page halfway through the author's posts"""
+        offset = max(0, rows // 2 - 1)
+        middle = (BlogPost.objects.using(BENCHMARK_ALIAS).filter(author_id=author_id)
+                  .only('id', 'created_at').order_by('-created_at', '-id')[offset:offset + 1])
+        for post in middle:
+            return encode_cursor(post)
+        return None
+
+    def _measure(self, authors, page_size: int, repeat: int) -> None:
+        """EXPLAIN the listing query once, then time the first and a middle page for each author"""
+        if not authors:
+            self.stdout.write('No rows to measure.')
+            return
+        with CaptureQueriesContext(connections[BENCHMARK_ALIAS]) as captured:
+            listing_page(authors[0][1], self._middle_cursor(authors[0][1], authors[0][2]),
+                         page_size, using=BENCHMARK_ALIAS)
+        sql = captured.captured_queries[-1]['sql']
+        self.stdout.write(f"SQL: {sql}")
+        self.stdout.write('Plan:')
+        with connections[BENCHMARK_ALIAS].cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            for row in cursor.fetchall():
+                self.stdout.write(f"  {row[-1]}")
+
+        self.stdout.write(f"{'author':<8} {'rows':>10} {'first median ms':>16} {'p95':>8} {'middle median ms':>17} {'p95':>8}")
+        for label, author_id, rows in authors:
+            columns = []
+            for cursor in (None, self._middle_cursor(author_id, rows)):
+                timings = []
+                for _ in range(max(1, repeat)):
+                    started = time.perf_counter()
+                    listing_page(author_id, cursor, page_size, using=BENCHMARK_ALIAS)
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                columns.append((statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))]))
+            (first, first_p95), (middle, middle_p95) = columns
+            self.stdout.write(f"{label:<8} {rows:>10,} {first:>16.2f} {first_p95:>8.2f} {middle:>17.2f} {middle_p95:>8.2f}")
+
+    def _use_old_index(self) -> None:
+        """Swap the listing index for the single-column FK index of migration 0001"""
+        with connections[BENCHMARK_ALIAS].schema_editor() as schema_editor:
+            for index in BlogPost._meta.indexes:
+                schema_editor.remove_index(BlogPost, index)
+            schema_editor.execute(
+                f'CREATE INDEX "benchmark_blogpost_author_id" ON "{BlogPost._meta.db_table}" ("author_id")'
+            )
+        with connections[BENCHMARK_ALIAS].cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,163 @@
+"""
+Stress concurrent BlogPost writes against SQLite, untuned vs tuned
+Run with: python manage.py benchmark_db_writes [--writers 8] [--writes 100] [--readers 2]
+
+Each profile gets a throwaway database (migrated like the real one). Writer
+threads create BlogPost rows the way finished generation jobs do, while
+reader threads stream the table with open cursors like a long listing or
+export. Reported per profile: committed writes per second, p95 write
+latency, how many writes and reads failed with "database is locked", and
+how many full table reads completed.
+
+  default - Django's SQLite defaults (rollback journal, synchronous=FULL,
+            5s busy timeout, deferred transactions)
+  tuned   - settings.SQLITE_TUNED_OPTIONS (WAL, synchronous=NORMAL,
+            busy_timeout, mmap, IMMEDIATE transactions)
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from config.models import BlogPost
+
+BENCHMARK_ALIAS = 'write_benchmark'
+PROFILES = {
+    'default': {},
+    'tuned': settings.SQLITE_TUNED_OPTIONS,
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent BlogPost write throughput on SQLite with and without the tuned options'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Writer threads (default: 8)')
+        parser.add_argument('--writes', type=int, default=100, help='Posts created per writer (default: 100)')
+        parser.add_argument('--readers', type=int, default=2, help='Streaming reader threads (default: 2)')
+        parser.add_argument('--seed-rows', type=int, default=5000,
+                            help='Rows created before the run so reads take a while (default: 5000)')
+        parser.add_argument('--profile', choices=['both', *PROFILES], default='both')
+
+    def handle(self, *args, **options):
+        profiles = list(PROFILES) if options['profile'] == 'both' else [options['profile']]
+        self.stdout.write(f"{options['writers']} writer(s) x {options['writes']} post(s), "
+                          f"{options['readers']} reader(s), {options['seed_rows']:,} seed rows")
+        self.stdout.write(f"{'profile':<8} {'writes/s':>9} {'p95 ms':>8} {'w-locked':>9} {'r-locked':>9} "
+                          f"{'reads':>6} {'seconds':>8}")
+        for profile in profiles:
+            directory = tempfile.mkdtemp(prefix='write_benchmark_')
+            try:
+                self._use_database(os.path.join(directory, 'benchmark.sqlite3'), PROFILES[profile])
+                call_command('migrate', database=BENCHMARK_ALIAS, verbosity=0)
+                author_id = self._seed(options['seed_rows'])
+                result = self._run(author_id, options['writers'], options['writes'], options['readers'])
+                self.stdout.write(
+                    f"{profile:<8} {result['throughput']:>9.1f} {result['p95_ms']:>8.1f} "
+                    f"{result['write_locked']:>9} {result['read_locked']:>9} "
+                    f"{result['reads']:>6} {result['seconds']:>8.2f}"
+                )
+            finally:
+                connections[BENCHMARK_ALIAS].close()
+                # Forget this thread's wrapper too, or the next profile reuses its settings
+                del connections[BENCHMARK_ALIAS]
+                del connections.databases[BENCHMARK_ALIAS]
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def _use_database(self, path: str, options: dict) -> None:
+        settings_dict = dict(connections.databases[DEFAULT_DB_ALIAS])
+        settings_dict.update(ENGINE='django.db.backends.sqlite3', NAME=path, OPTIONS=dict(options),
+                             USER='', PASSWORD='', HOST='', PORT='', CONN_MAX_AGE=0)
+        connections.databases[BENCHMARK_ALIAS] = settings_dict
+
+    def _seed(self, rows: int) -> int:
+        author = User.objects.db_manager(BENCHMARK_ALIAS).create(username='write-benchmark', password='!')
+        BlogPost.objects.using(BENCHMARK_ALIAS).bulk_create(
+            [self._post(author.pk, f'seed-{index}') for index in range(rows)], batch_size=1000
+        )
+        return author.pk
+
+    @staticmethod
+    def _post(author_id: int, label: str) -> BlogPost:
+        return BlogPost(
+            title=f'Benchmark post {label}',
+            description='Synthetic description for the write benchmark.',
+            content='Synthetic content. ' * 200,
+            youtube_url='https://www.youtube.com/watch?v=benchmark00',
+            author_id=author_id,
+        )
+
+    def _run(self, author_id: int, writers: int, writes: int, readers: int) -> dict:
+        latencies, counts = [], {'write_locked': 0, 'read_locked': 0, 'reads': 0}
+        lock = threading.Lock()
+        writers_done = threading.Event()
+        start_gate = threading.Barrier(writers + readers + 1)
+
+        def write(worker: int) -> None:
+            start_gate.wait()
+            try:
+                for index in range(writes):
+                    started = time.perf_counter()
+                    try:
+                        self._post(author_id, f'{worker}-{index}').save(force_insert=True, using=BENCHMARK_ALIAS)
+                    except OperationalError as e:
+                        if 'locked' not in str(e):
+                            raise
+                        with lock:
+                            counts['write_locked'] += 1
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connections[BENCHMARK_ALIAS].close()
+
+        def read() -> None:
+            start_gate.wait()
+            try:
+                while not writers_done.is_set():
+                    # An open cursor over the whole table, consumed slowly
+                    queryset = BlogPost.objects.using(BENCHMARK_ALIAS).only('id', 'title').order_by('pk')
+                    try:
+                        for position, _ in enumerate(queryset.iterator(chunk_size=100)):
+                            if position % 100 == 0:
+                                time.sleep(0.001)
+                            if writers_done.is_set():
+                                break
+                    except OperationalError as e:
+                        if 'locked' not in str(e):
+                            raise
+                        with lock:
+                            counts['read_locked'] += 1
+                        continue
+                    with lock:
+                        counts['reads'] += 1
+            finally:
+                connections[BENCHMARK_ALIAS].close()
+
+        writer_threads = [threading.Thread(target=write, args=(worker,)) for worker in range(writers)]
+        reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+        for thread in writer_threads + reader_threads:
+            thread.start()
+        start_gate.wait()
+        started = time.perf_counter()
+        for thread in writer_threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+        writers_done.set()
+        for thread in reader_threads:
+            thread.join()
+
+        latencies.sort()
+        return {
+            'throughput': len(latencies) / seconds if seconds else 0.0,
+            'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0.0,
+            'seconds': seconds,
+            **counts,
+        }
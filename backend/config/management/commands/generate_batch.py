@@ -0,0 +1,63 @@
+"""
+Generate blog posts for a playlist or a list of YouTube URLs
+Run with: python manage.py generate_batch --user alice URL [URL ...] [--file urls.txt]
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from config.batches import BATCH_WORKERS, batch_summary, create_batch, run_batch
+from config.models import GenerationJob
+
+
+class Command(BaseCommand):
+    help = 'Expand playlists and generate blog posts for every video on a bounded worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', help='Video and/or playlist URLs')
+        parser.add_argument('--file', help='Text file with one URL per line')
+        parser.add_argument('--user', required=True, help='Username that will own the blog posts')
+        parser.add_argument('--workers', type=int, default=BATCH_WORKERS,
+                            help='Videos processed concurrently (default: BATCH_WORKERS or 3)')
+        parser.add_argument('--regenerate', action='store_true',
+                            help="Don't reuse cached LLM responses")
+        parser.add_argument('--enqueue', action='store_true',
+                            help='Only queue the batch for the generation workers')
+
+    def handle(self, *args, **options):
+        urls = list(options['urls'])
+        if options['file']:
+            with open(options['file'], 'r', encoding='utf-8') as f:
+                urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+        if not urls:
+            raise CommandError('Provide at least one URL or --file')
+
+        try:
+            author = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        batch = create_batch(urls, author, regenerate=options['regenerate'])
+        if options['enqueue']:
+            self.stdout.write(self.style.SUCCESS(f"Queued batch {batch.pk} ({len(urls)} source(s))"))
+            return
+
+        # Run in this process instead of waiting for a worker
+        batch.status = GenerationJob.STATUS_RUNNING
+        batch.started_at = batch.heartbeat_at = timezone.now()
+        batch.attempts = 1
+        batch.save(update_fields=['status', 'started_at', 'heartbeat_at', 'attempts'])
+
+        def report(item, result):
+            if result.get('success'):
+                self.stdout.write(f"  done    {item.youtube_url}")
+            else:
+                self.stdout.write(self.style.WARNING(f"  failed  {item.youtube_url}: {result.get('error')}"))
+
+        self.stdout.write(f"Running batch {batch.pk} with {options['workers']} worker(s)...")
+        run_batch(batch, max_workers=options['workers'], on_item=report)
+
+        summary = batch_summary(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f"Batch {batch.pk} {summary['status']}: {summary['counts'].get('done', 0)}/{summary['total']} blog post(s) created"
+        ))
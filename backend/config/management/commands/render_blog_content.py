@@ -0,0 +1,48 @@
+"""
+Render stored blog content to HTML for posts that predate the current renderer
+Run with: python manage.py render_blog_content [--batch-size 200] [--sleep 0.5]
+
+blog_details renders a stale post on its first view anyway; this backfills
+the rest in small batches (optionally pausing between them) so a big table
+isn't rewritten in one transaction.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from config.models import BlogPost
+from config.rendering import CONTENT_RENDER_VERSION
+
+
+class Command(BaseCommand):
+    help = 'Backfill BlogPost.content_html for posts rendered by an older (or no) renderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Posts rendered per batch (default: 200)')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches')
+        parser.add_argument('--limit', type=int, help='Stop after this many posts')
+        parser.add_argument('--all', action='store_true', help='Re-render every post, not only stale ones')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        queryset = BlogPost.objects.only('id', 'content').order_by('pk')
+        if not options['all']:
+            queryset = queryset.exclude(content_html_version=CONTENT_RENDER_VERSION)
+
+        rendered = 0
+        last_pk = 0
+        while options['limit'] is None or rendered < options['limit']:
+            size = batch_size if options['limit'] is None else min(batch_size, options['limit'] - rendered)
+            posts = list(queryset.filter(pk__gt=last_pk)[:size])
+            if not posts:
+                break
+            for post in posts:
+                post.refresh_content_html()
+            BlogPost.objects.bulk_update(posts, ['content_html', 'content_html_version'])
+            rendered += len(posts)
+            last_pk = posts[-1].pk
+            self.stdout.write(f"Rendered {rendered} post(s)")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {rendered} post(s) rendered with renderer {CONTENT_RENDER_VERSION}"))
@@ -0,0 +1,39 @@
+"""
+Run the pool of background blog generation workers
+Run with: python manage.py run_generation_workers --workers 2
+Async workers: python manage.py run_generation_workers --workers 1 --async-jobs 20
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from config.jobs import (
+    ASYNC_WORKER_JOBS, DEFAULT_POLL_INTERVAL, DEFAULT_WORKER_COUNT, start_worker_pool, stop_worker_pool,
+)
+
+
+class Command(BaseCommand):
+    help = 'Start local worker processes that process queued blog generation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKER_COUNT,
+                            help='Number of worker processes (default: GENERATION_WORKERS or 2)')
+        parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                            help='Seconds to wait between queue checks when idle')
+        parser.add_argument('--async-jobs', type=int, default=ASYNC_WORKER_JOBS,
+                            help='Run each worker as an asyncio worker with this many concurrent jobs '
+                                 '(default: GENERATION_ASYNC_JOBS or 0, i.e. threaded workers)')
+
+    def handle(self, *args, **options):
+        processes, stop_event = start_worker_pool(options['workers'], options['poll_interval'],
+                                                  async_jobs=options['async_jobs'])
+        mode = f" (async, up to {options['async_jobs']} jobs each)" if options['async_jobs'] > 0 else ''
+        self.stdout.write(self.style.SUCCESS(f"Started {len(processes)} generation worker(s){mode}"))
+
+        try:
+            while any(process.is_alive() for process in processes):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping generation workers...")
+        finally:
+            stop_worker_pool(processes, stop_event)
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0002_generationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=20)),
+                ('provider', models.CharField(max_length=30)),
+                ('model_name', models.CharField(blank=True, max_length=50)),
+                ('transcript', models.TextField()),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Transcript Cache Entry',
+                'verbose_name_plural': 'Transcript Cache Entries',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'provider', 'model_name'), name='unique_transcript_cache_key')],
+            },
+        ),
+    ]
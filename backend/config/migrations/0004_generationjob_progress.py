@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0003_transcriptcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
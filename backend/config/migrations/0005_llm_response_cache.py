@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0004_generationjob_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='regenerate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='LLMResponseCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=50)),
+                ('response', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'LLM Response Cache Entry',
+                'verbose_name_plural': 'LLM Response Cache Entries',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0005_llm_response_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='video_id',
+            field=models.CharField(blank=True, db_index=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='generationjob',
+            name='leader',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='followers', to='config.generationjob'),
+        ),
+    ]
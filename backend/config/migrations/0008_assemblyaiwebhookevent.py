@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0007_generationbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssemblyAIWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transcript_id', models.CharField(max_length=64, unique=True)),
+                ('status', models.CharField(max_length=20)),
+                ('received_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'AssemblyAI Webhook Event',
+                'verbose_name_plural': 'AssemblyAI Webhook Events',
+                'ordering': ['-received_at'],
+            },
+        ),
+    ]
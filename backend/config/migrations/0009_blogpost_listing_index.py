@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+LISTING_INDEX_NAME = 'blogpost_author_created_idx'
+# Columns all_blog_posts shows, stored in the index where INCLUDE is supported
+LISTING_INCLUDE_COLUMNS = ['title', 'category']
+
+
+def listing_index(connection):
+    include = LISTING_INCLUDE_COLUMNS if connection.features.supports_covering_indexes else None
+    return models.Index(fields=['author', '-created_at'], name=LISTING_INDEX_NAME, include=include)
+
+
+def create_listing_index(apps, schema_editor):
+    BlogPost = apps.get_model('config', 'BlogPost')
+    schema_editor.add_index(BlogPost, listing_index(schema_editor.connection))
+
+
+def drop_listing_index(apps, schema_editor):
+    BlogPost = apps.get_model('config', 'BlogPost')
+    schema_editor.remove_index(BlogPost, listing_index(schema_editor.connection))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0008_assemblyaiwebhookevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Covering on PostgreSQL, a plain composite index elsewhere; the model
+        # state only knows the composite index (same name on every database)
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='blogpost',
+                    index=models.Index(fields=['author', '-created_at'], name=LISTING_INDEX_NAME),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_listing_index, drop_listing_index),
+            ],
+        ),
+        # The composite index starts with author_id, so the FK's own index is redundant
+        migrations.AlterField(
+            model_name='blogpost',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='blog_posts', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
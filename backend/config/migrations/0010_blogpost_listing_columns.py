@@ -0,0 +1,90 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:55
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+OLD_INDEX_NAME = 'blogpost_author_created_idx'
+LISTING_INDEX_NAME = 'blogpost_author_listing_idx'
+# Columns all_blog_posts shows, stored in the index where INCLUDE is supported
+OLD_INCLUDE_COLUMNS = ['title', 'category']
+LISTING_INCLUDE_COLUMNS = ['title', 'category', 'excerpt', 'word_count']
+BACKFILL_BATCH = 500
+
+
+def old_index(connection):
+    include = OLD_INCLUDE_COLUMNS if connection.features.supports_covering_indexes else None
+    return models.Index(fields=['author', '-created_at'], name=OLD_INDEX_NAME, include=include)
+
+
+def listing_index(connection):
+    include = LISTING_INCLUDE_COLUMNS if connection.features.supports_covering_indexes else None
+    return models.Index(fields=['author', '-created_at', '-id'], name=LISTING_INDEX_NAME, include=include)
+
+
+def swap_to_listing_index(apps, schema_editor):
+    BlogPost = apps.get_model('config', 'BlogPost')
+    schema_editor.remove_index(BlogPost, old_index(schema_editor.connection))
+    schema_editor.add_index(BlogPost, listing_index(schema_editor.connection))
+
+
+def swap_to_old_index(apps, schema_editor):
+    BlogPost = apps.get_model('config', 'BlogPost')
+    schema_editor.remove_index(BlogPost, listing_index(schema_editor.connection))
+    schema_editor.add_index(BlogPost, old_index(schema_editor.connection))
+
+
+def backfill_listing_fields(apps, schema_editor):
+    BlogPost = apps.get_model('config', 'BlogPost')
+    db_alias = schema_editor.connection.alias
+    batch = []
+    for post in BlogPost.objects.using(db_alias).only('id', 'description', 'content').iterator(chunk_size=BACKFILL_BATCH):
+        post.excerpt = Truncator(post.description).words(30)[:300]
+        post.word_count = len(post.content.split())
+        batch.append(post)
+        if len(batch) >= BACKFILL_BATCH:
+            BlogPost.objects.using(db_alias).bulk_update(batch, ['excerpt', 'word_count'])
+            batch = []
+    if batch:
+        BlogPost.objects.using(db_alias).bulk_update(batch, ['excerpt', 'word_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0009_blogpost_listing_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='blogpost',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Blog Post', 'verbose_name_plural': 'Blog Posts'},
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=300),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_listing_fields, migrations.RunPython.noop),
+        # id joins the index as the keyset tie-breaker; covering on PostgreSQL
+        # as in 0009, a plain composite index elsewhere
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='blogpost',
+                    name=OLD_INDEX_NAME,
+                ),
+                migrations.AddIndex(
+                    model_name='blogpost',
+                    index=models.Index(fields=['author', '-created_at', '-id'], name=LISTING_INDEX_NAME),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(swap_to_listing_index, swap_to_old_index),
+            ],
+        ),
+    ]
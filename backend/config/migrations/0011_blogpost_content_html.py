@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0010_blogpost_listing_columns'),
+    ]
+
+    operations = [
+        # Existing rows are rendered on first view or by render_blog_content
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('config', '0012_generationjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationbatch',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='generationbatch',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -3,6 +3,18 @@ Models for the AI Blog Generator application
 """
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.text import Truncator
+
+from .rendering import CONTENT_RENDER_VERSION, render_content
+
+# all_blog_posts shows the first EXCERPT_WORDS words of the description
+EXCERPT_WORDS = 30
+EXCERPT_MAX_LENGTH = 300
+
+
+def listing_excerpt(description: str) -> str:
+    """Listing excerpt, the same text as the old description|truncatewords:30"""
+    return Truncator(description).words(EXCERPT_WORDS)[:EXCERPT_MAX_LENGTH]
 
 
 class BlogPost(models.Model):
@@ -18,15 +30,226 @@ class BlogPost(models.Model):
     youtube_channel = models.CharField(max_length=100, blank=True)
     youtube_duration = models.CharField(max_length=20, blank=True)
     
-    # User and timestamps
-    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts')
+    # Listing columns, derived from description/content on save so the
+    # listing never loads content or re-tokenizes text per render
+    excerpt = models.CharField(max_length=EXCERPT_MAX_LENGTH, blank=True, default='')
+    word_count = models.PositiveIntegerField(default=0)
+    # content rendered to sanitized HTML on save, stamped with the renderer version
+    content_html = models.TextField(blank=True, default='')
+    content_html_version = models.CharField(max_length=32, blank=True, default='')
+    
+    # User and timestamps (author lookups use the listing index below)
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
         verbose_name = 'Blog Post'
         verbose_name_plural = 'Blog Posts'
+        indexes = [
+            # Per-author listing in display order: an index range scan, no sort,
+            # and the id tie-breaker makes keyset pages seek straight to the cursor.
+            # Migration 0010 adds the listing columns as INCLUDE columns where the
+            # database supports covering indexes (PostgreSQL).
+            models.Index(fields=['author', '-created_at', '-id'], name='blogpost_author_listing_idx'),
+        ]
     
     def __str__(self):
         return self.title
+
+    def refresh_listing_fields(self):
+        """Recompute excerpt and word_count"""
+        self.excerpt = listing_excerpt(self.description)
+        self.word_count = len(self.content.split())
+
+    def refresh_content_html(self):
+        """Render content to HTML with the current renderer"""
+        self.content_html = render_content(self.content)
+        self.content_html_version = CONTENT_RENDER_VERSION
+
+    @property
+    def content_html_is_current(self) -> bool:
+        return self.content_html_version == CONTENT_RENDER_VERSION
+
+    def refresh_derived_fields(self):
+        """Recompute every field derived from description/content (bulk_create skips save())"""
+        self.refresh_listing_fields()
+        self.refresh_content_html()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        changed = {'description', 'content'}
+        if update_fields is not None:
+            changed &= set(update_fields)
+        # Instances loaded for the listing have description/content deferred
+        loaded = not {'description', 'content'} & self.get_deferred_fields()
+        derived = []
+        if changed and loaded:
+            self.refresh_listing_fields()
+            derived += ['excerpt', 'word_count']
+            if 'content' in changed:
+                self.refresh_content_html()
+                derived += ['content_html', 'content_html_version']
+        if update_fields is not None and derived:
+            kwargs['update_fields'] = {*update_fields, *derived}
+        super().save(*args, **kwargs)
+
+
+class GenerationJob(models.Model):
+    """Queued blog generation request processed by the background workers"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    youtube_url = models.URLField()
+    video_id = models.CharField(max_length=20, blank=True, db_index=True)
+    regenerate = models.BooleanField(default=False)  # Skip cached LLM responses
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    error = models.TextField(blank=True)
+    
+    # Live progress while running: {'stage': ..., 'title': ..., 'description': ..., 'content': ...}
+    progress = models.JSONField(default=dict, blank=True)
+    
+    # Job already processing the same video; this one copies its result instead of re-running
+    leader = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='followers',
+    )
+    
+    # Set for items of a batch (run by the batch runner, not claimed individually)
+    batch = models.ForeignKey(
+        'GenerationBatch',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+    )
+    
+    # Result of a successful run
+    blog_post = models.ForeignKey(
+        BlogPost,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='generation_jobs',
+    )
+    
+    # User and timestamps
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='generation_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    # Refreshed by the worker while running; a stale heartbeat means the worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Generation Job'
+        verbose_name_plural = 'Generation Jobs'
+    
+    def __str__(self):
+        return f"Job {self.pk} ({self.status}): {self.youtube_url}"
+
+
+class GenerationBatch(models.Model):
+    """Playlist or list of URLs generated together on a bounded worker pool"""
+    STATUS_CHOICES = GenerationJob.STATUS_CHOICES
+    
+    # Playlist and/or video URLs as submitted; expanded into jobs when the batch runs
+    sources = models.JSONField(default=list)
+    regenerate = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=GenerationJob.STATUS_QUEUED,
+        db_index=True,
+    )
+    error = models.TextField(blank=True)
+    
+    # User and timestamps
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='generation_batches')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while running; a stale heartbeat means the worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Generation Batch'
+        verbose_name_plural = 'Generation Batches'
+    
+    def __str__(self):
+        return f"Batch {self.pk} ({self.status}): {len(self.sources)} source(s)"
+
+
+class TranscriptCacheEntry(models.Model):
+    """Transcript of a YouTube video, reused across blog generations"""
+    video_id = models.CharField(max_length=20)
+    provider = models.CharField(max_length=30)
+    model_name = models.CharField(max_length=50, blank=True)
+    transcript = models.TextField()
+    size_bytes = models.PositiveIntegerField(default=0)
+    hit_count = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Transcript Cache Entry'
+        verbose_name_plural = 'Transcript Cache Entries'
+        constraints = [
+            models.UniqueConstraint(fields=['video_id', 'provider', 'model_name'], name='unique_transcript_cache_key'),
+        ]
+    
+    def __str__(self):
+        return f"{self.video_id} ({self.provider}/{self.model_name or 'default'})"
+
+
+class LLMResponseCacheEntry(models.Model):
+    """Raw LLM response for a prompt, keyed by a hash of everything that shaped it"""
+    key = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=50)
+    response = models.TextField()
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'LLM Response Cache Entry'
+        verbose_name_plural = 'LLM Response Cache Entries'
+    
+    def __str__(self):
+        return f"{self.key[:12]} ({self.model_name})"
+
+
+class AssemblyAIWebhookEvent(models.Model):
+    """Completion notification AssemblyAI sent for a transcript (read by the waiting worker)"""
+    transcript_id = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20)
+    
+    received_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-received_at']
+        verbose_name = 'AssemblyAI Webhook Event'
+        verbose_name_plural = 'AssemblyAI Webhook Events'
+    
+    def __str__(self):
+        return f"{self.transcript_id} ({self.status})"
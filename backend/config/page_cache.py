@@ -0,0 +1,109 @@
+"""
+Rendered-page cache for the blog pages
+
+blog_details and all_blog_posts render the same HTML until a post changes,
+so the rendered body is cached and browsers revalidate it with ETag and
+Last-Modified (a 304 skips the body entirely):
+
+  detail  - keyed by (user, post id, updated_at, renderer version); an edit
+            moves updated_at, so the key moves with the post
+  listing - keyed by (user, cursor) and the user's listing stamp, the time
+            one of their posts was last saved or deleted
+
+config/signals.py drops detail entries and bumps the listing stamp on
+save/delete. The delete forms carry the session's CSRF token, so pages are
+cached with a placeholder that is filled in on every response.
+
+Entries live in the default Django cache (CACHE_BACKEND in settings).
+"""
+import hashlib
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .listing import decode_cursor
+from .rendering import CONTENT_RENDER_VERSION
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'blog-pages'
+# Rendered in place of the CSRF token; survives HTML escaping unchanged
+CSRF_PLACEHOLDER = 'csrf-token-placeholder-5d1e8a'
+
+
+def detail_key(user_id: int, post_id: int, updated_at: datetime) -> str:
+    return f"{KEY_PREFIX}:detail:{user_id}:{post_id}:{updated_at.isoformat()}:{CONTENT_RENDER_VERSION}"
+
+
+def _listing_stamp_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:listing-stamp:{user_id}"
+
+
+def listing_stamp(user_id: int) -> datetime:
+    """When the user's listing last changed (as far as the cache knows)"""
+    key = _listing_stamp_key(user_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        # First view, or the stamp was evicted: start from now
+        cache.add(key, timezone.now(), None)
+        stamp = cache.get(key) or timezone.now()
+    return stamp
+
+
+def touch_listing(user_id: int) -> None:
+    """Invalidate every cached listing page of the user"""
+    cache.set(_listing_stamp_key(user_id), timezone.now(), None)
+
+
+def listing_key(user_id: int, stamp: datetime, cursor: Optional[str]) -> str:
+    # Malformed cursors show the first page, so they share its entry
+    page = cursor if decode_cursor(cursor) else 'first'
+    return f"{KEY_PREFIX}:listing:{user_id}:{stamp.isoformat()}:{page}"
+
+
+def forget_detail(user_id: int, post_id: int, updated_at: Optional[datetime]) -> None:
+    if updated_at is not None:
+        cache.delete(detail_key(user_id, post_id, updated_at))
+
+
+def render_cacheable(request, template_name: str, context: dict) -> HttpResponse:
+    """render() with the CSRF token left as a placeholder"""
+    return render(request, template_name, {**context, 'csrf_token': CSRF_PLACEHOLDER})
+
+
+def cached_page(request, key: str, last_modified: datetime,
+                render_page: Callable[[], HttpResponse]) -> HttpResponse:
+    """
+    Serve the page cached under key, rendering it with render_page on a miss.
+    Conditional requests that still match get a 304.
+    """
+    # Strong validator: the body only differs between responses by CSRF token
+    etag = f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if response is None:
+        body = cache.get(key)
+        if body is None:
+            rendered = render_page()
+            if rendered.status_code != 200:
+                return rendered
+            body = rendered.content.decode(rendered.charset)
+            cache.set(key, body)
+        else:
+            logger.debug(f"Page cache hit: {key}")
+        response = HttpResponse(body.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    # Revalidate on every view so edits show up immediately
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+    return response
@@ -0,0 +1,78 @@
+"""
+Per-provider latency and success statistics
+
+Keeps an exponentially weighted moving average of latency and a success
+rate for every provider (transcription or LLM) in this process, and uses
+them to order providers by expected time-to-good-result. Providers without
+enough samples are tried first, in their configured order, so new or
+recovered providers get explored.
+"""
+import threading
+from typing import Dict, List
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.3
+# Samples needed before a provider's statistics affect the ordering
+MIN_SAMPLES = 2
+
+
+class _ProviderRecord:
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.latency_ewma = None
+        self.success_ewma = 1.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'calls': self.calls,
+            'successes': self.successes,
+            'failures': self.failures,
+            'latency_ewma': round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            'success_rate': round(self.success_ewma, 3),
+        }
+
+
+class ProviderStats:
+    """Thread-safe latency/success bookkeeping for a family of providers"""
+
+    def __init__(self, alpha: float = EWMA_ALPHA, min_samples: int = MIN_SAMPLES):
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self._records: Dict[str, _ProviderRecord] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, latency: float, success: bool) -> None:
+        """Add one call outcome (latency in seconds; only successes update the latency average)"""
+        with self._lock:
+            record = self._records.setdefault(provider, _ProviderRecord())
+            record.calls += 1
+            if success:
+                record.successes += 1
+                if record.latency_ewma is None:
+                    record.latency_ewma = latency
+                else:
+                    record.latency_ewma = self.alpha * latency + (1 - self.alpha) * record.latency_ewma
+            else:
+                record.failures += 1
+            record.success_ewma = self.alpha * (1.0 if success else 0.0) + (1 - self.alpha) * record.success_ewma
+
+    def score(self, provider: str) -> float:
+        """Expected seconds to a good result (lower is better, 0 if not enough data)"""
+        with self._lock:
+            record = self._records.get(provider)
+            if record is None or record.calls < self.min_samples:
+                return 0.0
+            if record.latency_ewma is None:
+                # Never succeeded: try it last
+                return float('inf')
+            return record.latency_ewma / max(record.success_ewma, 0.05)
+
+    def order(self, providers: List[str]) -> List[str]:
+        """Providers sorted by score; ties keep the configured order"""
+        return sorted(providers, key=self.score)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: record.as_dict() for name, record in self._records.items()}
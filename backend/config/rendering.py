@@ -0,0 +1,152 @@
+"""
+Render blog content (Markdown, as the LLMs write it) to sanitized HTML
+
+BlogPost stores the result in content_html when the content is saved, so
+blog_details serves it as-is. With the markdown and nh3 packages installed
+the full Markdown syntax is rendered and the output is cleaned against a tag
+allowlist; without them a built-in renderer covers what the generated posts
+use (headings, paragraphs, lists, quotes, rules, emphasis, code and links).
+It escapes the text before adding any markup, so its output is safe as is.
+
+CONTENT_RENDER_VERSION is stored next to the HTML. Bump RENDER_VERSION when
+the output changes; rows with another stamp are re-rendered on view and by
+the render_blog_content command.
+"""
+import re
+import html
+from typing import List
+
+try:
+    import markdown
+    import nh3
+except ImportError:
+    markdown = None
+    nh3 = None
+
+RENDER_VERSION = 3
+CONTENT_RENDER_VERSION = f"{RENDER_VERSION}-{'markdown' if markdown is not None else 'basic'}"
+
+ALLOWED_TAGS = {
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'br', 'hr', 'ul', 'ol', 'li', 'blockquote',
+    'strong', 'em', 'code', 'pre', 'a', 'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+ALLOWED_ATTRIBUTES = {'a': {'href', 'title'}}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto'}
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_BULLET = re.compile(r'^\s*[-*+]\s+(.*)$')
+_NUMBERED = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+_QUOTE = re.compile(r'^\s*>\s?(.*)$')
+_RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+_CODE_SPAN = re.compile(r'`([^`\n]+)`')
+# URLs never contain a code-span placeholder (\x00), so a link can't pull markup into its href
+_LINK = re.compile(r'\[([^\]\n]+)\]\(((?:https?://|mailto:)[^\s)\x00]+)\)')
+_STRONG = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+_EMPHASIS = re.compile(r'(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?![\w*])|(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)')
+
+
+def _emphasis(text: str) -> str:
+    text = _STRONG.sub(r'<strong>\2</strong>', text)
+    return _EMPHASIS.sub(lambda m: f'<em>{m.group(1) or m.group(2)}</em>', text)
+
+
+def _inline(text: str) -> str:
+    """Escape a line of text and apply inline Markdown"""
+    # Code spans and links are set aside first, so emphasis never reaches
+    # code or a URL; only link text gets it
+    spans = []
+
+    def keep(markup: str) -> str:
+        spans.append(markup)
+        return f'\x00{len(spans) - 1}\x00'
+
+    def keep_code(match):
+        return keep(f'<code>{html.escape(match.group(1), quote=False)}</code>')
+
+    def keep_link(match):
+        # The URL is already escaped apart from quotes
+        url = match.group(2).replace('"', '&quot;')
+        return keep(f'<a href="{url}" rel="nofollow noopener">{_emphasis(match.group(1))}</a>')
+
+    text = html.escape(_CODE_SPAN.sub(keep_code, text.replace('\x00', '')), quote=False)
+    text = _emphasis(_LINK.sub(keep_link, text))
+    # Link text can hold code placeholders, so restore until none are left
+    while '\x00' in text:
+        text = re.sub('\x00(\\d+)\x00', lambda m: spans[int(m.group(1))], text)
+    return text
+
+
+def _render_basic(content: str) -> str:
+    """Built-in renderer for the Markdown subset the generated posts use"""
+    blocks: List[str] = []
+    paragraph: List[str] = []
+    items: List[str] = []
+    list_tag = None
+    quote: List[str] = []
+
+    def flush() -> None:
+        nonlocal list_tag
+        if paragraph:
+            blocks.append(f"<p>{'<br>'.join(_inline(line) for line in paragraph)}</p>")
+            paragraph.clear()
+        if items:
+            blocks.append(f"<{list_tag}>{''.join(f'<li>{_inline(item)}</li>' for item in items)}</{list_tag}>")
+            items.clear()
+            list_tag = None
+        if quote:
+            blocks.append(f"<blockquote><p>{'<br>'.join(_inline(line) for line in quote)}</p></blockquote>")
+            quote.clear()
+
+    for line in content.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+        if not line.strip():
+            flush()
+            continue
+        if _RULE.match(line):
+            flush()
+            blocks.append('<hr>')
+            continue
+        heading = _HEADING.match(line)
+        if heading:
+            flush()
+            level = len(heading.group(1))
+            blocks.append(f'<h{level}>{_inline(heading.group(2))}</h{level}>')
+            continue
+        bullet, numbered = _BULLET.match(line), _NUMBERED.match(line)
+        if bullet or numbered:
+            tag = 'ul' if bullet else 'ol'
+            if tag != list_tag:
+                flush()
+                list_tag = tag
+            items.append((bullet or numbered).group(1))
+            continue
+        quoted = _QUOTE.match(line)
+        if quoted:
+            if not quote:
+                flush()
+            quote.append(quoted.group(1))
+            continue
+        if items and line.startswith((' ', '\t')):
+            # Continuation of the previous list item
+            items[-1] += ' ' + line.strip()
+            continue
+        if items or quote:
+            flush()
+        paragraph.append(line.strip())
+    flush()
+    return '\n'.join(blocks)
+
+
+def render_content(content: str) -> str:
+    """Sanitized HTML for a post's Markdown content"""
+    if not content:
+        return ''
+    if markdown is not None:
+        rendered = markdown.markdown(content, extensions=['extra', 'sane_lists', 'nl2br'])
+        return nh3.clean(
+            rendered,
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            url_schemes=ALLOWED_URL_SCHEMES,
+            link_rel='nofollow noopener',
+        )
+    return _render_basic(content)
@@ -0,0 +1,233 @@
+"""
+Managed scratch space for audio jobs
+
+Every job gets its own directory under SCRATCH_ROOT that is removed as a
+whole when the job finishes, including partial downloads, original-format
+files and chunk directories. Jobs reserve space up front; when the reserved
+plus used bytes would exceed SCRATCH_QUOTA_MB, or the disk would drop below
+SCRATCH_MIN_FREE_MB, new jobs wait until space frees up. A reaper removes
+directories left behind by crashed workers.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import tempfile
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Scratch space configuration
+SCRATCH_ROOT = os.environ.get('SCRATCH_ROOT', os.path.join(tempfile.gettempdir(), 'ai_blog_scratch'))
+SCRATCH_QUOTA_MB = float(os.environ.get('SCRATCH_QUOTA_MB', '4096'))
+SCRATCH_MIN_FREE_MB = float(os.environ.get('SCRATCH_MIN_FREE_MB', '512'))
+SCRATCH_DEFAULT_RESERVE_MB = float(os.environ.get('SCRATCH_DEFAULT_RESERVE_MB', '300'))
+SCRATCH_WAIT_TIMEOUT = float(os.environ.get('SCRATCH_WAIT_TIMEOUT', '900'))
+SCRATCH_ORPHAN_MAX_AGE = float(os.environ.get('SCRATCH_ORPHAN_MAX_AGE', str(6 * 3600)))
+SCRATCH_REAP_INTERVAL = float(os.environ.get('SCRATCH_REAP_INTERVAL', '600'))
+
+OWNER_FILE = '.owner.json'
+MB = 1024 * 1024
+
+
+class ScratchSpaceUnavailable(Exception):
+    """Raised when a job can't get scratch space before the wait timeout"""
+
+
+def _pid_alive_windows(pid: int) -> bool:
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    ERROR_ACCESS_DENIED = 5
+    STILL_ACTIVE = 259
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Access denied means the process exists but belongs to someone else
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return True
+        return exit_code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid is running, without signalling it"""
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if sys.platform == 'win32':
+        # os.kill() on Windows terminates the process whatever the signal
+        return _pid_alive_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ScratchSpaceManager:
+    """Allocates per-job scratch directories under a global disk quota"""
+
+    def __init__(self, root: str = SCRATCH_ROOT, quota_mb: float = SCRATCH_QUOTA_MB,
+                 min_free_mb: float = SCRATCH_MIN_FREE_MB):
+        self.root = root
+        self.quota_bytes = int(quota_mb * MB)
+        self.min_free_bytes = int(min_free_mb * MB)
+        self._condition = threading.Condition()
+        self._reaper = None
+
+    def _read_owner(self, path: str) -> dict:
+        try:
+            with open(os.path.join(path, OWNER_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def usage_bytes(self) -> int:
+        """Bytes held by all job directories (reservation or actual size, whichever is larger)"""
+        if not os.path.isdir(self.root):
+            return 0
+        total = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                total += max(_dir_size(path), self._read_owner(path).get('reserved_bytes', 0))
+        return total
+
+    def _has_space(self, reserve_bytes: int) -> bool:
+        usage = self.usage_bytes()
+        # An oversized job may still run alone rather than wait forever
+        if self.quota_bytes and usage and usage + reserve_bytes > self.quota_bytes:
+            return False
+        if self.min_free_bytes:
+            os.makedirs(self.root, exist_ok=True)
+            if shutil.disk_usage(self.root).free - reserve_bytes < self.min_free_bytes:
+                return False
+        return True
+
+    def create_dir(self, prefix: str = 'job', reserve_bytes: int = 0) -> str:
+        """Create a scratch directory stamped with its owner (no waiting, no auto cleanup)"""
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f'{prefix}-{os.getpid()}-{uuid.uuid4().hex[:12]}')
+        os.makedirs(path)
+        with open(os.path.join(path, OWNER_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'created_at': time.time(), 'reserved_bytes': reserve_bytes}, f)
+        return path
+
+    def release(self, path: str) -> None:
+        """Remove a scratch directory and wake jobs waiting for space"""
+        shutil.rmtree(path, ignore_errors=True)
+        with self._condition:
+            self._condition.notify_all()
+
+    @contextmanager
+    def job_dir(self, prefix: str = 'job', reserve_bytes: Optional[int] = None,
+                timeout: float = SCRATCH_WAIT_TIMEOUT):
+        """Wait for quota, yield a fresh directory, and always delete it afterwards"""
+        if reserve_bytes is None:
+            reserve_bytes = int(SCRATCH_DEFAULT_RESERVE_MB * MB)
+        deadline = time.monotonic() + timeout
+        waited = False
+
+        with self._condition:
+            while not self._has_space(reserve_bytes):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ScratchSpaceUnavailable(
+                        f"No scratch space for {reserve_bytes / MB:.0f} MB after {timeout:.0f}s"
+                    )
+                if not waited:
+                    logger.warning(f"Scratch space low, waiting to reserve {reserve_bytes / MB:.0f} MB...")
+                    waited = True
+                # Re-check periodically: other processes free space without notifying us
+                self._condition.wait(timeout=min(remaining, 5))
+            path = self.create_dir(prefix, reserve_bytes)
+
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def reap_orphans(self, max_age: float = SCRATCH_ORPHAN_MAX_AGE) -> int:
+        """Delete directories whose owner process died, or that are older than max_age"""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path):
+                continue
+            owner = self._read_owner(path)
+            created_at = owner.get('created_at') or os.path.getmtime(path)
+            pid = owner.get('pid')
+            dead_owner = pid is not None and pid != os.getpid() and not _pid_alive(pid)
+            if dead_owner or now - created_at > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+                logger.info(f"Reaped orphaned scratch directory: {path}")
+        if removed:
+            with self._condition:
+                self._condition.notify_all()
+        return removed
+
+    def start_reaper(self, interval: float = SCRATCH_REAP_INTERVAL) -> None:
+        """Run reap_orphans() now and then every interval seconds in a daemon thread"""
+        if self._reaper is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.reap_orphans()
+                except Exception as e:
+                    logger.warning(f"Scratch reaper failed: {e}")
+                time.sleep(interval)
+
+        self._reaper = threading.Thread(target=loop, name='scratch-reaper', daemon=True)
+        self._reaper.start()
+
+
+# Shared manager for this process
+scratch_space = ScratchSpaceManager()
+
+
+def estimate_job_bytes(info: Optional[dict]) -> Optional[int]:
+    """Rough scratch need for a video: source download, 16 kHz WAV and its chunk copies"""
+    if not info:
+        return None
+    duration = info.get('duration') or 0
+    source = info.get('filesize') or info.get('filesize_approx') or duration * 24000  # ~192 kbps
+    wav = duration * 16000 * 2 * 2
+    estimate = int((source + wav) * 1.2)
+    return estimate or None
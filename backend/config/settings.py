@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -88,11 +91,93 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+# DATABASE_MODE: sqlite (default) or server (PostgreSQL/MySQL via DB_* or the
+# Elastic Beanstalk RDS_* variables)
+
+DATABASE_MODE = os.environ.get('DATABASE_MODE', 'sqlite').strip().lower()
+
+# SQLite tuned for parallel generation jobs: WAL lets readers and the writer
+# run concurrently, synchronous=NORMAL is durable enough with WAL, writers
+# wait up to SQLITE_BUSY_TIMEOUT seconds for the lock instead of failing, and
+# IMMEDIATE transactions take the write lock up front (a deferred transaction
+# that upgrades later can't wait for it and fails with "database is locked")
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '20'))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_TUNED_OPTIONS = {
+    'timeout': SQLITE_BUSY_TIMEOUT,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        f'PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)};'
+        f'PRAGMA mmap_size={SQLITE_MMAP_SIZE};'
+    ),
+}
+
+if DATABASE_MODE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': SQLITE_TUNED_OPTIONS,
+        }
+    }
+elif DATABASE_MODE == 'server':
+    DB_ENGINE = os.environ.get('DB_ENGINE', 'postgresql').strip().lower()
+    # psycopg's pool (PostgreSQL only) replaces persistent connections; elsewhere
+    # each thread keeps its connection for CONN_MAX_AGE seconds
+    DB_POOL = DB_ENGINE == 'postgresql' and os.environ.get('DB_POOL', 'true').lower() == 'true'
+    DATABASES = {
+        'default': {
+            'ENGINE': f'django.db.backends.{DB_ENGINE}',
+            'NAME': os.environ.get('DB_NAME', os.environ.get('RDS_DB_NAME', 'ai_blog')),
+            'USER': os.environ.get('DB_USER', os.environ.get('RDS_USERNAME', '')),
+            'PASSWORD': os.environ.get('DB_PASSWORD', os.environ.get('RDS_PASSWORD', '')),
+            'HOST': os.environ.get('DB_HOST', os.environ.get('RDS_HOSTNAME', '')),
+            'PORT': os.environ.get('DB_PORT', os.environ.get('RDS_PORT', '')),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '20')),
+                    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"DATABASE_MODE must be sqlite or server, not {DATABASE_MODE!r}")
+
+
+# Cache (rendered blog pages, see config/page_cache.py)
+# CACHE_BACKEND: file (default, shared by the web and worker processes on one
+# host), locmem (per process - single-process setups only) or redis
+# (CACHE_REDIS_URL; any Redis-compatible server, e.g. a local Valkey)
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'file').strip().lower()
+CACHE_BACKENDS = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai_blog_page_cache')),
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ai-blog-pages',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}, not {CACHE_BACKEND!r}")
 
-DATABASES = {
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'TIMEOUT': int(os.environ.get('PAGE_CACHE_TIMEOUT', '3600')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '5000'))} if CACHE_BACKEND != 'redis' else {},
     }
 }
 
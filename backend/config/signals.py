@@ -0,0 +1,44 @@
+"""
+Keep the rendered-page cache (config/page_cache.py) in step with BlogPost
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import page_cache
+from .models import BlogPost
+
+# Saves that only store derived render output (blog_details' lazy render)
+RENDER_ONLY_FIELDS = {'content_html', 'content_html_version'}
+
+
+def _render_only(update_fields) -> bool:
+    return update_fields is not None and set(update_fields) <= RENDER_ONLY_FIELDS
+
+
+@receiver(pre_save, sender=BlogPost)
+def forget_saved_post_page(sender, instance, using, update_fields=None, **kwargs):
+    # updated_at still holds the value the cached page was keyed by
+    if instance.pk is None or _render_only(update_fields) or 'updated_at' in instance.get_deferred_fields():
+        return
+    user_id, post_id, updated_at = instance.author_id, instance.pk, instance.updated_at
+    transaction.on_commit(lambda: page_cache.forget_detail(user_id, post_id, updated_at), using=using)
+
+
+@receiver(post_save, sender=BlogPost)
+def touch_saved_post_listing(sender, instance, using, update_fields=None, **kwargs):
+    if _render_only(update_fields):
+        return
+    user_id = instance.author_id
+    transaction.on_commit(lambda: page_cache.touch_listing(user_id), using=using)
+
+
+@receiver(post_delete, sender=BlogPost)
+def forget_deleted_post_pages(sender, instance, using, **kwargs):
+    user_id, post_id, updated_at = instance.author_id, instance.pk, instance.updated_at
+
+    def forget():
+        page_cache.forget_detail(user_id, post_id, updated_at)
+        page_cache.touch_listing(user_id)
+
+    transaction.on_commit(forget, using=using)
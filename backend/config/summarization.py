@@ -0,0 +1,171 @@
+"""
+Map-reduce summarization of long transcripts
+
+Transcripts too long for a single blog prompt are split into token-budgeted
+chunks on sentence boundaries, the chunks are summarized concurrently
+(at most SUMMARY_MAX_CONCURRENCY calls in flight, spread over the configured
+LLM providers by the caller), and the section summaries are merged again in
+further rounds until they fit the blog prompt. The blog is then written from
+the ordered section notes instead of a truncated transcript. Token counts
+come from token_budget.py.
+"""
+import os
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from .token_budget import count_tokens_uncached, truncate_to_tokens
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Summarization configuration
+# Transcript budget of models with an unknown context window (known ones use token_budget.input_budget)
+TRANSCRIPT_DIRECT_TOKENS = int(os.environ.get('TRANSCRIPT_DIRECT_TOKENS', '3000'))
+SUMMARY_CHUNK_TOKENS = int(os.environ.get('SUMMARY_CHUNK_TOKENS', '3000'))
+SUMMARY_MAX_TOKENS = int(os.environ.get('SUMMARY_MAX_TOKENS', '700'))
+SUMMARY_MAX_CONCURRENCY = int(os.environ.get('SUMMARY_MAX_CONCURRENCY', '4'))
+SUMMARY_MAX_ROUNDS = 3
+# Chunks are sized before a provider is picked, so count with one reference tokenizer
+SUMMARY_TOKENIZER_MODEL = 'gpt-3.5-turbo'
+
+SUMMARY_SYSTEM_PROMPT = "You summarize sections of video transcripts into faithful, detailed notes for a blog writer."
+
+# (system_prompt, prompt, chunk index) -> summary or None; supplied by the blog generator
+Summarize = Callable[[str, str, int], Optional[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with the reference tokenizer (uncached: transcript text is rarely counted twice)"""
+    return count_tokens_uncached(text, SUMMARY_TOKENIZER_MODEL)
+
+
+def _word_windows(sentence: str, max_tokens: int) -> List[Tuple[str, int]]:
+    """Split an over-long sentence into (window, tokens) of at most max_tokens, counting each word once"""
+    windows = []
+    window = []
+    window_tokens = 0
+    for word in sentence.split():
+        # With its leading space, as the word appears inside the window
+        word_tokens = estimate_tokens(' ' + word)
+        if window and window_tokens + word_tokens > max_tokens:
+            windows.append((' '.join(window), window_tokens))
+            window, window_tokens = [], 0
+        window.append(word)
+        window_tokens += word_tokens
+    if window:
+        windows.append((' '.join(window), window_tokens))
+    return windows
+
+
+def split_transcript(text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[str]:
+    """Split text into chunks of at most max_tokens, preferring sentence boundaries"""
+    sentences = [s for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s]
+    # (text, tokens) pieces; every piece is counted once, so this stays linear in the text
+    pieces = []
+    for sentence in sentences:
+        sentence_tokens = estimate_tokens(sentence)
+        if sentence_tokens <= max_tokens:
+            pieces.append((sentence, sentence_tokens))
+        else:
+            # Unpunctuated transcripts: fall back to word windows
+            pieces.extend(_word_windows(sentence, max_tokens))
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece, piece_tokens in pieces:
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def _section_prompt(text: str, index: int, total: int, title: str) -> str:
+    return f"""Summarize part {index + 1} of {total} of the transcript of the video "{title}".
+
+Keep every distinct topic, argument, example, number and name, in the order they appear.
+Write concise bullet-point notes (no introduction, no conclusion).
+
+Transcript part:
+{text}"""
+
+
+def _merge_prompt(text: str, index: int, total: int, title: str) -> str:
+    return f"""Below are consecutive section notes from the video "{title}" (group {index + 1} of {total}).
+
+Merge them into one set of bullet-point notes, keeping their order and all concrete details, removing only repetition.
+
+Notes:
+{text}"""
+
+
+def _summarize_all(texts: List[str], build_prompt, summarize: Summarize, title: str,
+                   max_concurrency: int) -> List[str]:
+    """Summarize texts concurrently, keeping order; a failed chunk keeps a shortened original"""
+    total = len(texts)
+
+    def work(index: int) -> str:
+        prompt = build_prompt(texts[index], index, total, title)
+        try:
+            summary = summarize(SUMMARY_SYSTEM_PROMPT, prompt, index)
+        except Exception as e:
+            logger.warning(f"Summary of chunk {index + 1}/{total} failed: {e}")
+            summary = None
+        if not summary:
+            logger.warning(f"No summary for chunk {index + 1}/{total}, keeping an excerpt")
+            return truncate_to_tokens(texts[index], SUMMARY_MAX_TOKENS, SUMMARY_TOKENIZER_MODEL)
+        return summary.strip()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, total))) as pool:
+        return list(pool.map(work, range(total)))
+
+
+def _pack_groups(summaries: List[str], max_tokens: int) -> List[str]:
+    """Pack consecutive summaries into groups of at most max_tokens"""
+    groups = []
+    current = []
+    current_tokens = 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        groups.append('\n\n'.join(current))
+    return groups
+
+
+def map_reduce_summary(transcript: str, summarize: Summarize, title: str = 'Unknown',
+                       target_tokens: int = TRANSCRIPT_DIRECT_TOKENS,
+                       chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+                       max_concurrency: int = SUMMARY_MAX_CONCURRENCY) -> str:
+    """Condense a long transcript into ordered section notes of at most target_tokens"""
+    chunks = split_transcript(transcript, chunk_tokens)
+    logger.info(f"Summarizing {len(transcript)} characters of transcript as {len(chunks)} chunks "
+                f"(concurrency={max_concurrency})")
+    summaries = _summarize_all(chunks, _section_prompt, summarize, title, max_concurrency)
+
+    # Reduce: merge neighbouring summaries until the notes fit the blog prompt
+    for _ in range(SUMMARY_MAX_ROUNDS):
+        notes = '\n\n'.join(summaries)
+        if estimate_tokens(notes) <= target_tokens or len(summaries) == 1:
+            break
+        groups = _pack_groups(summaries, chunk_tokens)
+        if len(groups) == len(summaries):
+            # Every summary already fills a chunk; merging pairs is the only way down
+            groups = ['\n\n'.join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+        summaries = _summarize_all(groups, _merge_prompt, summarize, title, max_concurrency)
+
+    notes = '\n\n'.join(
+        f"Section {index + 1}:\n{summary}" for index, summary in enumerate(summaries)
+    )
+    return truncate_to_tokens(notes, target_tokens, SUMMARY_TOKENIZER_MODEL)
+
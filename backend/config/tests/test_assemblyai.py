@@ -0,0 +1,125 @@
+"""
+AssemblyAI completion waiting, against the local stub server
+"""
+from datetime import timedelta
+from unittest import mock
+
+import requests
+from django.test import TestCase
+from django.utils import timezone
+
+from assemblyai_stub_server import STUB_TRANSCRIPT_TEXT, start_stub_server
+from config import assemblyai
+from config.models import AssemblyAIWebhookEvent
+
+HEADERS = {'authorization': 'test-key'}
+
+
+class WaitForTranscriptTests(TestCase):
+    def setUp(self):
+        self.server, base_url = start_stub_server(processing_seconds=1.0)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+        # Shrink the schedule so a one-second transcript takes a handful of polls
+        for name, value in (('ASSEMBLYAI_BASE_URL', base_url), ('MIN_POLL_INTERVAL', 0.2),
+                            ('WEBHOOK_LOCAL_CHECK_INTERVAL', 0.05), ('WEBHOOK_SAFETY_POLL_INTERVAL', 30.0)):
+            patcher = mock.patch.object(assemblyai, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.base_url = base_url
+
+    def _start_transcript(self) -> str:
+        response = self.session.post(f'{self.base_url}/v2/transcript', headers=HEADERS,
+                                     json={'audio_url': 'https://cdn.example/upload/audio'})
+        return response.json()['id']
+
+    def _status_polls(self) -> int:
+        return self.session.get(f'{self.base_url}/stats').json()['status_polls']
+
+    def test_polling_backs_off_until_completed(self):
+        transcript_id = self._start_transcript()
+
+        data = assemblyai.wait_for_transcript(self.session, transcript_id, HEADERS)
+
+        self.assertEqual(data['text'], STUB_TRANSCRIPT_TEXT)
+        # 0.2s, 0.2s, 0.3s, 0.45s... rather than a request every 0.2s
+        self.assertLessEqual(self._status_polls(), 5)
+
+    def test_webhook_notification_is_consumed_once(self):
+        transcript_id = self._start_transcript()
+        # The webhook arrives before AssemblyAI's status endpoint reports completion
+        assemblyai.record_webhook(transcript_id, 'completed')
+
+        data = assemblyai.wait_for_transcript(self.session, transcript_id, HEADERS, use_webhook=True)
+
+        self.assertEqual(data['text'], STUB_TRANSCRIPT_TEXT)
+        self.assertLessEqual(self._status_polls(), 6)
+        self.assertFalse(AssemblyAIWebhookEvent.objects.filter(transcript_id=transcript_id).exists())
+
+    def test_webhook_wait_does_not_poll_remotely(self):
+        transcript_id = self._start_transcript()
+        cancel = mock.Mock()
+        # Cancel after the first few local checks
+        cancel.wait.side_effect = [False, False, True]
+
+        data = assemblyai.wait_for_transcript(self.session, transcript_id, HEADERS,
+                                              cancel_event=cancel, use_webhook=True)
+
+        self.assertIsNone(data)
+        self.assertEqual(self._status_polls(), 0)
+
+    def test_notifications_are_deleted_when_the_wait_ends(self):
+        transcript_id = self._start_transcript()
+        # A non-final notification is never consumed by the wait itself
+        assemblyai.record_webhook(transcript_id, 'processing')
+        assemblyai.record_webhook('abandoned', 'completed')
+        AssemblyAIWebhookEvent.objects.filter(transcript_id='abandoned').update(
+            received_at=timezone.now() - timedelta(seconds=assemblyai.ASSEMBLYAI_MAX_WAIT + 60))
+        assemblyai.record_webhook('in-flight', 'completed')
+        cancel = mock.Mock()
+        cancel.wait.return_value = True
+
+        data = assemblyai.wait_for_transcript(self.session, transcript_id, HEADERS,
+                                              cancel_event=cancel, use_webhook=True)
+
+        self.assertIsNone(data)
+        self.assertEqual(list(AssemblyAIWebhookEvent.objects.values_list('transcript_id', flat=True)),
+                         ['in-flight'])
+
+
+class WebhookConfigurationTests(TestCase):
+    @mock.patch.object(assemblyai, 'ASSEMBLYAI_WEBHOOK_URL', 'https://blog.example')
+    @mock.patch.object(assemblyai, 'ASSEMBLYAI_WEBHOOK_SECRET', '')
+    def test_webhook_needs_a_secret(self):
+        self.assertEqual(assemblyai.webhook_request_fields(), {})
+
+    @mock.patch.object(assemblyai, 'ASSEMBLYAI_WEBHOOK_URL', 'https://blog.example')
+    @mock.patch.object(assemblyai, 'ASSEMBLYAI_WEBHOOK_SECRET', 's3cret')
+    def test_webhook_fields_carry_the_secret(self):
+        fields = assemblyai.webhook_request_fields()
+
+        self.assertEqual(fields['webhook_url'], 'https://blog.example/webhooks/assemblyai/')
+        self.assertEqual(fields['webhook_auth_header_value'], 's3cret')
+
+    @mock.patch.object(assemblyai, 'ASSEMBLYAI_WEBHOOK_SECRET', '')
+    def test_endpoint_is_off_without_a_secret(self):
+        response = self.client.post('/webhooks/assemblyai/', {'transcript_id': 'abc', 'status': 'completed'},
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(AssemblyAIWebhookEvent.objects.exists())
+
+    @mock.patch.object(assemblyai, 'ASSEMBLYAI_WEBHOOK_SECRET', 's3cret')
+    def test_endpoint_checks_the_secret(self):
+        payload = {'transcript_id': 'abc', 'status': 'completed'}
+        wrong = self.client.post('/webhooks/assemblyai/', payload, content_type='application/json',
+                                 headers={assemblyai.ASSEMBLYAI_WEBHOOK_HEADER: 'nope'})
+        right = self.client.post('/webhooks/assemblyai/', payload, content_type='application/json',
+                                 headers={assemblyai.ASSEMBLYAI_WEBHOOK_HEADER: 's3cret'})
+
+        self.assertEqual(wrong.status_code, 403)
+        self.assertEqual(right.status_code, 200)
+        self.assertEqual(assemblyai.take_webhook_status('abc'), 'completed')
+        self.assertIsNone(assemblyai.take_webhook_status('abc'))
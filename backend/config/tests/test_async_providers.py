@@ -0,0 +1,61 @@
+"""
+Async provider client: one httpx.AsyncClient per event loop
+"""
+import asyncio
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+
+from config import async_providers
+from config.async_providers import AsyncProviderClient
+
+
+@skipIf(async_providers.httpx is None, 'httpx is not installed')
+class AsyncClientPerLoopTests(SimpleTestCase):
+    def test_client_is_reused_within_a_loop(self):
+        providers = AsyncProviderClient()
+
+        async def use():
+            first, second = providers._http(), providers._http()
+            await providers.aclose()
+            return first, second
+
+        first, second = asyncio.run(use())
+        self.assertIs(first, second)
+        self.assertTrue(first.is_closed)
+
+    def test_each_loop_gets_and_closes_its_own_client(self):
+        providers = AsyncProviderClient()
+
+        async def use():
+            client = providers._http()
+            await providers.aclose()
+            return client
+
+        first = asyncio.run(use())
+        second = asyncio.run(use())
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed)
+        self.assertTrue(second.is_closed)
+
+    def test_closing_one_loop_leaves_another_loops_client_open(self):
+        providers = AsyncProviderClient()
+        other_loop = asyncio.new_event_loop()
+        self.addCleanup(other_loop.close)
+
+        async def open_client():
+            return providers._http()
+
+        other = other_loop.run_until_complete(open_client())
+
+        async def use_and_close():
+            providers._http()
+            await providers.aclose()
+
+        asyncio.run(use_and_close())
+
+        self.assertFalse(other.is_closed)
+        self.assertIs(other_loop.run_until_complete(open_client()), other)
+        other_loop.run_until_complete(providers.aclose())
+        self.assertTrue(other.is_closed)
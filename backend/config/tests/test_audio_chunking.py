@@ -0,0 +1,38 @@
+"""
+Whisper process pool sizing and replacement
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from config import audio_chunking
+from config.whisper_models import whisper_registry
+
+
+class WhisperPoolTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(audio_chunking, 'WHISPER_POOL_WORKERS', 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pool_is_capped_by_the_setting(self):
+        with mock.patch.object(whisper_registry, 'memory_budget_mb', 0):
+            self.assertEqual(audio_chunking.whisper_pool_size('base', requested=16), 4)
+            self.assertEqual(audio_chunking.whisper_pool_size('base', requested=2), 2)
+
+    def test_pool_counts_against_the_memory_budget(self):
+        with mock.patch.object(whisper_registry, 'memory_budget_mb', 400):
+            # base is ~150MB per process
+            self.assertEqual(audio_chunking.whisper_pool_size('base', requested=16), 2)
+        with mock.patch.object(whisper_registry, 'memory_budget_mb', 100):
+            self.assertEqual(audio_chunking.whisper_pool_size('base', requested=16), 0)
+
+    def test_discarded_pool_is_replaced(self):
+        pool = audio_chunking.get_whisper_process_pool(2)
+        self.addCleanup(lambda: audio_chunking.discard_whisper_process_pool(
+            audio_chunking.get_whisper_process_pool(2)))
+        self.assertIs(audio_chunking.get_whisper_process_pool(2), pool)
+
+        audio_chunking.discard_whisper_process_pool(pool)
+
+        self.assertIsNot(audio_chunking.get_whisper_process_pool(2), pool)
@@ -0,0 +1,59 @@
+"""
+Streaming ffmpeg pipe: stderr must never stall the PCM stream
+"""
+import os
+import stat
+import sys
+import tempfile
+import threading
+
+from django.test import SimpleTestCase
+
+from config import audio_streaming
+
+# Stands in for ffmpeg: far more stderr than a pipe buffer holds, then one second of PCM
+FAKE_FFMPEG = f'''#!{sys.executable}
+import sys
+sys.stderr.write('warning: something odd\\n' * 20000)
+sys.stderr.flush()
+sys.stdout.buffer.write(b'\\0' * {audio_streaming.SAMPLE_RATE * audio_streaming.BYTES_PER_SAMPLE})
+'''
+
+
+class PcmStreamTests(SimpleTestCase):
+    def setUp(self):
+        handle, self.ffmpeg_path = tempfile.mkstemp(suffix='.py')
+        with os.fdopen(handle, 'w') as script:
+            script.write(FAKE_FFMPEG)
+        os.chmod(self.ffmpeg_path, os.stat(self.ffmpeg_path).st_mode | stat.S_IEXEC)
+        self.addCleanup(os.remove, self.ffmpeg_path)
+
+    def read_all(self, process) -> list:
+        windows = []
+        reader = threading.Thread(
+            target=lambda: windows.extend(audio_streaming.iter_pcm_windows(process.stdout, window_seconds=0.5,
+                                                                           overlap_seconds=0)),
+            daemon=True,
+        )
+        reader.start()
+        reader.join(timeout=10)
+        if reader.is_alive():
+            process.kill()
+            self.fail("PCM stream stalled")
+        process.wait(timeout=10)
+        return windows
+
+    def test_chatty_ffmpeg_does_not_stall_the_stream(self):
+        process = audio_streaming.open_pcm_stream({'url': 'https://media.example/audio'}, self.ffmpeg_path)
+
+        self.assertEqual(len(self.read_all(process)), 2)
+        self.assertEqual(process.returncode, 0)
+
+    def test_error_text_can_be_kept_in_a_file(self):
+        with tempfile.TemporaryFile() as error_log:
+            process = audio_streaming.open_pcm_stream({'url': 'https://media.example/audio'}, self.ffmpeg_path,
+                                                      stderr=error_log)
+            self.read_all(process)
+            error_log.seek(0)
+
+            self.assertTrue(error_log.read(100).startswith(b'warning: something odd'))
@@ -0,0 +1,136 @@
+"""
+Batch generation: posts written as items finish, completion and recovery
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from config import batches
+from config.models import BlogPost, GenerationBatch, GenerationJob
+
+VIDEO_URLS = [f'https://www.youtube.com/watch?v=video{index:06d}' for index in range(5)]
+
+
+class FakeGenerator:
+    """Stands in for BlogGenerator: fails the URLs it is told to, succeeds otherwise"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.processed = []
+
+    def process_youtube_video(self, url, on_progress=None, regenerate=False):
+        self.processed.append(url)
+        if url in self.failing:
+            return {'success': False, 'error': 'Video unavailable'}
+        return {
+            'success': True,
+            'blog_post': {'title': f'Post for {url}', 'description': 'About the video.', 'content': 'Some *content*.'},
+            'video_info': {'title': 'Video', 'channel': 'Channel', 'duration': '1:00'},
+        }
+
+
+# Pool threads use their own database connections, so rows must really be committed.
+# One pool thread at a time: the in-memory test database locks whole tables.
+class RunBatchTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('batch-test', password='pw')
+
+    def _claimed_batch(self, urls) -> GenerationBatch:
+        batches.create_batch(urls, self.user)
+        return batches.claim_next_batch()
+
+    def test_posts_are_written_in_chunks_as_items_finish(self):
+        batch = self._claimed_batch(VIDEO_URLS)
+
+        with mock.patch.object(BlogPost.objects, 'bulk_create', wraps=BlogPost.objects.bulk_create) as bulk_create:
+            batches.run_batch(batch, max_workers=1, generator=FakeGenerator(), write_size=2)
+
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 2, 1])
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, GenerationJob.STATUS_DONE)
+        items = list(batch.jobs.all())
+        self.assertTrue(all(item.status == GenerationJob.STATUS_DONE and item.blog_post_id for item in items))
+        self.assertEqual(BlogPost.objects.filter(author=self.user).count(), len(VIDEO_URLS))
+        self.assertTrue(all(post.content_html for post in BlogPost.objects.all()))
+
+    def test_failed_items_do_not_fail_the_batch(self):
+        batch = self._claimed_batch(VIDEO_URLS[:2])
+
+        batches.run_batch(batch, max_workers=1, generator=FakeGenerator(failing=[VIDEO_URLS[0]]))
+
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, GenerationJob.STATUS_DONE)
+        summary = batches.batch_summary(batch)
+        self.assertEqual(summary['counts'], {'done': 1, 'failed': 1})
+        self.assertEqual(summary['items'][0]['error'], 'Video unavailable')
+
+    def test_batch_fails_when_no_item_succeeds(self):
+        batch = self._claimed_batch(VIDEO_URLS[:2])
+
+        batches.run_batch(batch, max_workers=1, generator=FakeGenerator(failing=VIDEO_URLS[:2]))
+
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(batch.error, 'No video in the batch could be processed.')
+
+    def test_rerun_skips_items_already_done(self):
+        batch = self._claimed_batch(VIDEO_URLS[:3])
+        batches.run_batch(batch, max_workers=1, generator=FakeGenerator(failing=[VIDEO_URLS[2]]))
+
+        generator = FakeGenerator()
+        batches.run_batch(batch, max_workers=1, generator=generator)
+
+        self.assertEqual(generator.processed, [VIDEO_URLS[2]])
+        self.assertEqual(BlogPost.objects.count(), 3)
+
+
+class RecoverStaleBatchesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('batch-recovery', password='pw')
+
+    def _stale_running_batch(self, attempts: int) -> GenerationBatch:
+        batch = batches.create_batch(VIDEO_URLS[:2], self.user)
+        long_ago = timezone.now() - timedelta(hours=1)
+        GenerationBatch.objects.filter(pk=batch.pk).update(
+            status=GenerationJob.STATUS_RUNNING, started_at=long_ago, heartbeat_at=long_ago, attempts=attempts,
+        )
+        done, running = GenerationJob.objects.bulk_create([
+            GenerationJob(youtube_url=url, author=self.user, batch=batch) for url in VIDEO_URLS[:2]
+        ])
+        GenerationJob.objects.filter(youtube_url=VIDEO_URLS[0]).update(status=GenerationJob.STATUS_DONE)
+        GenerationJob.objects.filter(youtube_url=VIDEO_URLS[1]).update(
+            status=GenerationJob.STATUS_RUNNING, progress={'stage': 'transcribing'},
+        )
+        return batch
+
+    def test_stale_batch_is_requeued_with_its_unfinished_items(self):
+        batch = self._stale_running_batch(attempts=1)
+
+        self.assertEqual(batches.recover_stale_batches(), 1)
+
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, GenerationJob.STATUS_QUEUED)
+        self.assertEqual(batches.claim_next_batch().pk, batch.pk)
+        statuses = dict(batch.jobs.values_list('youtube_url', 'status'))
+        self.assertEqual(statuses, {VIDEO_URLS[0]: GenerationJob.STATUS_DONE,
+                                    VIDEO_URLS[1]: GenerationJob.STATUS_QUEUED})
+
+    def test_batch_out_of_attempts_fails(self):
+        batch = self._stale_running_batch(attempts=batches.JOB_MAX_ATTEMPTS)
+
+        self.assertEqual(batches.recover_stale_batches(), 1)
+
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(batch.jobs.filter(status=GenerationJob.STATUS_FAILED).count(), 1)
+
+    def test_live_batch_is_left_alone(self):
+        batch = batches.create_batch(VIDEO_URLS[:1], self.user)
+        batches.claim_next_batch()
+
+        self.assertEqual(batches.recover_stale_batches(), 0)
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, GenerationJob.STATUS_RUNNING)
@@ -0,0 +1,72 @@
+"""
+Blog prompt sizing: direct prompt vs map-reduce, per model budget
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from config import blog_generator
+from config.blog_generator import YouTubeBlogGenerator
+from config.token_budget import count_tokens, output_budget
+
+VIDEO_INFO = {'title': 'A long talk', 'channel': 'Channel'}
+# Roughly 10k tokens: over the old fixed 3000, well within a 16k+ context
+TRANSCRIPT = ' '.join(f'Sentence number {index} of the talk.' for index in range(1000))
+
+
+class BlogPromptTests(SimpleTestCase):
+    def setUp(self):
+        # The prompt helpers don't touch the provider clients
+        self.generator = YouTubeBlogGenerator.__new__(YouTubeBlogGenerator)
+        self.summaries = []
+
+        def summarize(system_prompt, prompt, index):
+            self.summaries.append(index)
+            return f'Notes for section {index + 1}.'
+
+        self.generator._summarize_with_llm = summarize
+
+    def test_transcript_that_fits_every_model_is_sent_whole(self):
+        _, prompt_for = self.generator._blog_prompts(TRANSCRIPT, VIDEO_INFO, ['openai', 'groq'])
+
+        self.assertEqual(self.summaries, [])
+        self.assertIn(TRANSCRIPT, prompt_for(blog_generator.OPENAI_MODEL))
+        self.assertIn(TRANSCRIPT, prompt_for(blog_generator.GROQ_MODEL))
+
+    def test_transcript_over_the_smallest_context_is_summarized(self):
+        transcript = ' '.join([TRANSCRIPT] * 2)  # More than gpt-3.5-turbo's 16k context leaves
+
+        _, prompt_for = self.generator._blog_prompts(transcript, VIDEO_INFO, ['openai', 'groq'])
+
+        self.assertTrue(self.summaries)
+        prompt = prompt_for(blog_generator.OPENAI_MODEL)
+        self.assertIn('Transcript notes', prompt)
+        self.assertIn('Notes for section 1.', prompt)
+
+    def test_unknown_model_keeps_the_conservative_budget(self):
+        with mock.patch.dict(blog_generator.LLM_PROVIDER_MODELS, {'openai': 'some-new-model'}):
+            _, prompt_for = self.generator._blog_prompts(TRANSCRIPT, VIDEO_INFO, ['openai'])
+
+        self.assertTrue(self.summaries)
+        self.assertLessEqual(count_tokens(prompt_for('some-new-model')), 4000)
+
+
+class OutputBudgetTests(SimpleTestCase):
+    def test_prompts_are_not_kept_in_the_token_cache(self):
+        cache_size = count_tokens.cache_info().currsize
+        output_budget('gpt-3.5-turbo', TRANSCRIPT)
+
+        self.assertEqual(count_tokens.cache_info().currsize, cache_size)
+
+
+class ContinuationRequestTests(SimpleTestCase):
+    def test_only_the_tail_of_the_cut_off_post_is_sent(self):
+        generator = YouTubeBlogGenerator.__new__(YouTubeBlogGenerator)
+
+        messages, max_tokens = generator._continuation_request('gpt-3.5-turbo', 'System prompt', TRANSCRIPT)
+
+        self.assertEqual(messages[0], {'role': 'system', 'content': 'System prompt'})
+        self.assertTrue(messages[1]['content'].endswith('CONTINUATION:'))
+        self.assertIn('Sentence number 999 of the talk.', messages[1]['content'])
+        self.assertNotIn('Sentence number 0 of the talk.', messages[1]['content'])
+        self.assertLessEqual(max_tokens, blog_generator.CONTINUATION_MAX_TOKENS)
@@ -0,0 +1,166 @@
+"""
+Job queue: claiming, coalescing of duplicate requests and recovery of jobs
+whose worker died
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from config import jobs
+from config.models import BlogPost, GenerationJob
+
+VIDEO_URL = 'https://www.youtube.com/watch?v=skMzCAga-dg'
+
+
+class ClaimNextJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('worker-test', password='pw')
+
+    def test_claims_oldest_queued_job_once(self):
+        first = jobs.enqueue_generation_job(VIDEO_URL, self.user, regenerate=True)
+        jobs.enqueue_generation_job(VIDEO_URL, self.user, regenerate=True)
+
+        claimed = jobs.claim_next_job()
+
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual(claimed.status, GenerationJob.STATUS_RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNotNone(claimed.heartbeat_at)
+        self.assertNotEqual(jobs.claim_next_job().pk, first.pk)
+        self.assertIsNone(jobs.claim_next_job())
+
+    def test_batch_items_are_not_claimed_individually(self):
+        from config.batches import create_batch
+        create_batch([VIDEO_URL], self.user)
+        self.assertIsNone(jobs.claim_next_job())
+
+
+class FakeGenerator:
+    """Stands in for BlogGenerator and records what it was asked to process"""
+
+    def __init__(self):
+        self.processed = []
+
+    def process_youtube_video(self, url, on_progress=None, regenerate=False):
+        self.processed.append(url)
+        return {
+            'success': True,
+            'blog_post': {'title': 'Generated', 'description': 'About the video.', 'content': 'Body text.'},
+            'video_info': {'title': 'Video', 'channel': 'Channel', 'duration': '1:00'},
+        }
+
+
+class CoalescingTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='pw')
+        self.bob = User.objects.create_user('bob', password='pw')
+
+    def test_duplicate_request_follows_the_in_flight_job(self):
+        leader = jobs.enqueue_generation_job(VIDEO_URL, self.alice)
+        follower = jobs.enqueue_generation_job(f'https://youtu.be/{leader.video_id}', self.bob)
+        regenerated = jobs.enqueue_generation_job(VIDEO_URL, self.bob, regenerate=True)
+
+        self.assertEqual(follower.leader_id, leader.pk)
+        self.assertIsNone(regenerated.leader_id)
+
+    def test_follower_waits_for_its_leader(self):
+        leader = jobs.enqueue_generation_job(VIDEO_URL, self.alice)
+        follower = jobs.enqueue_generation_job(VIDEO_URL, self.bob)
+
+        self.assertEqual(jobs.claim_next_job().pk, leader.pk)
+        self.assertIsNone(jobs.claim_next_job())
+
+        GenerationJob.objects.filter(pk=leader.pk).update(status=GenerationJob.STATUS_DONE)
+        self.assertEqual(jobs.claim_next_job().pk, follower.pk)
+
+    def test_follower_gets_its_own_copy_of_the_leaders_post(self):
+        generator = FakeGenerator()
+        leader = jobs.enqueue_generation_job(VIDEO_URL, self.alice)
+        follower = jobs.enqueue_generation_job(VIDEO_URL, self.bob)
+
+        jobs.run_job(jobs.claim_next_job(), generator=generator)
+        jobs.run_job(jobs.claim_next_job(), generator=generator)
+
+        self.assertEqual(generator.processed, [VIDEO_URL])
+        leader.refresh_from_db()
+        follower.refresh_from_db()
+        self.assertEqual(follower.status, GenerationJob.STATUS_DONE)
+        self.assertNotEqual(follower.blog_post_id, leader.blog_post_id)
+        self.assertEqual(follower.blog_post.author, self.bob)
+        self.assertEqual(follower.blog_post.content, leader.blog_post.content)
+
+    def test_follower_inherits_the_leaders_failure(self):
+        jobs.enqueue_generation_job(VIDEO_URL, self.alice)
+        follower = jobs.enqueue_generation_job(VIDEO_URL, self.bob)
+        jobs.mark_job_failed(jobs.claim_next_job(), 'Video unavailable')
+
+        jobs.run_job(jobs.claim_next_job(), generator=FakeGenerator())
+
+        follower.refresh_from_db()
+        self.assertEqual(follower.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(follower.error, 'Video unavailable')
+
+    def test_follower_runs_itself_when_the_leaders_post_is_gone(self):
+        generator = FakeGenerator()
+        jobs.enqueue_generation_job(VIDEO_URL, self.alice)
+        follower = jobs.enqueue_generation_job(VIDEO_URL, self.bob)
+        jobs.run_job(jobs.claim_next_job(), generator=generator)
+        BlogPost.objects.filter(author=self.alice).delete()
+
+        jobs.run_job(jobs.claim_next_job(), generator=generator)
+
+        follower.refresh_from_db()
+        self.assertEqual(generator.processed, [VIDEO_URL, VIDEO_URL])
+        self.assertEqual(follower.status, GenerationJob.STATUS_DONE)
+        self.assertEqual(follower.blog_post.author, self.bob)
+
+
+class RecoverStaleJobsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('stale-test', password='pw')
+
+    def _stale_running_job(self, attempts: int) -> GenerationJob:
+        job = jobs.enqueue_generation_job(VIDEO_URL, self.user)
+        long_ago = timezone.now() - timedelta(seconds=jobs.JOB_STALE_AFTER + 60)
+        GenerationJob.objects.filter(pk=job.pk).update(
+            status=GenerationJob.STATUS_RUNNING, started_at=long_ago, heartbeat_at=long_ago, attempts=attempts,
+        )
+        return job
+
+    def test_stale_job_is_requeued_and_claimable_again(self):
+        job = self._stale_running_job(attempts=1)
+
+        self.assertEqual(jobs.recover_stale_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_QUEUED)
+        self.assertEqual(jobs.claim_next_job().pk, job.pk)
+
+    def test_live_job_is_left_alone(self):
+        job = jobs.enqueue_generation_job(VIDEO_URL, self.user)
+        jobs.claim_next_job()
+
+        self.assertEqual(jobs.recover_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_RUNNING)
+
+    def test_job_out_of_attempts_fails_and_releases_followers(self):
+        leader = self._stale_running_job(attempts=jobs.JOB_MAX_ATTEMPTS)
+        follower = jobs.enqueue_generation_job(VIDEO_URL, self.user)
+        self.assertEqual(follower.leader_id, leader.pk)
+
+        self.assertEqual(jobs.recover_stale_jobs(), 1)
+
+        leader.refresh_from_db()
+        follower.refresh_from_db()
+        self.assertEqual(leader.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(leader.error, jobs.STALE_JOB_ERROR)
+        self.assertIsNone(follower.leader_id)
+        self.assertEqual(jobs.claim_next_job().pk, follower.pk)
+
+    def test_heartbeat_keeps_a_long_job_fresh(self):
+        job = self._stale_running_job(attempts=1)
+        jobs.Heartbeat(GenerationJob, job.pk).beat()
+        self.assertEqual(jobs.recover_stale_jobs(), 0)
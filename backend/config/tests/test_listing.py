@@ -0,0 +1,118 @@
+"""
+Keyset pagination of the blog listing
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from config.listing import decode_cursor, encode_cursor, listing_page
+from config.models import BlogPost
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_posts(author, count: int, created_at=None):
+    """count posts, one second apart (or all at created_at), oldest first"""
+    posts = [
+        BlogPost.objects.create(title=f'Post {index}', description='D', content='C',
+                                youtube_url='https://www.youtube.com/watch?v=skMzCAga-dg', author=author)
+        for index in range(count)
+    ]
+    start = timezone.now() - timedelta(days=1)
+    for index, post in enumerate(posts):
+        BlogPost.objects.filter(pk=post.pk).update(created_at=created_at or start + timedelta(seconds=index))
+    return posts
+
+
+class ListingPageTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('listing-test', password='pw')
+
+    def _all_pages(self, page_size: int):
+        pages, cursor = [], None
+        while True:
+            posts, cursor = listing_page(self.author.id, cursor, page_size=page_size)
+            pages.append([post.pk for post in posts])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_post_once_newest_first(self):
+        posts = make_posts(self.author, 7)
+
+        pages = self._all_pages(page_size=3)
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), [post.pk for post in reversed(posts)])
+
+    def test_equal_timestamps_are_ordered_by_id(self):
+        posts = make_posts(self.author, 5, created_at=timezone.now())
+
+        pages = self._all_pages(page_size=2)
+
+        self.assertEqual(sum(pages, []), sorted(post.pk for post in posts)[::-1])
+
+    def test_exact_multiple_of_the_page_size_has_no_empty_last_page(self):
+        make_posts(self.author, 4)
+
+        self.assertEqual([len(page) for page in self._all_pages(page_size=2)], [2, 2])
+
+    def test_only_the_authors_posts_are_listed(self):
+        make_posts(self.author, 2)
+        make_posts(User.objects.create_user('someone-else', password='pw'), 3)
+
+        posts, next_cursor = listing_page(self.author.id)
+
+        self.assertEqual(len(posts), 2)
+        self.assertIsNone(next_cursor)
+
+    def test_listing_leaves_the_content_unloaded(self):
+        make_posts(self.author, 1)
+
+        post = listing_page(self.author.id)[0][0]
+
+        self.assertIn('content', post.get_deferred_fields())
+
+
+class CursorTests(TestCase):
+    def test_cursor_round_trips(self):
+        author = User.objects.create_user('cursor-test', password='pw')
+        post = make_posts(author, 1)[0]
+        post.refresh_from_db()
+
+        self.assertEqual(decode_cursor(encode_cursor(post)), (post.created_at, post.pk))
+
+    def test_malformed_cursors_are_ignored(self):
+        for cursor in (None, '', 'garbage', '12-x', '99999999999999999999999-1'):
+            self.assertIsNone(decode_cursor(cursor), cursor)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ListingViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('listing-view', password='pw')
+        self.client.force_login(self.author)
+
+    def test_next_page_link_follows_the_cursor(self):
+        posts = make_posts(self.author, 30)
+
+        first = self.client.get('/blogs/')
+        self.assertEqual(first.status_code, 200)
+        next_cursor = first.context['next_cursor']
+        self.assertIsNotNone(next_cursor)
+        self.assertContains(first, f'?cursor={next_cursor}')
+
+        second = self.client.get('/blogs/', {'cursor': next_cursor})
+        shown = [post.pk for post in second.context['blog_posts']]
+        self.assertEqual(shown, [post.pk for post in reversed(posts)][len(first.context['blog_posts']):])
+
+    def test_malformed_cursor_shows_the_first_page(self):
+        make_posts(self.author, 2)
+
+        response = self.client.get('/blogs/', {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Post 1')
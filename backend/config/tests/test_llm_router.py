@@ -0,0 +1,48 @@
+"""
+LLM router logging and circuit breaker bookkeeping
+"""
+import time
+
+from django.test import SimpleTestCase
+
+from config.llm_router import LLMRouter
+
+
+class LLMRouterTests(SimpleTestCase):
+    def make_router(self) -> LLMRouter:
+        return LLMRouter(call_timeout=5, total_deadline=5, hedge_delay=0.05)
+
+    def half_open(self, router: LLMRouter, name: str) -> None:
+        breaker = router.breaker(name)
+        breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+    def test_unstarted_providers_do_not_touch_their_breaker(self):
+        router = self.make_router()
+
+        def primary(call):
+            # Meanwhile another call takes the half-open trial for the backup provider
+            self.half_open(router, 'backup')
+            self.assertTrue(router.breaker('backup').allow())
+            return 'text'
+
+        text, name = router.generate([('primary', primary), ('backup', lambda call: 'other')], hedge=False)
+
+        self.assertEqual((text, name), ('text', 'primary'))
+        # That trial is still running, so nobody else may call the backup provider yet
+        self.assertFalse(router.breaker('backup').allow())
+
+    def test_skipped_provider_moves_to_the_next(self):
+        router = self.make_router()
+        router.breaker('primary').record_failure()
+        router.breaker('primary').opened_at = time.monotonic()
+
+        text, name = router.generate([('primary', lambda call: 'text'), ('backup', lambda call: 'other')])
+
+        self.assertEqual((text, name), ('other', 'backup'))
+        self.assertEqual(router.metrics()['primary']['skipped'], 1)
+
+    def test_label_names_the_output_in_the_log(self):
+        router = self.make_router()
+        with self.assertLogs('config.llm_router', level='INFO') as logs:
+            router.generate([('primary', lambda call: 'text')], hedge=False, label='summary of chunk 2')
+        self.assertIn('Generating summary of chunk 2 with primary', '\n'.join(logs.output))
@@ -0,0 +1,93 @@
+"""
+Rendered-page cache: conditional requests and invalidation on save/delete
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from config import page_cache
+from config.models import BlogPost
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('cache-test', password='pw')
+        self.client.force_login(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = BlogPost.objects.create(
+                title='Cached post', description='D', content='First *version*',
+                youtube_url='https://www.youtube.com/watch?v=skMzCAga-dg', author=self.author,
+            )
+        self.url = f'/blog-details/{self.post.pk}/'
+
+    def test_detail_page_answers_conditional_requests_with_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+
+        by_etag = self.client.get(self.url, headers={'If-None-Match': response['ETag']})
+        by_date = self.client.get(self.url, headers={'If-Modified-Since': response['Last-Modified']})
+
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_etag.content, b'')
+        self.assertEqual(by_etag['ETag'], response['ETag'])
+        self.assertEqual(by_date.status_code, 304)
+
+    def test_cached_page_gets_the_sessions_csrf_token(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        for response in (first, second):
+            self.assertNotContains(response, page_cache.CSRF_PLACEHOLDER)
+            self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_edit_changes_the_etag_and_the_page(self):
+        old = self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.content = 'Second *version*'
+            self.post.save()
+
+        response = self.client.get(self.url, headers={'If-None-Match': old['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], old['ETag'])
+        self.assertContains(response, 'Second <em>version</em>')
+
+    def test_new_and_deleted_posts_refresh_the_listing(self):
+        listing = self.client.get('/blogs/')
+        self.assertContains(listing, 'Cached post')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(title='Another post', description='D', content='C',
+                                    youtube_url='https://www.youtube.com/watch?v=skMzCAga-dg', author=self.author)
+        refreshed = self.client.get('/blogs/', headers={'If-None-Match': listing['ETag']})
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertContains(refreshed, 'Another post')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertNotContains(self.client.get('/blogs/'), 'Cached post')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_render_only_save_keeps_the_listing(self):
+        stamp = page_cache.listing_stamp(self.author.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.refresh_content_html()
+            self.post.save(update_fields=['content_html', 'content_html_version'])
+
+        self.assertEqual(page_cache.listing_stamp(self.author.id), stamp)
+
+    def test_pages_are_per_user(self):
+        self.client.get(self.url)
+        other = User.objects.create_user('other-user', password='pw')
+        self.client.force_login(other)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,101 @@
+"""
+Blog content rendering: Markdown to sanitized HTML
+"""
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from config import rendering
+from config.models import BlogPost
+from config.rendering import CONTENT_RENDER_VERSION, render_content
+
+
+class BasicRendererTests(SimpleTestCase):
+    render = staticmethod(rendering._render_basic)
+
+    def test_block_structure(self):
+        html = self.render('# Title\n\nFirst line\nsecond line\n\n- one\n- two\n\n1. first\n\n> quoted\n\n---')
+
+        self.assertEqual(html, '\n'.join([
+            '<h1>Title</h1>',
+            '<p>First line<br>second line</p>',
+            '<ul><li>one</li><li>two</li></ul>',
+            '<ol><li>first</li></ol>',
+            '<blockquote><p>quoted</p></blockquote>',
+            '<hr>',
+        ]))
+
+    def test_html_in_content_is_escaped(self):
+        html = self.render('<script>alert(1)</script> <img src=x onerror=alert(1)> **bold**')
+
+        self.assertNotIn('<script', html)
+        self.assertNotIn('<img', html)
+        self.assertIn('&lt;script&gt;', html)
+        self.assertIn('<strong>bold</strong>', html)
+
+    def test_only_safe_link_schemes_become_links(self):
+        html = self.render('[ok](https://example.com/a?b=1&c=2) [bad](javascript:alert(1))')
+
+        self.assertIn('<a href="https://example.com/a?b=1&amp;c=2" rel="nofollow noopener">ok</a>', html)
+        self.assertIn('[bad](javascript:alert(1))', html)
+        self.assertNotIn('href="javascript', html)
+
+    def test_link_urls_are_not_emphasized(self):
+        html = self.render('[a](http://x/*y*) and [b](https://x/_c_d_)')
+
+        self.assertIn('href="http://x/*y*"', html)
+        self.assertIn('href="https://x/_c_d_"', html)
+        self.assertNotIn('<em>', html)
+
+    def test_link_text_is_emphasized(self):
+        html = self.render('[*new* release](https://example.com/)')
+
+        self.assertIn('<a href="https://example.com/" rel="nofollow noopener"><em>new</em> release</a>', html)
+
+    def test_code_spans_stay_literal(self):
+        html = self.render('Run `a *b* <c>` or `[x](http://y/)`')
+
+        self.assertIn('<code>a *b* &lt;c&gt;</code>', html)
+        self.assertIn('<code>[x](http://y/)</code>', html)
+        self.assertNotIn('<a ', html)
+
+    def test_quotes_cannot_break_out_of_the_href(self):
+        html = self.render('[x](https://example.com/"onmouseover="alert(1))')
+
+        self.assertNotIn('" onmouseover', html)
+        self.assertNotIn('"onmouseover="', html)
+
+    def test_code_spans_cannot_break_out_of_the_href(self):
+        html = self.render('[x](http://a/`" onmouseover=alert(1) x=`)')
+
+        self.assertNotIn('<a ', html)
+        self.assertNotIn('href', html)
+        # The quote is harmless as text content
+        self.assertIn('<code>" onmouseover=alert(1) x=</code>', html)
+
+
+@skipUnless(rendering.markdown is not None, 'markdown and nh3 are not installed')
+class MarkdownRendererTests(SimpleTestCase):
+    def test_output_is_sanitized(self):
+        html = render_content('<script>alert(1)</script>\n\n[x](javascript:alert(1)) <b onclick="x()">b</b>')
+
+        self.assertNotIn('<script', html)
+        self.assertNotIn('javascript:', html)
+        self.assertNotIn('onclick', html)
+
+
+class StoredContentTests(TestCase):
+    def test_saving_a_post_renders_its_content(self):
+        author = User.objects.create_user('render-test', password='pw')
+        post = BlogPost.objects.create(title='T', description='D', content='Hello *world*',
+                                       youtube_url='https://www.youtube.com/watch?v=skMzCAga-dg', author=author)
+
+        self.assertIn('<em>world</em>', post.content_html)
+        self.assertEqual(post.content_html_version, CONTENT_RENDER_VERSION)
+
+        post.content = 'Changed'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertIn('Changed', post.content_html)
+        self.assertNotIn('world', post.content_html)
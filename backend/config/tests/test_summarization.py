@@ -0,0 +1,44 @@
+"""
+Transcript chunking for map-reduce summaries
+"""
+import time
+
+from django.test import SimpleTestCase
+
+from config import summarization
+from config.summarization import estimate_tokens, split_transcript
+from config.token_budget import count_tokens
+
+
+class SplitTranscriptTests(SimpleTestCase):
+    def test_chunks_end_on_sentence_boundaries(self):
+        text = ' '.join(f'This is sentence {index}.' for index in range(300))
+
+        chunks = split_transcript(text, max_tokens=100)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(' '.join(chunks), text)
+        for chunk in chunks:
+            self.assertTrue(chunk.endswith('.'))
+            self.assertLessEqual(estimate_tokens(chunk), 100)
+
+    def test_unpunctuated_text_is_split_into_word_windows(self):
+        text = ' '.join(f'word{index}' for index in range(5000))
+
+        chunks = split_transcript(text, max_tokens=200)
+
+        self.assertEqual(' '.join(chunks), text)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 200)
+
+    def test_long_unpunctuated_transcript_is_linear(self):
+        # An hour of speech with no punctuation; re-counting a growing window took minutes
+        text = ' '.join(f'word{index % 500}' for index in range(60000))
+        cache_size = count_tokens.cache_info().currsize
+
+        started = time.monotonic()
+        chunks = split_transcript(text, max_tokens=summarization.SUMMARY_CHUNK_TOKENS)
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(count_tokens.cache_info().currsize, cache_size)
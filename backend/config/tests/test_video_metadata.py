@@ -0,0 +1,47 @@
+"""
+Video metadata disk cache: expiry and size sweep
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from config.video_metadata import VideoMetadataCache
+
+
+class DiskSweepTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.cache = VideoMetadataCache(ttl_seconds=60, cache_dir=self.cache_dir, max_disk_entries=2,
+                                        sweep_interval=3600)
+
+    def age(self, name: str, seconds: float) -> None:
+        path = os.path.join(self.cache_dir, name)
+        stamp = time.time() - seconds
+        os.utime(path, (stamp, stamp))
+
+    def test_expired_and_surplus_files_are_removed(self):
+        for index, video_id in enumerate(['aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc', 'ddddddddddd']):
+            self.cache.set(video_id, {'id': video_id})
+            self.age(f'{video_id}.json', 40 - index * 10)
+        self.age('aaaaaaaaaaa.json', 120)
+        with open(os.path.join(self.cache_dir, 'eeeeeeeeeee.json.123.tmp'), 'w') as f:
+            f.write('{')
+        self.age('eeeeeeeeeee.json.123.tmp', 120)
+
+        self.assertEqual(self.cache.sweep_disk(), 3)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['ccccccccccc.json', 'ddddddddddd.json'])
+
+    def test_writes_sweep_at_most_once_per_interval(self):
+        self.cache.set('aaaaaaaaaaa', {'id': 'aaaaaaaaaaa'})
+        self.age('aaaaaaaaaaa.json', 120)
+
+        self.cache.set('bbbbbbbbbbb', {'id': 'bbbbbbbbbbb'})
+        self.assertIn('aaaaaaaaaaa.json', os.listdir(self.cache_dir))
+
+        self.cache._last_sweep -= self.cache.sweep_interval
+        self.cache.set('ccccccccccc', {'id': 'ccccccccccc'})
+        self.assertNotIn('aaaaaaaaaaa.json', os.listdir(self.cache_dir))
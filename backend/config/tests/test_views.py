@@ -0,0 +1,47 @@
+"""
+Job progress endpoints
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from config.models import GenerationJob
+
+VIDEO_URL = 'https://www.youtube.com/watch?v=skMzCAga-dg'
+
+
+class JobStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('stream-test', password='pw')
+        self.client.force_login(self.user)
+
+    def test_wsgi_stream_returns_a_snapshot_and_reconnect_delay(self):
+        job = GenerationJob.objects.create(
+            author=self.user, youtube_url=VIDEO_URL, status=GenerationJob.STATUS_RUNNING,
+            progress={'stage': 'transcribing'},
+        )
+
+        response = self.client.get(f'/jobs/{job.pk}/stream/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('retry: '))
+        self.assertIn('event: progress', body)
+        self.assertIn('"stage": "transcribing"', body)
+
+    def test_wsgi_stream_reports_finished_job(self):
+        job = GenerationJob.objects.create(
+            author=self.user, youtube_url=VIDEO_URL, status=GenerationJob.STATUS_FAILED, error='boom',
+        )
+
+        body = self.client.get(f'/jobs/{job.pk}/stream/').content.decode()
+
+        self.assertIn('event: failed', body)
+        self.assertIn('boom', body)
+
+    def test_other_users_job_is_not_found(self):
+        other = User.objects.create_user('someone-else', password='pw')
+        job = GenerationJob.objects.create(author=other, youtube_url=VIDEO_URL)
+
+        self.assertEqual(self.client.get(f'/jobs/{job.pk}/stream/').status_code, 404)
@@ -0,0 +1,123 @@
+"""
+Token counting and prompt budgeting for the LLM providers
+
+Counts tokens with the model's tokenizer when tiktoken is installed (Groq's
+Llama and Gemini models are counted with cl100k_base, which is close enough
+for budgeting) and with a character-based estimate otherwise. Input and
+output budgets are derived from each model's context window, so prompts are
+trimmed to what fits and max_tokens asks for everything that is left instead
+of a fixed 3500.
+"""
+import os
+import logging
+from functools import lru_cache
+from typing import Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Optional exact tokenizer
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# (context window, max output tokens) per model
+MODEL_LIMITS = {
+    'llama-3.1-70b-versatile': (131072, 8000),
+    'mixtral-8x7b-32768': (32768, 8000),
+    'gpt-3.5-turbo': (16385, 4096),
+    'gpt-4o-mini': (128000, 16384),
+    'gemini-pro': (32760, 8192),
+}
+DEFAULT_MODEL_LIMITS = (8192, 2048)
+
+# Tokens kept free for chat formatting and tokenizer differences
+SAFETY_MARGIN_TOKENS = 256
+# Characters per token used when no tokenizer is available
+FALLBACK_CHARS_PER_TOKEN = float(os.environ.get('TOKEN_ESTIMATE_CHARS_PER_TOKEN', '4'))
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for a model (None without tiktoken)"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        # e.g. encoding files can't be downloaded - fall back to estimates
+        logger.warning(f"No tokenizer for {model}, estimating token counts: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Character-based token estimate"""
+    return int(len(text) / FALLBACK_CHARS_PER_TOKEN) + 1
+
+
+def count_tokens_uncached(text: str, model: str = '') -> int:
+    """count_tokens() for one-off text (transcripts, their pieces) that shouldn't fill the cache"""
+    if not text:
+        return 0
+    encoding = _encoding(model) if model else None
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1024)
+def count_tokens(text: str, model: str = '') -> int:
+    """Tokens in text for the given model (cached; repeated prompts are counted once)"""
+    return count_tokens_uncached(text, model)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = '') -> str:
+    """Longest prefix of text that fits max_tokens"""
+    if max_tokens <= 0:
+        return ''
+    encoding = _encoding(model) if model else None
+    if encoding is None:
+        return text[:int(max_tokens * FALLBACK_CHARS_PER_TOKEN)]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def tail_tokens(text: str, max_tokens: int, model: str = '') -> str:
+    """Longest suffix of text that fits max_tokens"""
+    if max_tokens <= 0:
+        return ''
+    encoding = _encoding(model) if model else None
+    if encoding is None:
+        return text[-int(max_tokens * FALLBACK_CHARS_PER_TOKEN):]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[-max_tokens:])
+
+
+def model_limits(model: str):
+    """(context window, max output tokens) for a model"""
+    return MODEL_LIMITS.get(model, DEFAULT_MODEL_LIMITS)
+
+
+def input_budget(model: str, reserved_output: int, fixed_text: str = '') -> int:
+    """Tokens left for variable input once the output reservation and fixed prompt text are counted"""
+    context, max_output = model_limits(model)
+    reserved = min(reserved_output, max_output)
+    return max(0, context - reserved - count_tokens(fixed_text, model) - SAFETY_MARGIN_TOKENS)
+
+
+def output_budget(model: str, prompt: str, desired: Optional[int] = None) -> int:
+    """max_tokens for a request: everything the context window leaves, capped by the model limit"""
+    context, max_output = model_limits(model)
+    # The prompt holds the transcript, so it is counted without the cache
+    available = context - count_tokens_uncached(prompt, model) - SAFETY_MARGIN_TOKENS
+    budget = min(max_output, available)
+    if desired:
+        budget = min(budget, desired)
+    return max(1, budget)
@@ -0,0 +1,143 @@
+"""
+Persistent transcript cache keyed by YouTube video id
+
+Transcripts are stored in the database under (video id, transcription
+provider, model), so a repeat request for the same video can skip the
+download and transcription steps and go straight to blog generation.
+Entries expire after TRANSCRIPT_CACHE_TTL_HOURS and the least recently used
+ones are evicted once the cache grows past TRANSCRIPT_CACHE_MAX_MB.
+"""
+import os
+import threading
+import logging
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Cache configuration (set TRANSCRIPT_CACHE_ENABLED=false to disable)
+TRANSCRIPT_CACHE_ENABLED = os.environ.get('TRANSCRIPT_CACHE_ENABLED', 'true').lower() == 'true'
+TRANSCRIPT_CACHE_TTL_HOURS = float(os.environ.get('TRANSCRIPT_CACHE_TTL_HOURS', str(24 * 30)))
+TRANSCRIPT_CACHE_MAX_MB = float(os.environ.get('TRANSCRIPT_CACHE_MAX_MB', '200'))
+
+
+class TranscriptCache:
+    """Database-backed transcript store with TTL and size-based eviction"""
+
+    def __init__(self, ttl_hours: float = TRANSCRIPT_CACHE_TTL_HOURS, max_mb: float = TRANSCRIPT_CACHE_MAX_MB):
+        self.ttl = timedelta(hours=ttl_hours) if ttl_hours else None
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, video_id: str, provider: Optional[str] = None, model_name: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Return the freshest cached transcript for the video, or None
+
+        provider/model_name narrow the lookup; when omitted (auto mode) a
+        transcript from any provider is accepted.
+        """
+        from .models import TranscriptCacheEntry
+
+        entries = TranscriptCacheEntry.objects.filter(video_id=video_id)
+        if provider:
+            entries = entries.filter(provider=provider)
+        if model_name is not None:
+            entries = entries.filter(model_name=model_name)
+        if self.ttl:
+            entries = entries.filter(created_at__gte=timezone.now() - self.ttl)
+
+        entry = entries.order_by('-created_at').first()
+        if entry is None:
+            self._count(hit=False)
+            return None
+
+        TranscriptCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_accessed_at=timezone.now(),
+        )
+        self._count(hit=True)
+        logger.info(f"Transcript cache hit for video {video_id} ({entry.provider}/{entry.model_name or 'default'})")
+        return {
+            'transcript': entry.transcript,
+            'provider': entry.provider,
+            'model_name': entry.model_name,
+        }
+
+    def set(self, video_id: str, provider: str, model_name: str, transcript: str) -> None:
+        """Store (or replace) a transcript and enforce the size budget"""
+        from .models import TranscriptCacheEntry
+
+        if not transcript:
+            return
+        now = timezone.now()
+        values = {
+            'transcript': transcript,
+            'size_bytes': len(transcript.encode('utf-8')),
+            'created_at': now,
+            'last_accessed_at': now,
+        }
+        try:
+            TranscriptCacheEntry.objects.update_or_create(
+                video_id=video_id,
+                provider=provider,
+                model_name=model_name or '',
+                defaults=values,
+            )
+        except IntegrityError:
+            # Another worker stored the same key concurrently
+            pass
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete expired entries, then LRU entries beyond the size budget"""
+        from .models import TranscriptCacheEntry
+
+        removed = 0
+        if self.ttl:
+            removed += TranscriptCacheEntry.objects.filter(created_at__lt=timezone.now() - self.ttl).delete()[0]
+
+        if self.max_bytes:
+            total = TranscriptCacheEntry.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+            if total > self.max_bytes:
+                stale_ids = []
+                for pk, size in TranscriptCacheEntry.objects.order_by('last_accessed_at').values_list('pk', 'size_bytes'):
+                    if total <= self.max_bytes:
+                        break
+                    stale_ids.append(pk)
+                    total -= size
+                removed += TranscriptCacheEntry.objects.filter(pk__in=stale_ids).delete()[0]
+
+        if removed:
+            logger.info(f"Evicted {removed} transcript cache entries")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process plus the stored totals"""
+        from .models import TranscriptCacheEntry
+
+        totals = TranscriptCacheEntry.objects.aggregate(size=Sum('size_bytes'), hits=Sum('hit_count'))
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': TranscriptCacheEntry.objects.count(),
+                'size_bytes': totals['size'] or 0,
+                'total_hits': totals['hits'] or 0,
+            }
+
+
+# Shared cache for this process
+transcript_cache = TranscriptCache()
@@ -0,0 +1,152 @@
+"""
+Hedged racing of transcription providers
+
+In "auto" mode the providers are no longer tried strictly one after
+another. The fastest-looking provider (see provider_stats.py) starts first;
+if it hasn't produced a transcript within TRANSCRIPTION_HEDGE_DELAY seconds,
+or fails, the next one starts in parallel. The first non-empty transcript
+wins and the cancel event tells the others to stop (API pollers check it;
+a local Whisper run finishes in the background and its result is dropped).
+"""
+import os
+import time
+import asyncio
+import threading
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from .provider_stats import ProviderStats
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the running provider(s) before starting the next one
+TRANSCRIPTION_HEDGE_DELAY = float(os.environ.get('TRANSCRIPTION_HEDGE_DELAY', '60'))
+
+# Shared statistics for this process
+transcription_stats = ProviderStats()
+
+
+def race_providers(providers: List[Tuple[str, Callable[[threading.Event], Optional[str]]]],
+                   hedge_delay: float = TRANSCRIPTION_HEDGE_DELAY,
+                   stats: ProviderStats = transcription_stats) -> Tuple[Optional[str], Optional[str]]:
+    """Run providers with staggered starts; return (transcript, provider name)
+
+    Each provider is a (name, fn) pair where fn receives the shared cancel
+    event and returns a transcript or None.
+    """
+    if not providers:
+        return None, None
+
+    by_name = dict(providers)
+    pending_names = stats.order([name for name, _ in providers])
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix='transcribe')
+    running = {}
+
+    def run(name: str):
+        started = time.monotonic()
+        try:
+            transcript = by_name[name](cancel_event)
+        except Exception as e:
+            logger.error(f"Transcription provider {name} raised: {e}", exc_info=True)
+            transcript = None
+        # A provider stopped by the cancel event isn't counted against it
+        if not cancel_event.is_set():
+            stats.record(name, time.monotonic() - started, bool(transcript))
+        return transcript
+
+    def start_next() -> bool:
+        if not pending_names:
+            return False
+        name = pending_names.pop(0)
+        logger.info(f"Starting transcription provider: {name}")
+        running[executor.submit(run, name)] = name
+        return True
+
+    try:
+        start_next()
+        while running:
+            done, _ = wait(list(running), timeout=hedge_delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # Hedge: the current provider(s) are slow, start another in parallel
+                if start_next():
+                    logger.info("Transcription is slow, hedging with the next provider")
+                continue
+            for future in done:
+                name = running.pop(future)
+                transcript = future.result()
+                if transcript:
+                    logger.info(f"Transcription won by {name}. Length: {len(transcript)} characters")
+                    return transcript, name
+                logger.warning(f"Transcription provider {name} returned no transcript")
+            # Failures don't wait out the hedge delay: replace them immediately
+            for _ in done:
+                start_next()
+        return None, None
+    finally:
+        cancel_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def arace_providers(providers: List[Tuple[str, Callable[[], Awaitable[Optional[str]]]]],
+                          hedge_delay: float = TRANSCRIPTION_HEDGE_DELAY,
+                          stats: ProviderStats = transcription_stats) -> Tuple[Optional[str], Optional[str]]:
+    """race_providers() for coroutine providers on the running event loop
+
+    Each provider is a (name, fn) pair where fn() returns an awaitable
+    transcript. Losers are cancelled as tasks (blocking work wrapped with
+    asyncio.to_thread still finishes in the background).
+    """
+    if not providers:
+        return None, None
+
+    by_name = dict(providers)
+    pending_names = stats.order([name for name, _ in providers])
+    running = {}
+    finished = False
+
+    async def run(name: str):
+        started = time.monotonic()
+        try:
+            transcript = await by_name[name]()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Transcription provider {name} raised: {e}", exc_info=True)
+            transcript = None
+        if not finished:
+            stats.record(name, time.monotonic() - started, bool(transcript))
+        return transcript
+
+    def start_next() -> bool:
+        if not pending_names:
+            return False
+        name = pending_names.pop(0)
+        logger.info(f"Starting transcription provider: {name}")
+        running[asyncio.ensure_future(run(name))] = name
+        return True
+
+    try:
+        start_next()
+        while running:
+            done, _ = await asyncio.wait(list(running), timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if start_next():
+                    logger.info("Transcription is slow, hedging with the next provider")
+                continue
+            for task in done:
+                name = running.pop(task)
+                transcript = task.result()
+                if transcript:
+                    logger.info(f"Transcription won by {name}. Length: {len(transcript)} characters")
+                    return transcript, name
+                logger.warning(f"Transcription provider {name} returned no transcript")
+            for _ in done:
+                start_next()
+        return None, None
+    finally:
+        finished = True
+        for task in running:
+            task.cancel()
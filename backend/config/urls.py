@@ -27,6 +27,11 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('signup/', views.signup_view, name='signup'),
     path('generate-blog/', views.generate_blog, name='generate_blog'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/stream/', views.job_stream, name='job_stream'),
+    path('batches/', views.generate_batch, name='generate_batch'),
+    path('batches/<int:batch_id>/', views.batch_status, name='batch_status'),
+    path('webhooks/assemblyai/', views.assemblyai_webhook, name='assemblyai_webhook'),
     path('test-blog-generator/', views.test_blog_generator, name='test_blog_generator'),  # Debug endpoint
     path('blogs/', views.all_blog_posts, name='all_blog_posts'),
     path('blog-details/<int:blog_id>/', views.blog_details, name='blog_details'),
@@ -0,0 +1,175 @@
+"""
+yt-dlp metadata cache keyed by YouTube video id
+
+A single extract_info() call per video feeds both the video details and the
+audio download. The (sanitized) info dict is kept in memory and on disk for
+VIDEO_METADATA_CACHE_TTL seconds so repeat requests don't hit YouTube again.
+The TTL is kept short because the stream URLs inside the info dict expire.
+Writes also sweep the disk directory now and then (at most every
+VIDEO_METADATA_SWEEP_INTERVAL seconds): expired files and leftover temp
+files are deleted, and only the newest VIDEO_METADATA_DISK_MAX_ENTRIES
+files are kept.
+"""
+import os
+import re
+import json
+import time
+import copy
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+VIDEO_METADATA_CACHE_TTL = float(os.environ.get('VIDEO_METADATA_CACHE_TTL', '1800'))
+VIDEO_METADATA_CACHE_DIR = os.environ.get(
+    'VIDEO_METADATA_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'ai_blog_video_metadata'),
+)
+VIDEO_METADATA_CACHE_MAX_ENTRIES = int(os.environ.get('VIDEO_METADATA_CACHE_MAX_ENTRIES', '256'))
+VIDEO_METADATA_DISK_MAX_ENTRIES = int(os.environ.get('VIDEO_METADATA_DISK_MAX_ENTRIES', '2048'))
+VIDEO_METADATA_SWEEP_INTERVAL = float(os.environ.get('VIDEO_METADATA_SWEEP_INTERVAL', '600'))
+
+VIDEO_ID_PATTERNS = [
+    r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
+    r'youtube\.com\/watch\?.*v=([a-zA-Z0-9_-]{11})',
+]
+
+
+def extract_video_id(youtube_url: str) -> Optional[str]:
+    """Extract video ID from YouTube URL"""
+    for pattern in VIDEO_ID_PATTERNS:
+        match = re.search(pattern, youtube_url)
+        if match:
+            return match.group(1)
+    return None
+
+
+class VideoMetadataCache:
+    """Two-level (memory + disk) TTL cache of yt-dlp info dicts"""
+
+    def __init__(self, ttl_seconds: float = VIDEO_METADATA_CACHE_TTL,
+                 cache_dir: Optional[str] = VIDEO_METADATA_CACHE_DIR,
+                 max_entries: int = VIDEO_METADATA_CACHE_MAX_ENTRIES,
+                 max_disk_entries: int = VIDEO_METADATA_DISK_MAX_ENTRIES,
+                 sweep_interval: float = VIDEO_METADATA_SWEEP_INTERVAL):
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.sweep_interval = sweep_interval
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def _disk_path(self, video_id: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f'{video_id}.json')
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """Return a copy of the cached info dict, or None if missing/expired"""
+        if not self.ttl_seconds:
+            return None
+        now = time.time()
+
+        with self._lock:
+            cached = self._memory.get(video_id)
+            if cached is not None:
+                stored_at, info = cached
+                if now - stored_at < self.ttl_seconds:
+                    self._memory.move_to_end(video_id)
+                    return copy.deepcopy(info)
+                del self._memory[video_id]
+
+        path = self._disk_path(video_id)
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                if now - payload['stored_at'] < self.ttl_seconds:
+                    self._remember(video_id, payload['stored_at'], payload['info'])
+                    return copy.deepcopy(payload['info'])
+                os.unlink(path)
+            except Exception as e:
+                logger.warning(f"Could not read cached metadata for {video_id}: {e}")
+        return None
+
+    def set(self, video_id: str, info: dict) -> None:
+        """Store an info dict (must already be JSON-serializable)"""
+        if not self.ttl_seconds:
+            return
+        stored_at = time.time()
+        self._remember(video_id, stored_at, copy.deepcopy(info))
+
+        path = self._disk_path(video_id)
+        if path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'stored_at': stored_at, 'info': info}, f)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"Could not write cached metadata for {video_id}: {e}")
+            self._maybe_sweep(stored_at)
+
+    def _maybe_sweep(self, now: float) -> None:
+        with self._lock:
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+        try:
+            self.sweep_disk()
+        except Exception as e:
+            logger.warning(f"Video metadata cache sweep failed: {e}")
+
+    def sweep_disk(self) -> int:
+        """Delete expired and surplus disk entries (oldest first); returns how many were removed"""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                # Files are written once, so mtime is when the entry (or a crashed write) was stored
+                modified = os.path.getmtime(path)
+                if now - modified >= self.ttl_seconds:
+                    os.unlink(path)
+                    removed += 1
+                elif name.endswith('.json'):
+                    entries.append((modified, path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_disk_entries:]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"Swept {removed} video metadata cache file(s)")
+        return removed
+
+    def _remember(self, video_id: str, stored_at: float, info: dict) -> None:
+        with self._lock:
+            self._memory[video_id] = (stored_at, info)
+            self._memory.move_to_end(video_id)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop the in-memory entries (disk entries expire on their own)"""
+        with self._lock:
+            self._memory.clear()
+
+
+# Shared cache for this process
+video_metadata_cache = VideoMetadataCache()
@@ -1,21 +1,37 @@
 """
 Views for the AI Blog Generator application
 """
+import hmac
+import json
+import os
+import time
+import asyncio
 import logging
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from .models import BlogPost
-from .blog_generator import generate_blog_from_youtube
+from .models import BlogPost, GenerationBatch, GenerationJob
+from .jobs import enqueue_generation_job
+from .listing import decode_cursor, listing_page
+from . import page_cache
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Job progress streaming (Server-Sent Events)
+JOB_STREAM_POLL_INTERVAL = float(os.environ.get('JOB_STREAM_POLL_INTERVAL', '0.5'))
+JOB_STREAM_KEEPALIVE = float(os.environ.get('JOB_STREAM_KEEPALIVE', '15'))
+JOB_STREAM_MAX_SECONDS = float(os.environ.get('JOB_STREAM_MAX_SECONDS', '600'))  # Browser reconnects after this
+JOB_STREAM_WSGI_RETRY = float(os.environ.get('JOB_STREAM_WSGI_RETRY', '2'))  # Reconnect delay under WSGI
+
 
 def index(request):
     """Serve the main index.html page"""
@@ -128,31 +144,50 @@ def signup_view(request):
 
 @login_required
 def all_blog_posts(request):
-    """Display all blog posts for the logged-in user"""
-    blog_posts = BlogPost.objects.filter(author=request.user)
-    context = {
-        'blog_posts': blog_posts,
-    }
-    return render(request, 'all_blog_posts.html', context)
+    """Display the logged-in user's blog posts, one keyset page at a time"""
+    cursor = request.GET.get('cursor')
+    stamp = page_cache.listing_stamp(request.user.id)
+
+    def render_page():
+        blog_posts, next_cursor = listing_page(request.user.id, cursor)
+        context = {
+            'blog_posts': blog_posts,
+            'next_cursor': next_cursor,
+            'is_first_page': decode_cursor(cursor) is None,
+        }
+        return page_cache.render_cacheable(request, 'all_blog_posts.html', context)
+
+    return page_cache.cached_page(request, page_cache.listing_key(request.user.id, stamp, cursor), stamp, render_page)
 
 
 @login_required
 def blog_details(request, blog_id=None):
     """Display details of a specific blog post"""
-    if blog_id:
-        blog_post = get_object_or_404(BlogPost, id=blog_id, author=request.user)
-    else:
-        # For demo purposes, get the first blog post if no ID provided
-        blog_post = BlogPost.objects.filter(author=request.user).first()
-        if not blog_post:
+    if not blog_id:
+        # For demo purposes, show the newest blog post if no ID provided
+        blog_id = BlogPost.objects.filter(author=request.user).values_list('id', flat=True).first()
+        if not blog_id:
             messages.info(request, 'No blog posts found. Create your first blog post!')
             return redirect('index')
-    
-    context = {
-        'blog_post': blog_post,
-    }
-    return render(request, 'blog-details.html', context)
 
+    # Only updated_at is needed to answer from the page cache (or with a 304)
+    updated_at = BlogPost.objects.filter(id=blog_id, author=request.user).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        raise Http404('No BlogPost matches the given query.')
+
+    def render_page():
+        blog_post = get_object_or_404(BlogPost, id=blog_id, author=request.user)
+        if not blog_post.content_html_is_current:
+            # Posts from before the render pipeline (or an older renderer) render once here
+            blog_post.refresh_content_html()
+            blog_post.save(update_fields=['content_html', 'content_html_version'])
+        context = {
+            'blog_post': blog_post,
+        }
+        return page_cache.render_cacheable(request, 'blog-details.html', context)
+
+    key = page_cache.detail_key(request.user.id, blog_id, updated_at)
+    return page_cache.cached_page(request, key, updated_at, render_page)
 
 @login_required
 @require_http_methods(["GET", "POST"])
@@ -201,10 +236,11 @@ def delete_blog(request, blog_id):
 
 
 @require_http_methods(["POST"])
-def generate_blog(request):
-    """Generate blog post from YouTube URL"""
+async def generate_blog(request):
+    """Queue blog post generation from YouTube URL and return the job id"""
     # Check if user is authenticated
-    if not request.user.is_authenticated:
+    user = await request.auser()
+    if not user.is_authenticated:
         # For AJAX requests, return JSON error instead of redirecting
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
@@ -231,60 +267,237 @@ def generate_blog(request):
             'error': 'Please provide a valid YouTube URL.'
         }, status=400)
     
-    try:
-        # Generate blog post
-        logger.info(f"Starting blog generation for URL: {youtube_url}")
-        result = generate_blog_from_youtube(youtube_url)
-        
-        logger.info(f"Blog generation result: success={result.get('success')}, error={result.get('error')}")
-        
-        if not result['success']:
-            error_msg = result.get('error', 'Failed to generate blog post.')
-            logger.error(f"Blog generation failed: {error_msg}")
-            return JsonResponse({
-                'success': False,
-                'error': error_msg
-            }, status=500)
-        
-        # Save blog post to database
-        blog_post = BlogPost.objects.create(
-            title=result['blog_post']['title'],
-            description=result['blog_post']['description'],
-            content=result['blog_post']['content'],
-            youtube_url=youtube_url,
-            youtube_title=result['video_info'].get('title', ''),
-            youtube_channel=result['video_info'].get('channel', ''),
-            youtube_duration=result['video_info'].get('duration', ''),
-            author=request.user,
-            category='Technology',  # Default category, can be made dynamic
-        )
-        
+    # "Regenerate" skips cached LLM responses for this video
+    regenerate = request.POST.get('regenerate', '').lower() in ('1', 'true', 'on')
+    job = await sync_to_async(enqueue_generation_job)(youtube_url, user, regenerate=regenerate)
+    
+    return JsonResponse({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'message': 'Blog generation started.',
+        'status_url': f'/jobs/{job.id}/',
+        'stream_url': f'/jobs/{job.id}/stream/',
+    }, status=202)
+
+
+@require_http_methods(["POST"])
+def generate_batch(request):
+    """Queue a batch of videos: playlist URLs and/or video URLs, one per line"""
+    if not request.user.is_authenticated:
         return JsonResponse({
-            'success': True,
-            'blog_id': blog_post.id,
-            'message': 'Blog post generated successfully!',
-            'redirect_url': f'/blog-details/{blog_post.id}/'
-        })
-        
-    except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        logger.error(f"Exception in generate_blog view: {str(e)}\n{error_trace}")
+            'success': False,
+            'error': 'Please log in to generate blog posts.',
+            'login_required': True,
+            'login_url': '/login/',
+        }, status=401)
+    
+    # Accept a JSON body {"urls": [...], "regenerate": bool} or form fields
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid JSON body.'}, status=400)
+        urls = payload.get('urls') or []
+        regenerate = bool(payload.get('regenerate'))
+    else:
+        urls = request.POST.get('urls', '').split()
+        regenerate = request.POST.get('regenerate', '').lower() in ('1', 'true', 'on')
+    
+    urls = [url.strip() for url in urls if isinstance(url, str) and url.strip()]
+    if not urls:
+        return JsonResponse({
+            'success': False,
+            'error': 'Please provide at least one YouTube or playlist URL.'
+        }, status=400)
+    invalid = [url for url in urls if 'youtube.com' not in url and 'youtu.be' not in url]
+    if invalid:
+        return JsonResponse({
+            'success': False,
+            'error': f'Not a YouTube URL: {invalid[0]}'
+        }, status=400)
+    
+    from .batches import create_batch
+    batch = create_batch(urls, request.user, regenerate=regenerate)
+    return JsonResponse({
+        'success': True,
+        'batch_id': batch.id,
+        'status': batch.status,
+        'message': 'Batch generation started.',
+        'status_url': f'/batches/{batch.id}/',
+    }, status=202)
+
+
+@require_http_methods(["GET"])
+async def batch_status(request, batch_id):
+    """Report a batch and the progress of each of its videos"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'error': 'Please log in to view generation batches.',
+            'login_required': True,
+            'login_url': '/login/',
+        }, status=401)
+    
+    from .batches import batch_summary
+    batch = await aget_object_or_404(GenerationBatch, id=batch_id, author=user)
+    data = await sync_to_async(batch_summary)(batch)
+    data['success'] = batch.status != GenerationJob.STATUS_FAILED
+    return JsonResponse(data)
+
+
+@require_http_methods(["GET"])
+async def job_status(request, job_id):
+    """Report the status of a queued blog generation job"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'error': 'Please log in to view generation jobs.',
+            'login_required': True,
+            'login_url': '/login/',
+        }, status=401)
+    
+    job = await aget_object_or_404(GenerationJob, id=job_id, author=user)
+    data = {
+        'success': job.status != GenerationJob.STATUS_FAILED,
+        'job_id': job.id,
+        'status': job.status,
+        'blog_id': job.blog_post_id,
+    }
+    if job.status == GenerationJob.STATUS_DONE and job.blog_post_id:
+        data['redirect_url'] = f'/blog-details/{job.blog_post_id}/'
+    if job.status == GenerationJob.STATUS_FAILED:
+        data['error'] = job.error or 'Failed to generate blog post.'
+    return JsonResponse(data)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _job_stream_step(job_id: int, state: dict):
+    """SSE events for the job's current state; returns (events, finished)"""
+    job = GenerationJob.objects.filter(id=job_id).values(
+        'status', 'progress', 'error', 'blog_post_id', 'leader_id'
+    ).first()
+    if job is None:
+        return [_sse_event('failed', {'error': 'Generation job not found'})], True
+    if job['leader_id'] and job['status'] == GenerationJob.STATUS_QUEUED:
+        # Coalesced job: show the progress of the job doing the work
+        job['progress'] = GenerationJob.objects.filter(id=job['leader_id']).values_list(
+            'progress', flat=True
+        ).first()
+    events = []
+    if job['progress'] != state['last_progress']:
+        state['last_progress'] = job['progress']
+        state['last_sent'] = time.monotonic()
+        events.append(_sse_event('progress', dict(job['progress'] or {}, status=job['status'])))
+    if job['status'] == GenerationJob.STATUS_DONE:
+        events.append(_sse_event('done', {
+            'blog_id': job['blog_post_id'],
+            'redirect_url': f"/blog-details/{job['blog_post_id']}/",
+        }))
+        return events, True
+    if job['status'] == GenerationJob.STATUS_FAILED:
+        events.append(_sse_event('failed', {'error': job['error'] or 'Failed to generate blog post.'}))
+        return events, True
+    if time.monotonic() - state['last_sent'] >= JOB_STREAM_KEEPALIVE:
+        # Comment line keeps proxies from closing an idle connection
+        state['last_sent'] = time.monotonic()
+        events.append(": keepalive\n\n")
+    return events, False
+
+
+def _new_stream_state() -> dict:
+    now = time.monotonic()
+    return {'last_progress': None, 'last_sent': now, 'started': now}
+
+
+def _job_event_snapshot(job_id: int) -> str:
+    """
+    The job's current state as a complete SSE response (WSGI). A sync worker
+    can't be held for a whole job, so the response ends at once and
+    EventSource polls by reconnecting after JOB_STREAM_WSGI_RETRY.
+    """
+    events, _ = _job_stream_step(job_id, _new_stream_state())
+    return f"retry: {int(JOB_STREAM_WSGI_RETRY * 1000)}\n\n" + ''.join(events)
+
+
+async def _ajob_event_stream(job_id: int):
+    """_job_event_stream() for ASGI: waiting clients don't hold a thread each"""
+    state = _new_stream_state()
+    yield f"retry: {int(JOB_STREAM_POLL_INTERVAL * 2000)}\n\n"
+    step = sync_to_async(_job_stream_step)
+    while time.monotonic() - state['started'] < JOB_STREAM_MAX_SECONDS:
+        events, finished = await step(job_id, state)
+        for event in events:
+            yield event
+        if finished:
+            return
+        await asyncio.sleep(JOB_STREAM_POLL_INTERVAL)
+
+
+@require_http_methods(["GET"])
+async def job_stream(request, job_id):
+    """Server-Sent Events stream of a generation job's progress and partial post"""
+    user = await request.auser()
+    if not user.is_authenticated:
         return JsonResponse({
             'success': False,
-            'error': f'An error occurred: {str(e)}'
-        }, status=500)
+            'error': 'Please log in to view generation jobs.',
+            'login_required': True,
+            'login_url': '/login/',
+        }, status=401)
+    
+    await aget_object_or_404(GenerationJob, id=job_id, author=user)
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(_ajob_event_stream(job_id), content_type='text/event-stream')
+    else:
+        snapshot = await sync_to_async(_job_event_snapshot)(job_id)
+        response = HttpResponse(snapshot, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def assemblyai_webhook(request):
+    """AssemblyAI completion callback; the waiting worker fetches the transcript"""
+    from .assemblyai import ASSEMBLYAI_WEBHOOK_HEADER, ASSEMBLYAI_WEBHOOK_SECRET, record_webhook
+    
+    if not ASSEMBLYAI_WEBHOOK_SECRET:
+        return JsonResponse({'success': False, 'error': 'Webhook is not enabled.'}, status=404)
+    if not hmac.compare_digest(request.headers.get(ASSEMBLYAI_WEBHOOK_HEADER, ''), ASSEMBLYAI_WEBHOOK_SECRET):
+        return JsonResponse({'success': False, 'error': 'Invalid webhook secret.'}, status=403)
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON.'}, status=400)
+    transcript_id = payload.get('transcript_id')
+    status = payload.get('status')
+    if not transcript_id or not status:
+        return JsonResponse({'success': False, 'error': 'transcript_id and status are required.'}, status=400)
+    
+    record_webhook(transcript_id, status)
+    logger.info(f"AssemblyAI webhook: transcript {transcript_id} is {status}")
+    return JsonResponse({'success': True})
 
 
 @login_required
 def test_blog_generator(request):
     """Debug endpoint to test blog generator from Django context"""
-    import shutil
-    import subprocess
+    from .ffmpeg_tools import get_ffmpeg_tools
     
+    tools = get_ffmpeg_tools()
     diagnostics = {
-        'ffmpeg_in_path': shutil.which('ffmpeg') is not None,
-        'ffmpeg_path': shutil.which('ffmpeg'),
+        'ffmpeg_available': tools.available,
+        'ffmpeg_path': tools.ffmpeg_path,
+        'ffprobe_path': tools.ffprobe_path,
+        'ffmpeg_version': tools.ffmpeg_version or None,
+        'ffmpeg_supports_opus': tools.supports_opus,
         'yt_dlp_available': False,
         'whisper_available': False,
         'test_url': 'https://www.youtube.com/watch?v=skMzCAga-dg',
@@ -305,22 +518,30 @@ def test_blog_generator(request):
     except ImportError:
         pass
     
-    # Test FFmpeg
-    if diagnostics['ffmpeg_path']:
-        try:
-            result = subprocess.run([diagnostics['ffmpeg_path'], '-version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=5)
-            diagnostics['ffmpeg_version'] = result.stdout.split('\n')[0] if result.stdout else 'Unknown'
-        except:
-            diagnostics['ffmpeg_version'] = 'Error checking version'
+    # Transcript cache counters
+    try:
+        from .transcript_cache import transcript_cache
+        diagnostics['transcript_cache'] = transcript_cache.stats()
+    except Exception as e:
+        diagnostics['transcript_cache'] = {'error': str(e)}
+
+    # Transcription provider latency/success (this process only)
+    from .transcription_race import transcription_stats
+    diagnostics['transcription_providers'] = transcription_stats.snapshot()
+
+    # LLM response cache counters
+    from .llm_cache import llm_cache
+    diagnostics['llm_cache'] = llm_cache.stats()
+
+    # LLM router metrics: latency, time to first token, hedges, breaker state
+    from .llm_router import llm_router
+    diagnostics['llm_providers'] = llm_router.metrics()
     
     # Try a simple download test
     if request.GET.get('test') == 'download':
         try:
-            from .blog_generator import YouTubeBlogGenerator
-            generator = YouTubeBlogGenerator()
+            from .blog_generator import get_generator
+            generator = get_generator()
             test_url = diagnostics['test_url']
             logger.info(f"Testing download for: {test_url}")
             audio_file = generator.download_audio(test_url)
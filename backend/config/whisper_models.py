@@ -0,0 +1,175 @@
+"""
+Process-wide cache of local Whisper models
+
+Loading a Whisper model reads the weights from disk and rebuilds the torch
+graph, which takes seconds and hundreds of MB. The registry loads each model
+size once per worker process and shares it between requests. A Whisper model
+is not safe for concurrent transcribe() calls, so each model is guarded by its
+own lock. When several sizes are configured, least recently used models are
+evicted to stay within WHISPER_MAX_MODELS / WHISPER_MEMORY_BUDGET_MB.
+"""
+import os
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Default model: good balance of speed and accuracy
+# Options: tiny (~75MB), base (~150MB), small (~500MB), medium (~1.5GB), large (~3GB)
+DEFAULT_WHISPER_MODEL = os.environ.get('WHISPER_MODEL', 'base').strip() or 'base'
+
+# Approximate resident size per model, used when torch can't report it
+ESTIMATED_MODEL_SIZE_MB = {
+    'tiny': 75,
+    'base': 150,
+    'small': 500,
+    'medium': 1500,
+    'large': 3000,
+    'turbo': 1600,
+}
+
+
+def estimated_model_size_mb(model_name: str) -> float:
+    """Approximate resident size of a model in MB before it is loaded"""
+    base_name = model_name.split('.')[0].split('-')[0]
+    return float(ESTIMATED_MODEL_SIZE_MB.get(base_name, 500))
+
+
+def _estimate_model_size_mb(model_name: str, model) -> float:
+    """Size of a loaded model in MB (parameter bytes, or the static table)"""
+    try:
+        total_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        if total_bytes:
+            return total_bytes / (1024 * 1024)
+    except Exception:
+        pass
+    return estimated_model_size_mb(model_name)
+
+
+class _ModelEntry:
+    """A loaded model plus its inference lock and bookkeeping"""
+
+    def __init__(self, model, size_mb: float):
+        self.model = model
+        self.size_mb = size_mb
+        self.lock = threading.Lock()
+        self.in_use = 0
+
+
+class WhisperModelRegistry:
+    """Load-once, LRU-evicted cache of Whisper models keyed by model size"""
+
+    def __init__(self, max_models: Optional[int] = None, memory_budget_mb: Optional[float] = None):
+        self.max_models = max_models if max_models is not None else int(os.environ.get('WHISPER_MAX_MODELS', '2'))
+        if memory_budget_mb is None:
+            memory_budget_mb = float(os.environ.get('WHISPER_MEMORY_BUDGET_MB', '0'))
+        self.memory_budget_mb = memory_budget_mb  # 0 disables the memory limit
+
+        self._entries: 'OrderedDict[str, _ModelEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def _load_model(self, model_name: str):
+        """Import whisper lazily and load a model from disk"""
+        import whisper as whisper_module
+        if not hasattr(whisper_module, 'load_model'):
+            raise ImportError("Whisper module doesn't have load_model function")
+        logger.info(f"Loading Whisper model '{model_name}' (first time may take a moment)...")
+        return whisper_module.load_model(model_name)
+
+    def _get_entry(self, model_name: str) -> _ModelEntry:
+        """Return the cached entry for a model, loading it once if needed"""
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry is not None:
+                self._entries.move_to_end(model_name)
+                return entry
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        # Only one thread loads a given model; others wait and reuse it
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(model_name)
+                if entry is not None:
+                    self._entries.move_to_end(model_name)
+                    return entry
+
+            model = self._load_model(model_name)
+            entry = _ModelEntry(model, _estimate_model_size_mb(model_name, model))
+
+            with self._lock:
+                self._entries[model_name] = entry
+                self._evict_locked(keep=model_name)
+            logger.info(f"Whisper model '{model_name}' loaded (~{entry.size_mb:.0f} MB)")
+            return entry
+
+    def _evict_locked(self, keep: str) -> None:
+        """Drop least recently used idle models until within the limits"""
+        def over_limit():
+            if self.max_models and len(self._entries) > self.max_models:
+                return True
+            if self.memory_budget_mb:
+                return sum(e.size_mb for e in self._entries.values()) > self.memory_budget_mb
+            return False
+
+        for name in list(self._entries.keys()):
+            if not over_limit():
+                break
+            if name == keep or self._entries[name].in_use:
+                continue
+            del self._entries[name]
+            logger.info(f"Evicted Whisper model '{name}' from cache")
+
+    @contextmanager
+    def use(self, model_name: str = DEFAULT_WHISPER_MODEL):
+        """Borrow a model for exclusive use (serializes transcribe() per model)"""
+        entry = self._get_entry(model_name)
+        with self._lock:
+            entry.in_use += 1
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+
+    def warm_up(self, model_names: Optional[List[str]] = None) -> List[str]:
+        """Preload models so the first request doesn't pay the load cost"""
+        if model_names is None:
+            configured = os.environ.get('WHISPER_PRELOAD_MODELS', '')
+            model_names = [name.strip() for name in configured.split(',') if name.strip()]
+
+        loaded = []
+        for model_name in model_names:
+            try:
+                self._get_entry(model_name)
+                loaded.append(model_name)
+            except ImportError:
+                logger.warning("Whisper not available, skipping warm-up. Install with: pip install openai-whisper")
+                break
+            except Exception as e:
+                logger.error(f"Could not preload Whisper model '{model_name}': {e}")
+        return loaded
+
+    def loaded_models(self) -> List[str]:
+        """Names of the currently cached models, least recently used first"""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def clear(self) -> None:
+        """Drop every cached model"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared registry for this process
+whisper_registry = WhisperModelRegistry()
+
+
+def warm_up_whisper_models(model_names: Optional[List[str]] = None) -> List[str]:
+    """Startup hook: preload WHISPER_PRELOAD_MODELS into the shared registry"""
+    return whisper_registry.warm_up(model_names)
@@ -4,8 +4,12 @@ Find FFmpeg installation on Windows
 Run with: python find_ffmpeg.py
 """
 import os
-import shutil
-import subprocess
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.ffmpeg_tools import candidate_paths, find_ffmpeg_tools
 
 def find_ffmpeg():
     """Find FFmpeg installation"""
@@ -14,72 +18,32 @@ def find_ffmpeg():
     print("=" * 60)
     print()
     
-    # Method 1: Check PATH
-    print("Method 1: Checking PATH...")
-    ffmpeg_path = shutil.which('ffmpeg')
-    if ffmpeg_path:
-        print(f"  ✓ Found in PATH: {ffmpeg_path}")
-        try:
-            result = subprocess.run([ffmpeg_path, '-version'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=5)
-            version_line = result.stdout.split('\n')[0] if result.stdout else 'Unknown'
-            print(f"  Version: {version_line}")
-            return ffmpeg_path
-        except Exception as e:
-            print(f"  ⚠ Found but error checking version: {e}")
-            return ffmpeg_path
-    else:
-        print("  ✗ Not found in PATH")
-    
-    print()
-    
-    # Method 2: Check common installation locations
-    print("Method 2: Checking common installation locations...")
-    common_paths = [
-        r'C:\ffmpeg\bin\ffmpeg.exe',
-        r'C:\Program Files\ffmpeg\bin\ffmpeg.exe',
-        r'C:\Program Files (x86)\ffmpeg\bin\ffmpeg.exe',
-        os.path.expanduser(r'~\ffmpeg\bin\ffmpeg.exe'),
-        r'C:\tools\ffmpeg\bin\ffmpeg.exe',
-        r'C:\ProgramData\chocolatey\bin\ffmpeg.exe',
-        r'C:\Program Files\ImageMagick-*\ffmpeg.exe',  # Sometimes bundled
-    ]
-    
-    found_paths = []
-    for path in common_paths:
-        # Handle wildcards
-        if '*' in path:
-            import glob
-            matches = glob.glob(path)
-            for match in matches:
-                if os.path.exists(match):
-                    found_paths.append(match)
-        elif os.path.exists(path):
-            found_paths.append(path)
+    # Methods 1 and 2: PATH, FFMPEG_PATH and common installation locations
+    # (the same lookup the app uses, see config/ffmpeg_tools.py)
+    print("Method 1: Checking FFMPEG_PATH, PATH and common installation locations...")
+    found_paths = candidate_paths()
+    tools = find_ffmpeg_tools()
     
     if found_paths:
         print(f"  ✓ Found {len(found_paths)} installation(s):")
         for path in found_paths:
             print(f"    - {path}")
-            try:
-                result = subprocess.run([path, '-version'], 
-                                      capture_output=True, 
-                                      text=True, 
-                                      timeout=5)
-                version_line = result.stdout.split('\n')[0] if result.stdout else 'Unknown'
-                print(f"      Version: {version_line}")
-            except:
-                pass
-        return found_paths[0]
+        if tools.ffmpeg_path:
+            print(f"  Using: {tools.ffmpeg_path}")
+            print(f"  Version: {tools.ffmpeg_version}")
+            if tools.ffprobe_path:
+                print(f"  FFprobe: {tools.ffprobe_path}")
+            else:
+                print("  ⚠ FFprobe not found next to FFmpeg (needed for WAV conversion)")
+            return tools.ffmpeg_path
+        print("  ⚠ Found but none of them could be run")
     else:
-        print("  ✗ Not found in common locations")
+        print("  ✗ Not found in PATH or common locations")
     
     print()
     
-    # Method 3: Search entire C: drive (slow, but thorough)
-    print("Method 3: Searching for ffmpeg.exe...")
+    # Method 2: Search entire C: drive (slow, but thorough)
+    print("Method 2: Searching for ffmpeg.exe...")
     print("  (This may take a while - press Ctrl+C to skip)")
     
     search_paths = [
@@ -2,6 +2,8 @@ import os
 import time
 import requests
 
+# Point at assemblyai_stub_server.py with ASSEMBLYAI_BASE_URL=http://127.0.0.1:8765
+BASE_URL = os.environ.get("ASSEMBLYAI_BASE_URL", "https://api.assemblyai.com").rstrip("/")
 
 def load_api_key():
     key_path = r"C:\temp\AI\secret keys\assemblyAI_key.txt"
@@ -28,7 +30,7 @@ def main():
     print("Uploading audio...")
     with open(audio_path, "rb") as f:
         upload_resp = session.post(
-            "https://api.assemblyai.com/v2/upload",
+            f"{BASE_URL}/v2/upload",
             headers=headers,
             files={"file": f},
             timeout=60,
@@ -47,7 +49,7 @@ def main():
 
     print("Starting transcription...")
     transcript_resp = session.post(
-        "https://api.assemblyai.com/v2/transcript",
+        f"{BASE_URL}/v2/transcript",
         headers=headers,
         json={"audio_url": upload_url},
         timeout=20,
@@ -65,7 +67,7 @@ def main():
         return
 
     print("Polling...")
-    status_url = f"https://api.assemblyai.com/v2/transcript/{transcript_id}"
+    status_url = f"{BASE_URL}/v2/transcript/{transcript_id}"
     while True:
         status_resp = session.get(status_url, headers=headers, timeout=20)
         if not status_resp.ok: